@@ -0,0 +1,92 @@
+"""Frame time of catch-the-ball's falling objects, headless: update plus drawing.
+
+The old way (a list of dicts, one blit each) against EntityStore with one
+Surface.blits call, at several object counts. Objects fall at varied speeds
+and get replaced as they are caught or missed, so the count stays put.
+"""
+import argparse
+import os
+import random
+import time
+
+os.environ["SDL_VIDEODRIVER"] = "dummy"
+os.environ["SDL_AUDIODRIVER"] = "dummy"
+
+import pygame
+
+from entities import EntityStore
+
+WIDTH, HEIGHT = 1920, 1080
+PLAYER = (WIDTH // 2, HEIGHT - 200, 200, 180)
+FALLING_SPEED = 5
+
+
+def old_frame(objects, screen, image):
+    player_x, player_y, player_width, player_height = PLAYER
+    caught = 0
+    for obj in list(objects):  # A copy, so removing doesn't skip the next one
+        obj["y"] += FALLING_SPEED * obj["vy"]
+        if player_x < obj["x"] < player_x + player_width and player_y < obj["y"] < player_y + player_height:
+            caught += 1
+            objects.remove(obj)
+            objects.append({"x": random.randint(50, WIDTH - 50), "y": 0, "vy": random.uniform(0.6, 1.4)})
+        elif obj["y"] > HEIGHT:
+            objects.remove(obj)
+            objects.append({"x": random.randint(50, WIDTH - 50), "y": 0, "vy": random.uniform(0.6, 1.4)})
+    if screen is not None:
+        for obj in objects:
+            screen.blit(image, (obj["x"], obj["y"]))
+    return caught
+
+
+def new_frame(objects, screen, image):
+    player_x, player_y, player_width, player_height = PLAYER
+    objects.step(FALLING_SPEED)
+    caught = objects.inside(player_x, player_y, player_x + player_width, player_y + player_height)
+    gone = objects.remove(caught | objects.below(HEIGHT))
+    objects.spawn([random.randint(50, WIDTH - 50) for _ in range(gone)], 0,
+                  vy=[random.uniform(0.6, 1.4) for _ in range(gone)])
+    if screen is not None:
+        screen.blits([(image, position) for position in objects.positions()], doreturn=False)
+    return int(caught.sum())
+
+
+def run(frame, objects, screen, image, frames):
+    for _ in range(10):  # Warm up, and let the speeds spread the objects out
+        frame(objects, screen, image)
+    start = time.perf_counter()
+    for _ in range(frames):
+        if screen is not None:
+            screen.fill((255, 255, 255))
+        frame(objects, screen, image)
+    return (time.perf_counter() - start) / frames
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Falling-object update and draw time against object count")
+    parser.add_argument("--counts", type=int, nargs="+", default=[1, 100, 1000, 5000])
+    parser.add_argument("--frames", type=int, default=60)
+    parser.add_argument("--no-draw", action="store_true", help="time the update only")
+    args = parser.parse_args()
+
+    pygame.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    image = pygame.transform.scale(pygame.image.load("resources/object_1.png").convert_alpha(), (100, 100))
+    rle_image = image.copy()
+    rle_image.set_alpha(255, pygame.RLEACCEL)
+    target = None if args.no_draw else screen
+
+    print(f"{'objects':>7} {'old ms':>8} {'new ms':>8} {'new fps':>8}")
+    for count in args.counts:
+        random.seed(0)
+        start_y = [random.uniform(0, HEIGHT) for _ in range(count)]
+        xs = [random.randint(50, WIDTH - 50) for _ in range(count)]
+        speeds = [random.uniform(0.6, 1.4) for _ in range(count)]
+
+        old = [{"x": x, "y": y, "vy": vy} for x, y, vy in zip(xs, start_y, speeds)]
+        store = EntityStore(count)
+        store.spawn(xs, start_y, vy=speeds)
+        old_time = run(old_frame, old, target, image, args.frames)
+        new_time = run(new_frame, store, target, rle_image, args.frames)
+        print(f"{count:7d} {1000 * old_time:8.2f} {1000 * new_time:8.2f} {1 / new_time:8.1f}")
+    pygame.quit()
@@ -0,0 +1,94 @@
+import numpy as np
+
+
+class EntityStore:
+    """Falling objects as NumPy arrays of position and velocity, live ones packed at the front.
+
+    Movement and the overlap tests run over every live object at once.
+    Removing objects moves the last live ones into the holes (swap-remove),
+    so it costs as much as the number removed, not the number alive, and
+    the arrays never have gaps. Object order is not kept.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.vx = np.zeros(capacity)
+        self.vy = np.zeros(capacity)
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def spawn(self, x, y, vx=0.0, vy=1.0):
+        """Add objects (scalars or equal-length arrays); returns how many fit."""
+        x = np.atleast_1d(x)
+        room = min(len(x), self.capacity - self.count)
+        start, end = self.count, self.count + room
+        self.x[start:end] = x[:room]
+        # Scalars broadcast; arrays are cut to what fits
+        for array, value in ((self.y, y), (self.vx, vx), (self.vy, vy)):
+            array[start:end] = value if np.ndim(value) == 0 else value[:room]
+        self.count = end
+        return room
+
+    def step(self, scale=1.0):
+        """Move every live object by its velocity times scale."""
+        n = self.count
+        self.x[:n] += self.vx[:n] * scale
+        self.y[:n] += self.vy[:n] * scale
+
+    def inside(self, left, top, right, bottom):
+        """Mask of the live objects whose position is strictly inside the box."""
+        n = self.count
+        x, y = self.x[:n], self.y[:n]
+        return (left < x) & (x < right) & (top < y) & (y < bottom)
+
+    def below(self, limit):
+        """Mask of the live objects further down than limit."""
+        return self.y[:self.count] > limit
+
+    def remove(self, mask):
+        """Despawn the live objects where mask is True; returns how many went."""
+        removed = np.flatnonzero(mask)
+        if len(removed) == 0:
+            return 0
+        end = self.count - len(removed)
+        # Holes in the part that stays get the survivors from the part that goes
+        holes = removed[removed < end]
+        if len(holes):
+            tail = np.ones(self.count - end, bool)
+            tail[removed[removed >= end] - end] = False
+            survivors = end + np.flatnonzero(tail)
+            for array in (self.x, self.y, self.vx, self.vy):
+                array[holes] = array[survivors]
+        self.count = end
+        return len(removed)
+
+    def clear(self):
+        self.count = 0
+
+    def positions(self):
+        # (x, y) in whole pixels for drawing
+        n = self.count
+        return zip(self.x[:n].astype(np.int32).tolist(), self.y[:n].astype(np.int32).tolist())
+
+
+class Waves:
+    """How many objects to add each frame.
+
+    keep objects are always falling: each one caught or missed is replaced
+    straight away, like the game always did with a single object. On top of
+    that, size more arrive every frames frames, up to the store's capacity.
+    """
+
+    def __init__(self, keep=1, size=0, every=0):
+        self.keep = keep
+        self.size = size
+        self.every = every
+
+    def due(self, frame_number, alive):
+        """(replacements, wave size) to spawn this frame."""
+        wave = self.size if self.size and self.every and frame_number % self.every == 0 else 0
+        return max(0, self.keep - alive), wave
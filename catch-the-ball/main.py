@@ -1,16 +1,70 @@
+import argparse
+import os
+import sys
 import pygame
 import random
+import time
 import cv2
 import mediapipe as mp
-import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.audio import AudioManager
+from common.hud import Hud
+from common.head_tracker import HeadTracker
+from common.motion import Steering
+from common.frame_source import open_source
+from common.preview import CameraPreview
+from common.render_queue import RenderQueue
+from common.replay import Recorder, Replay, new_seed, state_hash
+from common.telemetry import Telemetry
+from entities import EntityStore, Waves
+
+parser = argparse.ArgumentParser(description="Star Wars - Object Collection")
+parser.add_argument("--seed", type=int, help="seed for where objects fall (random by default)")
+parser.add_argument("--record", metavar="FILE", help="save the seed and every frame's movement to FILE")
+parser.add_argument("--replay", metavar="FILE", help="re-run a recording headless and check its final state")
+parser.add_argument("--pose", choices=["full", "roi"], default="full",
+                    help="roi tracks a downscaled crop around the player and adapts the model size (cheaper)")
+parser.add_argument("--objects", type=int, default=1, help="how many objects are always falling")
+parser.add_argument("--wave-size", type=int, default=0, help="extra objects dropped every --wave-every frames")
+parser.add_argument("--wave-every", type=int, default=90, help="frames between waves")
+parser.add_argument("--max-objects", type=int, default=5000, help="waves stop adding objects past this many")
+parser.add_argument("--source", default="auto",
+                    help="camera index, video file, image directory or glob (default: the camera used last time)")
+parser.add_argument("--telemetry", action="store_true",
+                    help="time each stage of a frame, show the timings on screen and print them at exit")
+parser.add_argument("--trace", metavar="FILE", help="also write every timed stage to FILE (Chrome trace JSON)")
+args = parser.parse_args()
+telemetry = Telemetry(args.telemetry, args.trace)
+
+# A replay feeds the recorded movement back without a camera, window, sleeping or drawing
+replay = Replay(args.replay, "catch-the-ball") if args.replay else None
+if replay:
+    os.environ["SDL_VIDEODRIVER"] = "dummy"
+    os.environ["SDL_AUDIODRIVER"] = "dummy"
+    seed = replay.seed
+    # Recordings from before waves existed had one object at a time
+    for name, default in (("objects", 1), ("wave_size", 0), ("wave_every", 90), ("max_objects", 5000)):
+        setattr(args, name, replay.header.get(name, default))
+else:
+    seed = new_seed() if args.seed is None else args.seed
+random.seed(seed)
 
 # Initialize Pygame
 pygame.init()
 
 # Screen dimensions
-screen_info = pygame.display.Info()
-WIDTH, HEIGHT = screen_info.current_w, screen_info.current_h  # Full-screen size
-screen = pygame.display.set_mode((WIDTH, HEIGHT), pygame.FULLSCREEN)
+if replay:
+    WIDTH, HEIGHT = replay.header["width"], replay.header["height"]  # Same size as the recording
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+else:
+    screen_info = pygame.display.Info()
+    WIDTH, HEIGHT = screen_info.current_w, screen_info.current_h  # Full-screen size
+    screen = pygame.display.set_mode((WIDTH, HEIGHT), pygame.FULLSCREEN)
+# Movement is stored as -1 (left), 0 or 1 (right) per frame
+recorder = Recorder(args.record, "catch-the-ball", seed, "b", width=WIDTH, height=HEIGHT, objects=args.objects,
+                    wave_size=args.wave_size, wave_every=args.wave_every,
+                    max_objects=args.max_objects) if args.record else None
 pygame.display.set_caption("Star Wars - Object Collection")
 
 # Load sounds
@@ -19,8 +73,10 @@ pygame.mixer.music.load("resources/background_music.mp3")  # Background music
 pygame.mixer.music.set_volume(0.5)  # Adjust volume
 pygame.mixer.music.play(-1)  # Loop indefinitely
 
-score_sound = pygame.mixer.Sound("resources/food_eat.mp3")  # Play when object is collected
-miss_sound = pygame.mixer.Sound("resources/sound_1.mp3")  # Play when object is missed
+# Sound effects, decoded on first play and cached on disk; with many objects a catch or miss can happen every frame
+audio = AudioManager(channels=4)
+audio.add("score", "resources/food_eat.mp3", priority=1, min_interval=0.1)  # Play when object is collected
+audio.add("miss", "resources/sound_1.mp3", min_interval=0.2)  # Play when object is missed
 
 # Load player image (Bigger height)
 player_image = pygame.image.load("resources/player.png").convert_alpha()
@@ -29,11 +85,18 @@ player_image = pygame.transform.scale(player_image, (200, 180))  # Increased hei
 # Load falling object (Bigger size)
 object_image = pygame.image.load("resources/object_1.png").convert_alpha()
 object_image = pygame.transform.scale(object_image, (100, 100))  # Increased size
+object_image.set_alpha(255, pygame.RLEACCEL)  # Skips the transparent half of the sprite; 4x faster with many objects
 
 # Colors
 WHITE = (255, 255, 255)
 GREEN = (0, 255, 0)  # Reference point marker color
 
+# Sprites are queued each frame and drawn with a blits call per layer, over a plain white background
+render_queue = RenderQueue(screen, background=WHITE)
+
+# Score text; the font and digits are rendered once, not every frame
+score_hud = Hud("Arial", 40, (0, 0, 0))
+
 # Game Variables
 player_x = WIDTH // 2
 player_y = HEIGHT - 200  # Adjusted for larger player image
@@ -42,157 +105,187 @@ player_speed = base_player_speed  # Dynamic speed that changes with difficulty
 falling_speed = 5  # Base speed of falling objects
 score = 0
 
-# Initialize Mediapipe
-mp_pose = mp.solutions.pose
-pose = mp_pose.Pose()
-mp_draw = mp.solutions.drawing_utils
-
-# Function to list available cameras
-def list_cameras():
-    available_cameras = []
-    for i in range(5):  # Check first 5 indices for available cameras
-        cap = cv2.VideoCapture(i)
-        if cap.read()[0]:  # If camera is available, add it to list
-            available_cameras.append(i)
-        cap.release()
-    return available_cameras
-
-# Allow user to select a camera
-available_cams = list_cameras()
-if len(available_cams) > 1:
+# Called when camera discovery finds more than one
+def choose_camera(available_cams):
     print("\n🎥 Multiple cameras detected:")
     for cam in available_cams:
         print(f"[{cam}] Camera {cam}")
-    selected_cam = int(input("Enter the camera index to use: "))
-else:
-    selected_cam = available_cams[0] if available_cams else 0  # Default to first available camera
+    return int(input("Enter the camera index to use: "))
 
-# Open selected camera
-cap = cv2.VideoCapture(selected_cam)
-cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
+# The camera is only needed for live play
+if not replay:
+    # Initialize Mediapipe
+    mp_pose = mp.solutions.pose
+    pose = HeadTracker() if args.pose == "roi" else mp_pose.Pose()
+    mp_draw = mp.solutions.drawing_utils
 
-# Store previous head positions for movement smoothing
-prev_head_positions = []
-SMOOTHING_FRAMES = 5
-MOVE_THRESHOLD = 40  # Increased to prevent unnecessary movements
+    # Open the camera (remembered from last time, or picked from a parallel scan), a video or images
+    cap = open_source(args.source, 640, 480, choose=choose_camera)
 
-# Define center point for user movement tracking
-CAM_WIDTH = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))  # Get actual camera width
-CAM_HEIGHT = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))  # Get actual camera height
-CAM_CENTER = CAM_WIDTH // 2  # The center of the camera frame
+    MOVE_THRESHOLD = 40  # Increased to prevent unnecessary movements
 
-# Scaling factor to map camera movements to screen
-screen_scaling_factor = WIDTH / CAM_WIDTH  
+    # Define center point for user movement tracking
+    CAM_WIDTH = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))  # Get actual camera width
+    CAM_HEIGHT = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))  # Get actual camera height
+    CAM_CENTER = CAM_WIDTH // 2  # The center of the camera frame
 
-# Create falling objects
-objects = [{"x": random.randint(50, WIDTH - 50), "y": 0}]
-def spawn_object():
-    objects.append({"x": random.randint(50, WIDTH - 50), "y": 0})
-
-# Game loop
-running = True
-clock = pygame.time.Clock()
-
-while running:
-    screen.fill(WHITE)
+    # Filters the head position and decides left/right/stay, with hysteresis around the threshold
+    steering = Steering(CAM_CENTER, MOVE_THRESHOLD)
 
-    # Capture webcam frame
-    ret, frame = cap.read()
-    if not ret:
-        print("❌ ERROR: Camera not working!")
-        break
+    # Scaling factor to map camera movements to screen
+    screen_scaling_factor = WIDTH / CAM_WIDTH  
 
-    # **Fix: Correct Camera Orientation**
-    frame = cv2.flip(frame, 1)  # Flip horizontally for correct mirroring
-    frame = cv2.resize(frame, (640, 480))  # Ensure correct aspect ratio
+    # Camera preview, drawn the way round the camera sees it (undoing the mirror flip)
+    preview = CameraPreview((350, 350), flip=1)  # Increased size
 
-    # Convert frame to RGB for Mediapipe
-    frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-    results = pose.process(frame_rgb)
+# Falling objects; each falls at falling_speed times its own vy
+objects = EntityStore(max(args.max_objects, args.objects))
+waves = Waves(args.objects, args.wave_size, args.wave_every)
+def spawn_objects(count, wave=False):
+    if not count:
+        return
+    xs = [random.randint(50, WIDTH - 50) for _ in range(count)]
+    # Objects in a wave fall at different speeds, so they spread out instead of landing in a line
+    vy = [random.uniform(0.6, 1.4) for _ in range(count)] if wave else 1.0
+    objects.spawn(xs, 0, vy=vy)
 
-    # Draw reference point on user camera feed
-    # cv2.line(frame, (CAM_CENTER - MOVE_THRESHOLD, 0), (CAM_CENTER - MOVE_THRESHOLD, CAM_HEIGHT), GREEN, 2)  # Left marker
-    # cv2.line(frame, (CAM_CENTER + MOVE_THRESHOLD, 0), (CAM_CENTER + MOVE_THRESHOLD, CAM_HEIGHT), GREEN, 2)  # Right marker
+spawn_objects(waves.keep)
 
-    # Draw skeleton outline on the user
-    if results.pose_landmarks:
-        mp_draw.draw_landmarks(frame, results.pose_landmarks, mp_pose.POSE_CONNECTIONS)
-
-        # Get nose position (user's head center)
-        nose = results.pose_landmarks.landmark[mp_pose.PoseLandmark.NOSE]
-        head_x = int(nose.x * CAM_WIDTH)
-
-        # Store last few head positions for smoothing
-        prev_head_positions.append(head_x)
-        if len(prev_head_positions) > SMOOTHING_FRAMES:
-            prev_head_positions.pop(0)
+# Game loop
+running = True
+clock = pygame.time.Clock()
+frame_number = 0
 
-        # Smooth head position
-        smoothed_head_x = np.mean(prev_head_positions)
+while running:
+    move = 0
+    if replay:
+        if frame_number == len(replay.ticks):
+            break
+        move = replay.ticks[frame_number]
+    else:
+        # Capture webcam frame
+        with telemetry.span("camera read"):
+            ret, frame = cap.read()
+        captured_at = time.perf_counter()
+        if not ret:
+            print(f"❌ ERROR: No frame from {cap}!")
+            break
+
+        # **Fix: Correct Camera Orientation**
+        with telemetry.span("flip resize"):
+            frame = cv2.flip(frame, 1)  # Flip horizontally for correct mirroring
+            frame = cv2.resize(frame, (640, 480))  # Ensure correct aspect ratio
+
+        # Convert frame to RGB for Mediapipe
+        with telemetry.span("bgr to rgb"):
+            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        with telemetry.span("pose"):
+            results = pose.process(frame_rgb)
+
+        # Draw reference point on user camera feed
+        # cv2.line(frame, (CAM_CENTER - MOVE_THRESHOLD, 0), (CAM_CENTER - MOVE_THRESHOLD, CAM_HEIGHT), GREEN, 2)  # Left marker
+        # cv2.line(frame, (CAM_CENTER + MOVE_THRESHOLD, 0), (CAM_CENTER + MOVE_THRESHOLD, CAM_HEIGHT), GREEN, 2)  # Right marker
+
+        # Draw skeleton outline on the user
+        if results.pose_landmarks:
+            with telemetry.span("draw skeleton"):
+                mp_draw.draw_landmarks(frame, results.pose_landmarks, mp_pose.POSE_CONNECTIONS)
+
+            # Get nose position (user's head center)
+            nose = results.pose_landmarks.landmark[mp_pose.PoseLandmark.NOSE]
+            head_x = nose.x * CAM_WIDTH
+
+            # Move player based on center reference point
+            move = steering.update(head_x, captured_at)
+
+        # Shrink the frame into the preview surface in place
+        with telemetry.span("preview"):
+            render_queue.add(preview.update(frame), (WIDTH - 360, 20))  # Adjusted position
+
+        # Handle Pygame events
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_ESCAPE:
+                    running = False
+    frame_number += 1
+    logic_span = telemetry.span("logic").begin()
 
-        # Move player based on center reference point
-        if smoothed_head_x > CAM_CENTER + MOVE_THRESHOLD:  # Move right
-            player_x += player_speed
-        elif smoothed_head_x < CAM_CENTER - MOVE_THRESHOLD:  # Move left
-            player_x -= player_speed
+    if recorder:
+        recorder.write(move)
+    player_x += move * player_speed
 
     # Keep player within screen boundaries
     player_x = max(0, min(WIDTH - player_image.get_width(), player_x))
 
-    # Convert OpenCV frame to Pygame surface
-    frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-    frame = np.rot90(frame)  # Ensure Correct Rotation
-    frame = pygame.surfarray.make_surface(frame)
-    frame = pygame.transform.scale(frame, (350, 350))  # Increased size
-    screen.blit(frame, (WIDTH - 360, 20))  # Adjusted position
-
-    # Handle Pygame events
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
-        if event.type == pygame.KEYDOWN:
-            if event.key == pygame.K_ESCAPE:
-                running = False
-
     # **Increase Player Speed with Falling Speed**
     if score % 5 == 0 and score > 0:
         falling_speed += 0.05  # Increase falling speed
         player_speed = base_player_speed + (falling_speed - 5) * 1.5  # Scale player speed
 
     # Update falling objects
-    for obj in objects:
-        obj["y"] += falling_speed
-
-        # Check collision with player
-        if (player_x < obj["x"] < player_x + player_image.get_width() and
-                player_y < obj["y"] < player_y + player_image.get_height()):
-            score += 1
-            pygame.mixer.Sound.play(score_sound)  # Play score sound
-            objects.remove(obj)
-            spawn_object()
-
-        # Remove objects that fall off-screen & respawn
-        if obj["y"] > HEIGHT:
-            pygame.mixer.Sound.play(miss_sound)  # Play miss sound
-            objects.remove(obj)
-            spawn_object()
+    objects.step(falling_speed)
+
+    # Check collision with player
+    caught = objects.inside(player_x, player_y, player_x + player_image.get_width(),
+                            player_y + player_image.get_height())
+    missed = objects.below(HEIGHT) & ~caught  # Objects that fall off-screen
+    if caught.any():
+        score += int(caught.sum())
+        telemetry.count("caught", int(caught.sum()))
+        audio.play("score")  # Play score sound
+    if missed.any():
+        telemetry.count("missed", int(missed.sum()))
+        audio.play("miss")  # Play miss sound
+    objects.remove(caught | missed)
+
+    # Replace what was caught or missed, and drop the next wave
+    refill, wave = waves.due(frame_number, len(objects))
+    spawn_objects(refill)
+    spawn_objects(wave, wave=True)
+    logic_span.end()
+
+    if replay:
+        telemetry.frame()
+        continue
+
+    draw_span = telemetry.span("draw").begin()
 
     # Draw falling objects
-    for obj in objects:
-        screen.blit(object_image, (obj["x"], obj["y"]))
+    render_queue.extend(object_image, objects.positions(), layer=1)
 
     # Draw player
-    screen.blit(player_image, (player_x, player_y))
+    render_queue.add(player_image, (player_x, player_y), layer=2)
+    render_queue.flush()
 
     # Draw score
-    font = pygame.font.SysFont("Arial", 40)
-    score_text = font.render(f"Score: {score}", True, (0, 0, 0))
-    screen.blit(score_text, (20, 20))
-
-    pygame.display.update()
-    clock.tick(30)
-
-cap.release()
-cv2.destroyAllWindows()
+    score_hud.draw_score(screen, score, (20, 20))
+    telemetry.draw_overlay(screen, (20, 70))
+    draw_span.end()
+
+    with telemetry.span("display update"):
+        pygame.display.update()
+    with telemetry.span("wait"):
+        clock.tick(30)
+    telemetry.frame()
+
+# Hashed as the list of dicts the objects used to be, so recordings from before still check out:
+# y was an int until falling_speed first became a float, and new objects start at int 0
+integer_y = isinstance(falling_speed, int)
+object_state = [{"x": int(x), "y": int(y) if integer_y or y == 0 else y} for x, y in
+                zip(objects.x[:len(objects)].tolist(), objects.y[:len(objects)].tolist())]
+final_hash = state_hash(player_x, player_speed, falling_speed, score, object_state)
+if recorder:
+    recorder.close(final_hash)
+if not replay:
+    cap.release()
+    if args.pose == "roi":
+        print(pose.report())
+    print(audio.report())
+    cv2.destroyAllWindows()
+if telemetry.enabled:
+    print(telemetry.close())
 pygame.quit()
+if replay:
+    sys.exit(0 if replay.check(final_hash) else 1)
@@ -0,0 +1,133 @@
+"""Sound effects for the games: decoded once, played on a budget.
+
+Decoding an MP3 takes a few milliseconds per clip, every time a game
+starts. Each clip is decoded once and its samples are written to a cache
+file named after a hash of the clip's bytes and the mixer format, so a
+changed clip or a different output format never picks up stale samples.
+Later runs load the raw samples, skipping the decoder. Clips load on
+first play unless preload() is called.
+
+Effects play on a few reserved mixer channels. When all of them are busy,
+a sound takes the channel of the lowest-priority sound playing, if that
+one is lower than its own, and is dropped otherwise. Each clip can also
+have a minimum interval, so a burst of triggers plays it once.
+
+Background music is left to pygame.mixer.music, which streams and
+decodes on the audio thread as it plays.
+"""
+import hashlib
+import os
+import time
+
+import pygame
+
+CACHE_DIR = os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"),
+                         "camera-games", "audio")
+
+
+class Clip:
+    def __init__(self, path, priority, min_interval, volume):
+        self.path = path
+        self.priority = priority
+        self.min_interval = min_interval
+        self.volume = volume
+        self.sound = None
+        self.last_played = None
+
+
+class AudioManager:
+    def __init__(self, channels=4, cache_dir=CACHE_DIR):
+        if not pygame.mixer.get_init():
+            pygame.mixer.init()
+        self.cache_dir = cache_dir
+        if pygame.mixer.get_num_channels() < channels:
+            pygame.mixer.set_num_channels(channels)
+        pygame.mixer.set_reserved(channels)  # Channels 0 to channels-1 are only played on from here
+        self.channels = [pygame.mixer.Channel(i) for i in range(channels)]
+        self.playing = [None] * channels  # Clip last started on each channel
+        self.started = [0.0] * channels
+        self.clips = {}
+
+        self.decoded = []  # (clip name, seconds) for clips decoded from their file
+        self.cached = []  # (clip name, seconds) for clips loaded from the cache
+        self.played = 0
+        self.stolen = 0  # Plays that cut a lower-priority sound short
+        self.dropped_busy = 0  # No channel free and nothing lower-priority playing
+        self.dropped_rate = 0  # Too soon after the same clip
+
+    def add(self, name, path, priority=0, min_interval=0.0, volume=1.0):
+        """Register a clip; higher priority sounds can cut lower ones short."""
+        self.clips[name] = Clip(path, priority, min_interval, volume)
+
+    def cache_path(self, path):
+        with open(path, "rb") as f:
+            digest = hashlib.sha256(f.read())
+        digest.update(repr(pygame.mixer.get_init()).encode())  # (frequency, format, channels)
+        return os.path.join(self.cache_dir, digest.hexdigest() + ".pcm")
+
+    def sound(self, name):
+        """The clip's pygame Sound, loaded from the cache or decoded on first use."""
+        clip = self.clips[name]
+        if clip.sound is not None:
+            return clip.sound
+
+        start = time.perf_counter()
+        cache_path = self.cache_path(clip.path)
+        try:
+            with open(cache_path, "rb") as f:
+                clip.sound = pygame.mixer.Sound(buffer=f.read())
+            self.cached.append((name, time.perf_counter() - start))
+        except OSError:
+            clip.sound = pygame.mixer.Sound(clip.path)
+            self.decoded.append((name, time.perf_counter() - start))
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                with open(cache_path + ".tmp", "wb") as f:
+                    f.write(clip.sound.get_raw())
+                os.replace(cache_path + ".tmp", cache_path)  # Never leave a half-written cache file
+            except OSError:
+                pass  # Only costs a decode next time
+        clip.sound.set_volume(clip.volume)
+        return clip.sound
+
+    def preload(self):
+        for name in self.clips:
+            self.sound(name)
+
+    def play(self, name):
+        """Play a clip if the budget allows; returns whether it played."""
+        clip = self.clips[name]
+        now = time.perf_counter()
+        if clip.last_played is not None and now - clip.last_played < clip.min_interval:
+            self.dropped_rate += 1
+            return False
+        sound = self.sound(name)
+
+        slot = None
+        for i, channel in enumerate(self.channels):
+            if not channel.get_busy():
+                slot = i
+                break
+        if slot is None:
+            # Everything is busy: cut short the lowest-priority sound (the oldest of those), if it ranks below this one
+            slot = min(range(len(self.channels)), key=lambda i: (self.playing[i].priority, self.started[i]))
+            if self.playing[slot].priority >= clip.priority:
+                self.dropped_busy += 1
+                return False
+            self.stolen += 1
+
+        self.channels[slot].play(sound)
+        self.playing[slot] = clip
+        self.started[slot] = now
+        clip.last_played = now
+        self.played += 1
+        return True
+
+    def report(self):
+        decoded = sum(seconds for _, seconds in self.decoded)
+        cached = sum(seconds for _, seconds in self.cached)
+        dropped = self.dropped_busy + self.dropped_rate
+        return (f"Sounds: {len(self.decoded)} decoded in {1000 * decoded:.1f} ms, "
+                f"{len(self.cached)} loaded from cache in {1000 * cached:.1f} ms; "
+                f"{self.played} played ({self.stolen} cut another short), {dropped} dropped "
+                f"({self.dropped_rate} too soon after the last, {self.dropped_busy} with no channel free)")
@@ -0,0 +1,63 @@
+"""Sound loading time with and without the PCM cache, and the channel budget under a burst of triggers.
+
+    python common/bench_audio.py
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+from common.audio import AudioManager
+
+CLIPS = {
+    "food_eat": "catch-the-ball/resources/food_eat.mp3",
+    "game_over": "catch-the-ball/resources/game_over.mp3",
+    "sound_1": "catch-the-ball/resources/sound_1.mp3",
+}
+
+
+def load_all(cache_dir):
+    audio = AudioManager(cache_dir=cache_dir)
+    for name, path in CLIPS.items():
+        audio.add(name, os.path.join(ROOT, path))
+    start = time.perf_counter()
+    audio.preload()
+    return time.perf_counter() - start
+
+
+def burst(triggers, interval, cache_dir):
+    # Triggers every interval seconds, alternating a common low-priority clip with a rarer important one
+    audio = AudioManager(channels=4, cache_dir=cache_dir)
+    audio.add("miss", os.path.join(ROOT, CLIPS["sound_1"]), min_interval=0.2)
+    audio.add("score", os.path.join(ROOT, CLIPS["food_eat"]), priority=1, min_interval=0.1)
+    audio.preload()
+    for i in range(triggers):
+        audio.play("score" if i % 4 == 0 else "miss")
+        time.sleep(interval)
+    return audio
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Audio loading and channel budget")
+    parser.add_argument("--triggers", type=int, default=300)
+    parser.add_argument("--interval-ms", type=float, default=10)
+    args = parser.parse_args()
+
+    pygame.mixer.init()
+    start = time.perf_counter()
+    for path in CLIPS.values():
+        pygame.mixer.Sound(os.path.join(ROOT, path))
+    print(f"pygame.mixer.Sound on every MP3: {1000 * (time.perf_counter() - start):6.1f} ms")
+    with tempfile.TemporaryDirectory() as cache_dir:
+        print(f"first run (decode, fill cache):  {1000 * load_all(cache_dir):6.1f} ms")
+        print(f"later runs (from cache):         {1000 * load_all(cache_dir):6.1f} ms")
+        audio = burst(args.triggers, args.interval_ms / 1000, cache_dir)
+    print(f"{args.triggers} triggers {args.interval_ms:g} ms apart: {audio.report()}")
+    pygame.quit()
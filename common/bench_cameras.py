@@ -0,0 +1,84 @@
+"""Camera discovery time: the old one-index-at-a-time scan, the parallel scan, and the cache.
+
+    python common/bench_cameras.py
+    python common/bench_cameras.py --fake 0 2 --open-ms 800   # no camera here: pretend
+
+With --fake, cv2.VideoCapture is replaced by a stand-in where the given
+indices work and every open takes --open-ms, about what a missing V4L2 or
+DirectShow device costs before it gives up.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import cv2
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common import frame_source
+from common.frame_source import CAMERA_INDICES, find_cameras, open_camera
+
+
+def install_fake_cameras(working, open_ms):
+    class FakeCapture:
+        def __init__(self, index=0, *args):
+            time.sleep(open_ms / 1000)  # Releases the GIL, like OpenCV's own waiting
+            self.available = index in working
+
+        def isOpened(self):
+            return self.available
+
+        def read(self):
+            return self.available, None
+
+        def set(self, prop, value):
+            return True
+
+        def release(self):
+            pass
+
+    cv2.VideoCapture = FakeCapture
+
+
+def sequential_scan(indices=CAMERA_INDICES):
+    # What catch-the-ball/main.py used to do
+    available = []
+    for i in indices:
+        cap = cv2.VideoCapture(i)
+        if cap.read()[0]:
+            available.append(i)
+        cap.release()
+    return available
+
+
+def timed(function, *args, **kwargs):
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="How long finding a camera takes")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--fake", type=int, nargs="*", metavar="INDEX",
+                        help="pretend these camera indices work instead of using the real ones")
+    parser.add_argument("--open-ms", type=float, default=800, help="how long each fake open takes")
+    args = parser.parse_args()
+    if args.fake is not None:
+        install_fake_cameras(set(args.fake), args.open_ms)
+
+    print(f"{'method':>16} {'seconds':>8}  cameras")
+    for _ in range(args.repeat):
+        seconds, found = timed(sequential_scan)
+        print(f"{'sequential scan':>16} {seconds:8.3f}  {found}")
+        seconds, found = timed(find_cameras)
+        print(f"{'parallel scan':>16} {seconds:8.3f}  {found}")
+
+    # A cache in a scratch file, so the real one is left alone
+    with tempfile.TemporaryDirectory() as tmp:
+        frame_source.CAMERA_CACHE = os.path.join(tmp, "camera.json")
+        for label in ("first open", "cached open"):
+            seconds, camera = timed(open_camera, 640, 480)
+            camera.release()
+            print(f"{label:>16} {seconds:8.3f}  {camera}")
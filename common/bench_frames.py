@@ -0,0 +1,241 @@
+"""Headless frame-time benchmark for every game.
+
+Each game runs in its own process under the SDL dummy video and audio
+drivers, with scripted key presses and synthetic (or recorded) camera
+frames in place of the webcam. pygame.time.Clock is swapped for one that
+records the time between tick() calls instead of sleeping, so a frame is
+one pass of the game's own loop. Results are printed, and written as JSON
+with --json so runs can be compared across commits.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import runpy
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# name: (directory, script)
+GAMES = {
+    "snake": ("snake-game", "main.py"),
+    "flappy-bird": ("flippy-bird", "main.py"),
+    "flappy-bird-basic": ("flippy-bird", "main-basic.py"),
+    "catch-the-ball": ("catch-the-ball", "main.py"),
+}
+WARMUP_FRAMES = 10
+SYNTHETIC_FRAMES = 30  # Distinct camera frames, generated up front and looped
+CAMERA_FPS = 30  # read() blocks like a real webcam would
+
+
+def scripted_keys(game, frame, rng):
+    """Key presses for one frame; seeded so every run sees the same input."""
+    import pygame
+
+    keys = []
+    if game == "snake":
+        if frame % 45 == 0:
+            keys.append(pygame.K_RETURN)  # Starts the game, or restarts it after game over
+        if frame % 7 == 3:
+            keys.append(rng.choice([pygame.K_UP, pygame.K_DOWN, pygame.K_LEFT, pygame.K_RIGHT]))
+    elif game.startswith("flappy-bird") and rng.random() < 0.08:
+        keys.append(pygame.K_SPACE)
+    return [pygame.event.Event(pygame.KEYDOWN, key=key, mod=0, unicode="", scancode=0) for key in keys]
+
+
+def synthetic_frames(width=640, height=480):
+    # A bright blob drifting over a gradient, so frames differ like a real feed
+    import numpy as np
+
+    y, x = np.mgrid[0:height, 0:width]
+    frames = []
+    for i in range(SYNTHETIC_FRAMES):
+        cx = width * (0.3 + 0.4 * i / SYNTHETIC_FRAMES)
+        blob = ((x - cx) ** 2 + (y - height / 2) ** 2 < 60 ** 2) * 200
+        frame = np.stack([(x * 255 // width), (y * 255 // height), blob], axis=-1)
+        frames.append(frame.astype(np.uint8))
+    return frames
+
+
+def install_fake_camera(video):
+    import cv2
+
+    real_capture = cv2.VideoCapture
+    frames = None if video else synthetic_frames()
+
+    class FakeCapture:
+        """Stands in for cv2.VideoCapture: index 0 plays the clip or the synthetic frames."""
+
+        def __init__(self, index=0, *args):
+            self.available = index == 0
+            self.source = real_capture(video) if video and self.available else None
+            self.count = 0
+            self.next_frame_at = time.perf_counter()
+
+        def isOpened(self):
+            return self.available
+
+        def read(self):
+            if not self.available:
+                return False, None
+            self.count += 1
+            delay = self.next_frame_at - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            self.next_frame_at = max(self.next_frame_at, time.perf_counter() - 1 / CAMERA_FPS) + 1 / CAMERA_FPS
+            if self.source is None:
+                return True, frames[self.count % len(frames)].copy()
+            ok, frame = self.source.read()
+            if not ok:  # Loop the clip
+                self.source.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                ok, frame = self.source.read()
+            return ok, frame
+
+        def set(self, prop, value):
+            return True
+
+        def get(self, prop):
+            if prop == cv2.CAP_PROP_FRAME_WIDTH:
+                return 640
+            if prop == cv2.CAP_PROP_FRAME_HEIGHT:
+                return 480
+            return 0
+
+        def release(self):
+            if self.source is not None:
+                self.source.release()
+
+    cv2.VideoCapture = FakeCapture
+
+
+def run_child(game, frames, video, output):
+    """Runs inside the game's process: patch pygame and the camera, then exec the game."""
+    import pygame
+
+    directory, script = GAMES[game]
+    os.chdir(os.path.join(ROOT, directory))
+    sys.path.insert(0, os.getcwd())
+    sys.argv = [script]
+    if game != "flappy-bird-basic" and game != "snake":
+        install_fake_camera(video)
+        sys.argv += ["--source", "0"]  # The fake camera, without scanning or touching the camera cache
+
+    rng = random.Random(0)
+    random.seed(0)
+    frame_times = []
+    last = [None]
+    real_get = pygame.event.get
+
+    class BenchClock:
+        def tick(self, framerate=0):
+            now = time.perf_counter()
+            if last[0] is not None:
+                frame_times.append(now - last[0])
+            last[0] = now
+            # Report the frame time the game asked for, so fixed-timestep games still advance
+            return 1000 / framerate if framerate else 0
+
+    def get_events(*args, **kwargs):
+        real_get()  # Keep SDL's queue drained
+        frame = len(frame_times)
+        if frame >= frames + WARMUP_FRAMES:
+            return [pygame.event.Event(pygame.QUIT)]
+        return scripted_keys(game, frame, rng)
+
+    pygame.time.Clock = BenchClock
+    pygame.event.get = get_events
+
+    try:
+        runpy.run_path(script, run_name="__main__")
+    except SystemExit:
+        pass
+    with open(output, "w") as f:
+        json.dump(frame_times[WARMUP_FRAMES:WARMUP_FRAMES + frames], f)
+
+
+def percentile(sorted_values, p):
+    index = min(len(sorted_values) - 1, int(round(p / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def summarize(frame_times):
+    times = sorted(frame_times)
+    return {
+        "frames": len(times),
+        "mean_ms": 1000 * sum(times) / len(times),
+        "p50_ms": 1000 * percentile(times, 50),
+        "p95_ms": 1000 * percentile(times, 95),
+        "p99_ms": 1000 * percentile(times, 99),
+        "max_ms": 1000 * times[-1],
+        "fps": len(times) / sum(times),
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_game(game, frames, video):
+    env = dict(os.environ, SDL_VIDEODRIVER="dummy", SDL_AUDIODRIVER="dummy")
+    with tempfile.TemporaryDirectory() as tmp:
+        output = os.path.join(tmp, "frames.json")
+        command = [sys.executable, os.path.abspath(__file__), "--child", game,
+                   "--frames", str(frames), "--output", output]
+        if video:
+            command += ["--video", os.path.abspath(video)]
+        result = subprocess.run(command, env=env, stdin=subprocess.DEVNULL,
+                                stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+        if not os.path.exists(output):
+            raise RuntimeError(f"{game} failed:\n{result.stderr[-2000:]}")
+        with open(output) as f:
+            return summarize(json.load(f))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Frame-time benchmark for every game, headless")
+    parser.add_argument("games", nargs="*", metavar="GAME",
+                        help=f"games to run, out of {', '.join(GAMES)} (all by default)")
+    parser.add_argument("--frames", type=int, default=600)
+    parser.add_argument("--video", help="use this clip instead of synthetic camera frames")
+    parser.add_argument("--json", metavar="FILE", help="write the results to FILE")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--output", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child, args.frames, args.video, args.output)
+        sys.exit(0)
+    for game in args.games:
+        if game not in GAMES:
+            parser.error(f"unknown game {game!r}, choose from {', '.join(GAMES)}")
+
+    report = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "camera": args.video or "synthetic",
+        "games": {},
+    }
+    print(f"{'game':>18} {'frames':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'fps':>8}")
+    for game in args.games or GAMES:
+        try:
+            stats = run_game(game, args.frames, args.video)
+        except RuntimeError as e:
+            print(e, file=sys.stderr)
+            report["games"][game] = {"error": str(e)}
+            continue
+        report["games"][game] = stats
+        print(f"{game:>18} {stats['frames']:7d} {stats['p50_ms']:8.2f} {stats['p95_ms']:8.2f} "
+              f"{stats['p99_ms']:8.2f} {stats['fps']:8.1f}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
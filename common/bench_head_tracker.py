@@ -0,0 +1,100 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+import cv2
+import mediapipe as mp
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.head_tracker import HeadTracker, NOSE
+
+
+def nose_position(results, width, height):
+    if not results.pose_landmarks:
+        return None
+    nose = results.pose_landmarks.landmark[NOSE]
+    return nose.x * width, nose.y * height
+
+
+def compare(path, rotate=False, max_frames=None, **tracker_options):
+    """Run the full-frame Pose and the HeadTracker over a clip and compare nose positions.
+
+    The full-frame default-complexity model is taken as ground truth.
+    """
+    reference = mp.solutions.pose.Pose()
+    tracker = HeadTracker(**tracker_options)
+    capture = cv2.VideoCapture(path)
+
+    frames = reference_detections = tracker_detections = 0
+    reference_cost = tracker_cost = 0.0
+    errors = []
+    while max_frames is None or frames < max_frames:
+        ok, frame = capture.read()
+        if not ok:
+            break
+        if rotate:
+            frame = cv2.rotate(frame, cv2.ROTATE_90_CLOCKWISE)  # Like flippy-bird/main.py
+        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        height, width = frame_rgb.shape[:2]
+        frames += 1
+
+        start = time.perf_counter()
+        expected = nose_position(reference.process(frame_rgb), width, height)
+        reference_cost += time.perf_counter() - start
+
+        start = time.perf_counter()
+        actual = nose_position(tracker.process(frame_rgb), width, height)
+        tracker_cost += time.perf_counter() - start
+
+        reference_detections += expected is not None
+        tracker_detections += actual is not None
+        if expected is not None and actual is not None:
+            errors.append(((expected[0] - actual[0]) ** 2 + (expected[1] - actual[1]) ** 2) ** 0.5)
+
+    capture.release()
+    reference.close()
+    tracker.close()
+    if not frames:
+        raise ValueError(f"could not read any frames from {path}")
+
+    errors.sort()
+    return {
+        "clip": path,
+        "frames": frames,
+        "full_ms_per_frame": 1000 * reference_cost / frames,
+        "roi_ms_per_frame": 1000 * tracker_cost / frames,
+        "full_detection_rate": reference_detections / frames,
+        "roi_detection_rate": tracker_detections / frames,
+        "roi_full_frame_searches": tracker.full_frame_searches / frames,
+        "nose_error_px_median": errors[len(errors) // 2] if errors else None,
+        "nose_error_px_p95": errors[int(0.95 * (len(errors) - 1))] if errors else None,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Accuracy vs cost of ROI head tracking on recorded clips")
+    parser.add_argument("clips", nargs="+", help="video files recorded from the kiosk camera")
+    parser.add_argument("--rotate", action="store_true", help="rotate frames like the Flappy Bird camera")
+    parser.add_argument("--max-frames", type=int)
+    parser.add_argument("--budget-ms", type=float, default=25)
+    parser.add_argument("--max-input", type=int, default=256)
+    parser.add_argument("--json", metavar="FILE", help="write the results to FILE")
+    args = parser.parse_args()
+
+    rows = []
+    for clip in args.clips:
+        row = compare(clip, args.rotate, args.max_frames, budget_ms=args.budget_ms, max_input=args.max_input)
+        rows.append(row)
+        error = row["nose_error_px_median"]
+        print(f"{clip}: {row['frames']} frames")
+        print(f"  full frame: {row['full_ms_per_frame']:6.1f} ms/frame, nose found {100 * row['full_detection_rate']:.0f}%")
+        print(f"  roi:        {row['roi_ms_per_frame']:6.1f} ms/frame, nose found {100 * row['roi_detection_rate']:.0f}%, "
+              f"{100 * row['roi_full_frame_searches']:.0f}% full-frame searches")
+        if error is not None:
+            print(f"  nose error vs full frame: {error:.1f} px median, {row['nose_error_px_p95']:.1f} px p95")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(rows, f, indent=2)
@@ -0,0 +1,41 @@
+import argparse
+import os
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.hud import Hud
+
+
+def old_score(surface, score):
+    # What every game used to do each frame
+    font = pygame.font.SysFont("Arial", 30)
+    score_text = font.render(f"Score: {score}", True, (0, 0, 0))
+    surface.blit(score_text, (10, 10))
+
+
+def time_per_frame(draw, frames):
+    start = time.perf_counter()
+    for frame in range(frames):
+        draw(frame // 30)  # The score changes every second at 30 fps
+    return 1e6 * (time.perf_counter() - start) / frames
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="HUD cost per frame, old SysFont path vs the cached Hud")
+    parser.add_argument("--frames", type=int, default=3000)
+    args = parser.parse_args()
+
+    pygame.init()
+    surface = pygame.display.set_mode((500, 700))
+    hud = Hud("Arial", 30, (0, 0, 0))
+
+    old = time_per_frame(lambda score: old_score(surface, score), args.frames)
+    new = time_per_frame(lambda score: hud.draw_score(surface, score, (10, 10)), args.frames)
+    print(f"SysFont + render every frame: {old:8.1f} us/frame")
+    print(f"Hud digit atlas:              {new:8.1f} us/frame ({old / new:.0f}x faster)")
+    pygame.quit()
@@ -0,0 +1,122 @@
+"""Jump detection latency and false positives, old detector vs JumpDetector.
+
+Runs both detectors over head trajectories: CSV files with a header row
+and columns t (seconds), y (nose height, 0 at the top of the frame to 1 at
+the bottom) and optionally jump (1 on the sample where a real jump
+starts). flippy-bird/main.py --head-log FILE writes the first two; add the
+jump column by hand to get latency and miss numbers. Without files,
+synthetic trajectories are generated: camera jitter, dropped frames,
+bad landmark frames, slow leaning and real jumps at known times.
+"""
+import argparse
+import csv
+import math
+import os
+import random
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.motion import JumpDetector
+
+SCREEN_HEIGHT = 1080  # The old detector worked in screen pixels
+JUMP_WINDOW = 0.6  # A detection up to this long after an onset belongs to that jump
+
+
+class OldDetector:
+    # What flippy-bird/main.py did: 5-sample moving average, fixed 15 px threshold
+    def __init__(self):
+        self.positions = []
+
+    def update(self, y, t):
+        self.positions.append(int(y * SCREEN_HEIGHT))
+        if len(self.positions) > 5:
+            self.positions.pop(0)
+        mean = sum(self.positions) / len(self.positions)
+        return len(self.positions) >= 2 and self.positions[-2] - mean > 15
+
+
+def synthetic_trajectory(rng, seconds=120, fps=30):
+    """Returns (samples, onsets): samples are (t, y) pairs, onsets the jump start times."""
+    onsets = []
+    t = 2.0
+    while t < seconds - 2:
+        onsets.append(t)
+        t += rng.uniform(1.5, 4.0)
+    leans = [(rng.uniform(0, seconds), rng.uniform(1.0, 2.5), rng.uniform(-0.08, 0.08)) for _ in range(seconds // 10)]
+    jumps = [(onset, rng.uniform(0.35, 0.5), rng.uniform(0.06, 0.15)) for onset in onsets]
+
+    samples = []
+    t = 0.0
+    while t < seconds:
+        t += 1 / fps + rng.gauss(0, 0.004)
+        if rng.random() < 0.03:
+            continue  # Dropped frame
+        y = 0.4
+        for start, duration, distance in leans:
+            y += distance * min(1.0, max(0.0, (t - start) / duration))
+        for start, duration, height in jumps:
+            if start <= t < start + duration:
+                y -= height * math.sin(math.pi * (t - start) / duration)
+        y += rng.gauss(0, 0.003)
+        if rng.random() < 0.01:
+            y += rng.choice([-1, 1]) * rng.uniform(0.02, 0.06)  # Landmarks snapped to the wrong place
+        samples.append((t, y))
+    return samples, onsets
+
+
+def load_trajectory(path):
+    samples, onsets = [], []
+    with open(path, newline="") as f:
+        for row in csv.DictReader(f):
+            t, y = float(row["t"]), float(row["y"])
+            samples.append((t, y))
+            if row.get("jump") in ("1", "true", "True"):
+                onsets.append(t)
+    return samples, onsets
+
+
+def score(detector, samples, onsets):
+    detections = [t for t, y in samples if detector.update(y, t)]
+    latencies, false_positives = [], 0
+    hit = set()
+    for t in detections:
+        owner = next((onset for onset in onsets if onset <= t < onset + JUMP_WINDOW), None)
+        if owner is None:
+            false_positives += 1
+        elif owner not in hit:
+            hit.add(owner)
+            latencies.append(t - owner)
+    minutes = (samples[-1][0] - samples[0][0]) / 60
+    return {
+        "detections": len(detections),
+        "false_positives_per_minute": false_positives / minutes,
+        "missed": len(onsets) - len(hit),
+        "latency_ms": 1000 * sum(latencies) / len(latencies) if latencies else None,
+        "latency_p95_ms": 1000 * sorted(latencies)[int(0.95 * (len(latencies) - 1))] if latencies else None,
+    }
+
+
+def print_row(name, result, labelled):
+    line = f"  {name:>5}: {result['detections']:4d} detections"
+    if labelled:
+        line += f", {result['false_positives_per_minute']:5.1f} false/min, {result['missed']:3d} missed"
+        if result["latency_ms"] is not None:
+            line += f", latency {result['latency_ms']:5.0f} ms (p95 {result['latency_p95_ms']:.0f} ms)"
+    print(line)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Jump detection latency and false positives")
+    parser.add_argument("trajectories", nargs="*", help="CSV files with t,y[,jump] columns")
+    parser.add_argument("--synthetic", type=int, default=5, help="synthetic trajectories when no files are given")
+    args = parser.parse_args()
+
+    if args.trajectories:
+        runs = [(path, *load_trajectory(path)) for path in args.trajectories]
+    else:
+        runs = [(f"synthetic {i}", *synthetic_trajectory(random.Random(i))) for i in range(args.synthetic)]
+
+    for name, samples, onsets in runs:
+        print(f"{name}: {len(samples)} samples, {len(onsets)} labelled jumps")
+        print_row("old", score(OldDetector(), samples, onsets), bool(onsets))
+        print_row("new", score(JumpDetector(), samples, onsets), bool(onsets))
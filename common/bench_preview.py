@@ -0,0 +1,100 @@
+"""Compares the old camera preview code with CameraPreview, per frame.
+
+Allocations are what tracemalloc sees (NumPy arrays and Python objects).
+Pixel memory for the Surfaces the old code creates comes from SDL and is
+not counted, so the old numbers are a lower bound; whether a new Surface
+is made per frame is reported separately.
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+import cv2
+import numpy as np
+import pygame
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.preview import CameraPreview
+
+
+# The code each game ran before: frame in, new preview Surface out
+def old_flappy_preview(frame):
+    frame = cv2.flip(frame, 1)
+    frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    frame = pygame.surfarray.make_surface(frame)
+    return pygame.transform.scale(frame, (300, 300))
+
+
+def old_catch_preview(frame):
+    frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    frame = np.rot90(frame)
+    frame = pygame.surfarray.make_surface(frame)
+    return pygame.transform.scale(frame, (350, 350))
+
+
+def camera_frame(width=640, height=480):
+    # A gradient plus a bright corner, so a wrong flip or rotation shows up in --verify
+    y, x = np.mgrid[0:height, 0:width]
+    frame = np.stack([x * 255 // width, y * 255 // height, np.zeros_like(x)], axis=-1).astype(np.uint8)
+    frame[:height // 4, :width // 4] = 255
+    return frame
+
+
+# name: (input frame as the game has it, old preview, new preview)
+def cases():
+    camera = camera_frame()
+    return {
+        "flappy-bird": (cv2.rotate(camera, cv2.ROTATE_90_CLOCKWISE), old_flappy_preview,
+                        CameraPreview((300, 300), rotate=cv2.ROTATE_90_COUNTERCLOCKWISE).update),
+        "catch-the-ball": (cv2.flip(camera, 1), old_catch_preview,
+                           CameraPreview((350, 350), flip=1).update),
+    }
+
+
+def measure(preview, frame, frames):
+    preview(frame)  # Warm up
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    base = tracemalloc.get_traced_memory()[0]
+    peak = 0
+    start = time.perf_counter()
+    for _ in range(frames):
+        tracemalloc.reset_peak()
+        preview(frame)
+        peak = max(peak, tracemalloc.get_traced_memory()[1] - base)
+    elapsed = time.perf_counter() - start
+    tracemalloc.stop()
+    return 1000 * elapsed / frames, peak, preview(frame) is not preview(frame)
+
+
+def difference(old, new):
+    old = pygame.surfarray.array3d(old).astype(np.int16)
+    new = pygame.surfarray.array3d(new).astype(np.int16)
+    return float(np.abs(old - new).mean())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Camera preview cost, old path vs CameraPreview")
+    parser.add_argument("--frames", type=int, default=500)
+    parser.add_argument("--verify", action="store_true", help="check both paths show the same picture")
+    args = parser.parse_args()
+
+    pygame.init()
+    pygame.display.set_mode((1, 1))
+    failed = False
+    print(f"{'game':>15} {'path':>4} {'ms/frame':>9} {'alloc peak':>11} {'new Surface':>12}")
+    for name, (frame, old, new) in cases().items():
+        for label, preview in (("old", old), ("new", new)):
+            ms, peak, new_surface = measure(preview, frame, args.frames)
+            print(f"{name:>15} {label:>4} {ms:9.3f} {peak / 1024:8.0f} KiB {'every frame' if new_surface else 'never':>12}")
+        if args.verify:
+            # Interpolation differs (pygame scales nearest-neighbour), so allow a little
+            error = difference(old(frame), new(frame))
+            ok = error < 4
+            failed |= not ok
+            print(f"{name:>15} mean pixel difference {error:.2f} {'ok' if ok else 'MISMATCH'}")
+    pygame.quit()
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,88 @@
+"""Draw-call overhead: one Surface.blit per sprite against a RenderQueue flush, headless.
+
+Small sprites keep the pixel work low, so what is left is mostly the
+per-call cost of going through Python and pygame.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.render_queue import RenderQueue
+
+WIDTH, HEIGHT = 1280, 720
+
+
+def sprites(count, images, rng):
+    return [(images[i % len(images)], (rng.randrange(WIDTH), rng.randrange(HEIGHT)), i % 3) for i in range(count)]
+
+
+def one_by_one(screen, scene):
+    screen.fill((255, 255, 255))
+    for image, position, _ in scene:
+        screen.blit(image, position)
+
+
+def queued(queue, scene):
+    for image, position, layer in scene:
+        queue.add(image, position, layer)
+    queue.flush()
+
+
+def one_by_one_batched(screen, batches):
+    screen.fill((255, 255, 255))
+    for image, positions, _ in batches:
+        for position in positions:
+            screen.blit(image, position)
+
+
+def queued_batched(queue, batches):
+    # The way the games queue most sprites: one image at many positions
+    for image, positions, layer in batches:
+        queue.extend(image, positions, layer)
+    queue.flush()
+
+
+def timed(draw, target, scene, frames):
+    draw(target, scene)  # Warm up
+    start = time.perf_counter()
+    for _ in range(frames):
+        draw(target, scene)
+    return (time.perf_counter() - start) / frames
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-sprite blit cost against batched blits")
+    parser.add_argument("--counts", type=int, nargs="+", default=[100, 1000, 10000, 50000])
+    parser.add_argument("--size", type=int, default=8, help="sprite width and height in pixels")
+    parser.add_argument("--frames", type=int, default=30)
+    args = parser.parse_args()
+
+    pygame.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    images = []
+    for color in ((200, 30, 30), (30, 200, 30), (30, 30, 200), (200, 200, 30)):
+        image = pygame.Surface((args.size, args.size), pygame.SRCALPHA).convert_alpha()
+        pygame.draw.circle(image, color, (args.size // 2, args.size // 2), args.size // 2)
+        images.append(image)
+    queue = RenderQueue(screen, background=(255, 255, 255))
+
+    print(f"{'sprites':>8} {'queued by':>9} {'blit ms':>8} {'queue ms':>9} {'blit µs/sprite':>15} "
+          f"{'queue µs/sprite':>16}")
+    for count in args.counts:
+        scene = sprites(count, images, random.Random(0))
+        batches = [(image, [position for other, position, _ in scene if other is image], layer)
+                   for layer, image in enumerate(images)]
+        for label, direct, batched, work in (("add", one_by_one, queued, scene),
+                                             ("extend", one_by_one_batched, queued_batched, batches)):
+            single = timed(direct, screen, work, args.frames)
+            queue_time = timed(batched, queue, work, args.frames)
+            print(f"{count:8d} {label:>9} {1000 * single:8.2f} {1000 * queue_time:9.2f} "
+                  f"{1e6 * single / count:15.3f} {1e6 * queue_time / count:16.3f}")
+    pygame.quit()
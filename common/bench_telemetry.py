@@ -0,0 +1,79 @@
+"""What a span costs: the same loop bare, with telemetry off, on, and tracing.
+
+Each pass does a little arithmetic standing in for a game stage, wrapped
+in --spans spans, so the difference from the bare loop is the per-span
+overhead the games pay.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.telemetry import Telemetry
+
+
+def work(n):
+    total = 0
+    for i in range(n):
+        total += i * i
+    return total
+
+
+def bare(passes, spans, n):
+    for _ in range(passes):
+        for _ in range(spans):
+            work(n)
+
+
+def instrumented(telemetry, passes, spans, n):
+    names = [f"stage {i}" for i in range(spans)]
+    for _ in range(passes):
+        for name in names:
+            with telemetry.span(name):
+                work(n)
+        telemetry.frame()
+
+
+def timed(run):
+    start = time.perf_counter()
+    run()
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-span overhead of common/telemetry.py")
+    parser.add_argument("--passes", type=int, default=100_000, help="loop passes (frames)")
+    parser.add_argument("--spans", type=int, default=6, help="spans per pass")
+    parser.add_argument("--work", type=int, default=20, help="loop iterations inside each span")
+    args = parser.parse_args()
+
+    trace_path = os.path.join(tempfile.mkdtemp(), "trace.json")
+    telemetry_off = Telemetry()
+    telemetry_on = Telemetry(enabled=True)
+    tracing = Telemetry(trace_path=trace_path)
+    runs = [
+        ("bare loop", lambda: bare(args.passes, args.spans, args.work)),
+        ("telemetry off", lambda: instrumented(telemetry_off, args.passes, args.spans, args.work)),
+        ("telemetry on", lambda: instrumented(telemetry_on, args.passes, args.spans, args.work)),
+        ("tracing", lambda: instrumented(tracing, args.passes, args.spans, args.work)),
+    ]
+
+    spans = args.passes * args.spans
+    baseline = None
+    print(f"{'mode':<14} {'total s':>8} {'ns/span over bare':>18}")
+    for name, run in runs:
+        seconds = timed(run)
+        if baseline is None:
+            baseline = seconds
+        print(f"{name:<14} {seconds:8.3f} {1e9 * (seconds - baseline) / spans:18.0f}")
+
+    start = time.perf_counter()
+    tracing.save()
+    print(f"Saved {len(tracing.events):,} trace events in {time.perf_counter() - start:.2f} s "
+          f"({os.path.getsize(trace_path) / 1e6:.0f} MB)")
+    os.remove(trace_path)
+    os.rmdir(os.path.dirname(trace_path))
+    print()
+    print(telemetry_on.report())
@@ -0,0 +1,252 @@
+"""Where the camera games get their frames from.
+
+Every source has the parts of the cv2.VideoCapture interface the games
+use (read, get, set, isOpened, release), so it can go anywhere a capture
+did, PosePipeline included. open_source() turns a --source argument into
+one:
+
+    auto            the camera that worked last time, or the first one found
+    2               webcam index 2
+    clip.mp4        a video file
+    shots/          every image in a directory, in name order
+    shots/*.png     images matching a glob pattern, in name order
+
+Recorded footage plays back at its own frame rate by default, skipping
+frames when the reader falls behind, so a game sees it the way it would
+see a live camera. Pass realtime=False to get every frame as fast as it
+can be decoded, for benchmarks.
+"""
+import glob
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+
+CAMERA_INDICES = range(5)
+CAMERA_CACHE = os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"),
+                            "camera-games", "camera.json")
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".webp")
+
+
+class Webcam:
+    def __init__(self, index=0, width=None, height=None):
+        self.index = index
+        self.capture = cv2.VideoCapture(index)
+        if width:
+            self.capture.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+        if height:
+            self.capture.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+
+    def __str__(self):
+        return f"camera {self.index}"
+
+    def read(self):
+        return self.capture.read()
+
+    def get(self, prop):
+        return self.capture.get(prop)
+
+    def set(self, prop, value):
+        return self.capture.set(prop, value)
+
+    def isOpened(self):
+        return self.capture.isOpened()
+
+    def release(self):
+        self.capture.release()
+
+
+class Recording:
+    """Playback shared by the file sources: pacing to the frame rate, and looping.
+
+    Subclasses provide next_frame() -> (ok, frame), skip() and rewind().
+    """
+
+    def __init__(self, fps, realtime=True, loop=False):
+        self.fps = fps
+        self.realtime = realtime
+        self.loop = loop
+        self.position = 0  # Frames read or skipped since the last rewind
+        self.played = 0  # Frames read or skipped in total, for pacing across loops
+        self.started_at = None
+
+    def read(self):
+        if self.realtime:
+            now = time.perf_counter()
+            if self.started_at is None:
+                self.started_at = now
+            due = int((now - self.started_at) * self.fps)
+            if self.played > due:
+                time.sleep((self.started_at + self.played / self.fps) - now)
+            # Behind: drop the frames a live camera would have replaced by now
+            while self.played < due and self.skip():
+                self.position += 1
+                self.played += 1
+
+        ok, frame = self.next_frame()
+        if not ok and self.loop and self.position > 0:
+            self.rewind()
+            self.position = 0
+            ok, frame = self.next_frame()
+        if ok:
+            self.position += 1
+            self.played += 1
+        return ok, frame
+
+    def set(self, prop, value):
+        return False  # The size and rate are whatever was recorded
+
+    def isOpened(self):
+        return True
+
+
+class VideoFile(Recording):
+    def __init__(self, path, realtime=True, loop=False):
+        self.path = path
+        self.capture = cv2.VideoCapture(path)
+        if not self.capture.isOpened():
+            raise OSError(f"can't open video {path}")
+        super().__init__(self.capture.get(cv2.CAP_PROP_FPS) or 30, realtime, loop)
+
+    def __str__(self):
+        return f"video {self.path}"
+
+    def next_frame(self):
+        return self.capture.read()
+
+    def skip(self):
+        return self.capture.grab()  # Demuxes and decodes, but skips the conversion to BGR
+
+    def rewind(self):
+        self.capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+
+    def get(self, prop):
+        return self.capture.get(prop)
+
+    def release(self):
+        self.capture.release()
+
+
+class ImageSequence(Recording):
+    def __init__(self, pattern, fps=30, realtime=True, loop=False):
+        self.pattern = pattern
+        if os.path.isdir(pattern):
+            paths = [os.path.join(pattern, name) for name in os.listdir(pattern)
+                     if name.lower().endswith(IMAGE_EXTENSIONS)]
+        else:
+            paths = glob.glob(pattern)
+        self.paths = sorted(paths)
+        if not self.paths:
+            raise FileNotFoundError(f"no images in {pattern}")
+        first = cv2.imread(self.paths[0])
+        if first is None:
+            raise OSError(f"can't read image {self.paths[0]}")
+        self.height, self.width = first.shape[:2]
+        super().__init__(fps, realtime, loop)
+
+    def __str__(self):
+        return f"images {self.pattern}"
+
+    def next_frame(self):
+        if self.position >= len(self.paths):
+            return False, None
+        frame = cv2.imread(self.paths[self.position])
+        return frame is not None, frame
+
+    def skip(self):
+        return self.position < len(self.paths)
+
+    def rewind(self):
+        pass  # position going back to 0 is all it takes
+
+    def get(self, prop):
+        return {
+            cv2.CAP_PROP_FRAME_WIDTH: self.width,
+            cv2.CAP_PROP_FRAME_HEIGHT: self.height,
+            cv2.CAP_PROP_FPS: self.fps,
+            cv2.CAP_PROP_FRAME_COUNT: len(self.paths),
+            cv2.CAP_PROP_POS_FRAMES: self.position,
+        }.get(prop, 0)
+
+    def release(self):
+        pass
+
+
+def probe_camera(index):
+    """True if camera index opens and delivers a frame."""
+    capture = cv2.VideoCapture(index)
+    try:
+        return capture.isOpened() and capture.read()[0]
+    finally:
+        capture.release()
+
+
+def find_cameras(indices=CAMERA_INDICES):
+    """Indices of the working cameras, all probed at once.
+
+    Opening an index with nothing behind it can take a second or more
+    before it fails, and OpenCV releases the GIL while it waits, so a
+    thread per index costs about as long as the slowest one instead of
+    the sum of them all.
+    """
+    indices = list(indices)
+    with ThreadPoolExecutor(len(indices)) as pool:
+        working = list(pool.map(probe_camera, indices))
+    return [index for index, ok in zip(indices, working) if ok]
+
+
+def cached_camera(path=None):
+    try:
+        with open(path or CAMERA_CACHE) as f:
+            return json.load(f)["index"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def remember_camera(index, path=None):
+    path = path or CAMERA_CACHE
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump({"index": index}, f)
+    except OSError:
+        pass  # Only costs a scan next time
+
+
+def open_camera(width=None, height=None, choose=None, cache=True):
+    """The camera used last time if it still works, otherwise one found by scanning.
+
+    choose(indices) picks when the scan finds more than one; by default the
+    first is used. Falls back to index 0 when nothing is found, like the
+    games always did.
+    """
+    index = cached_camera() if cache else None
+    if index is not None:
+        camera = Webcam(index, width, height)
+        if camera.isOpened() and camera.read()[0]:
+            return camera
+        camera.release()
+
+    cameras = find_cameras()
+    if not cameras:
+        index = 0
+    elif len(cameras) > 1 and choose is not None:
+        index = choose(cameras)
+    else:
+        index = cameras[0]
+    if cache and cameras:
+        remember_camera(index)
+    return Webcam(index, width, height)
+
+
+def open_source(source="auto", width=None, height=None, choose=None, realtime=True, loop=False):
+    """A frame source for a --source argument; width and height only apply to webcams."""
+    if source is None or source == "auto":
+        return open_camera(width, height, choose)
+    if source.isdigit():
+        return Webcam(int(source), width, height)
+    if os.path.isdir(source) or glob.has_magic(source):
+        return ImageSequence(source, realtime=realtime, loop=loop)
+    return VideoFile(source, realtime=realtime, loop=loop)
@@ -0,0 +1,141 @@
+import time
+
+import cv2
+import mediapipe as mp
+from mediapipe.framework.formats import landmark_pb2
+
+NOSE = mp.solutions.pose.PoseLandmark.NOSE
+
+
+class TrackedPose:
+    """Same shape as the result of Pose.process: pose_landmarks, in full-frame coordinates."""
+
+    def __init__(self, pose_landmarks):
+        self.pose_landmarks = pose_landmarks
+
+
+class HeadTracker:
+    """A drop-in for mp.solutions.pose.Pose().process() that costs less per frame.
+
+    The games only read the nose, so once a person is found the next frame
+    is cropped to the area around them and shrunk to at most max_input
+    pixels before it reaches MediaPipe. The model complexity moves between
+    min_complexity and max_complexity to keep inference under budget_ms.
+    When the nose is lost the whole (downscaled) frame is searched again.
+    """
+
+    def __init__(self, min_complexity=0, max_complexity=1, budget_ms=25, max_input=256,
+                 full_frame_input=320, margin=0.35, min_visibility=0.5):
+        self.min_complexity = min_complexity
+        self.max_complexity = max_complexity
+        self.complexity = max_complexity
+        self.budget = budget_ms / 1000
+        self.max_input = max_input
+        self.full_frame_input = full_frame_input
+        self.margin = margin
+        self.min_visibility = min_visibility
+
+        self.models = {}  # complexity -> Pose, created the first time it's needed
+        self.roi = None  # (x0, y0, x1, y1) in pixels, None means search the whole frame
+        self.average_cost = None
+        self.under_budget_frames = 0
+        self.warming_up = False  # The first frame through a new model pays for its setup
+
+        # Counters for reports
+        self.frames = 0
+        self.full_frame_searches = 0
+        self.total_cost = 0.0
+
+    def model(self):
+        if self.complexity not in self.models:
+            try:
+                self.models[self.complexity] = mp.solutions.pose.Pose(model_complexity=self.complexity)
+                self.warming_up = True
+            except OSError:
+                # Only the complexity 1 model ships with mediapipe, the others are downloaded
+                # on first use. Offline, stay on the one already loaded.
+                if not self.models:
+                    raise
+                self.complexity = self.min_complexity = self.max_complexity = next(iter(self.models))
+        return self.models[self.complexity]
+
+    def process(self, frame_rgb):
+        start = time.perf_counter()
+        height, width = frame_rgb.shape[:2]
+        x0, y0, x1, y1 = self.roi or (0, 0, width, height)
+        if self.roi is None:
+            self.full_frame_searches += 1
+
+        crop = frame_rgb[y0:y1, x0:x1]
+        limit = self.max_input if self.roi else self.full_frame_input
+        scale = min(1.0, limit / max(crop.shape[:2]))
+        if scale < 1.0:
+            crop = cv2.resize(crop, (round(crop.shape[1] * scale), round(crop.shape[0] * scale)),
+                              interpolation=cv2.INTER_AREA)
+        results = self.model().process(crop)
+
+        landmarks = None
+        if results.pose_landmarks and results.pose_landmarks.landmark[NOSE].visibility >= self.min_visibility:
+            # Map crop coordinates back onto the full frame
+            landmarks = landmark_pb2.NormalizedLandmarkList()
+            landmarks.CopyFrom(results.pose_landmarks)
+            for landmark in landmarks.landmark:
+                landmark.x = (x0 + landmark.x * (x1 - x0)) / width
+                landmark.y = (y0 + landmark.y * (y1 - y0)) / height
+            self.roi = self.region_around(landmarks, width, height)
+        else:
+            self.roi = None  # Lost: search the whole frame next time
+
+        self.adapt(time.perf_counter() - start)
+        return TrackedPose(landmarks)
+
+    def region_around(self, landmarks, width, height):
+        # Square box around the visible landmarks (always including the nose), plus a margin
+        visible = [l for l in landmarks.landmark if l.visibility >= self.min_visibility]
+        xs = [l.x * width for l in visible]
+        ys = [l.y * height for l in visible]
+        size = max(max(xs) - min(xs), max(ys) - min(ys)) * (1 + 2 * self.margin)
+        size = max(size, 0.25 * min(width, height))
+        nose = landmarks.landmark[NOSE]
+        cx = (min(xs) + max(xs)) / 2
+        cy = nose.y * height  # Keep the head in the middle so jumps don't leave the box
+        x0 = int(max(0, cx - size / 2))
+        y0 = int(max(0, cy - size / 2))
+        x1 = int(min(width, cx + size / 2))
+        y1 = int(min(height, cy + size / 2))
+        if x1 - x0 < 32 or y1 - y0 < 32:
+            return None
+        return x0, y0, x1, y1
+
+    def adapt(self, cost):
+        self.frames += 1
+        self.total_cost += cost
+        if self.warming_up:
+            self.warming_up = False
+            return
+        self.average_cost = cost if self.average_cost is None else 0.9 * self.average_cost + 0.1 * cost
+
+        if self.average_cost > self.budget and self.complexity > self.min_complexity:
+            self.complexity -= 1
+            self.average_cost = None
+            self.under_budget_frames = 0
+        elif self.average_cost < self.budget / 3 and self.complexity < self.max_complexity:
+            # Only step up after a sustained stretch of headroom
+            self.under_budget_frames += 1
+            if self.under_budget_frames >= 60:
+                self.complexity += 1
+                self.average_cost = None
+                self.under_budget_frames = 0
+        else:
+            self.under_budget_frames = 0
+
+    def report(self):
+        if not self.frames:
+            return "Head tracker: no frames"
+        return (f"Head tracker: {1000 * self.total_cost / self.frames:.1f} ms/frame, "
+                f"{100 * self.full_frame_searches / self.frames:.0f}% full-frame searches, "
+                f"model complexity now {self.complexity}")
+
+    def close(self):
+        for model in self.models.values():
+            model.close()
@@ -0,0 +1,38 @@
+from functools import lru_cache
+
+import pygame
+
+
+@lru_cache(maxsize=None)
+def get_font(name, size, bold=False):
+    # SysFont scans the installed fonts, so each (name, size) is looked up once
+    return pygame.font.SysFont(name.lower(), size, bold)
+
+
+@lru_cache(maxsize=256)
+def render_text(text, color, name="arial", size=30, bold=False):
+    """Rendered text surface, cached by (text, font, color). Don't draw onto the result."""
+    return get_font(name, size, bold).render(text, True, color)
+
+
+class Hud:
+    """Draws "<label><number>" from a pre-rendered digit atlas.
+
+    A changing score would otherwise fill the text cache with one surface
+    per value, so only the label and the ten digits are ever rendered.
+    """
+
+    def __init__(self, name="arial", size=30, color=(0, 0, 0), label="Score: "):
+        self.label = render_text(label, color, name, size)
+        self.digits = [render_text(str(digit), color, name, size) for digit in range(10)]
+
+    def draw_score(self, surface, value, position):
+        x, y = position
+        blits = [(self.label, (x, y))]
+        x += self.label.get_width()
+        for digit in str(value):
+            image = self.digits[int(digit)]
+            blits.append((image, (x, y)))
+            x += image.get_width()
+        rects = surface.blits(blits)
+        return rects[0].unionall(rects[1:])
@@ -0,0 +1,161 @@
+import math
+
+import numpy as np
+
+
+class RingBuffer:
+    """The last size samples, with their mean and variance kept up to date in O(1)."""
+
+    def __init__(self, size):
+        self.values = np.zeros(size)
+        self.size = size
+        self.next = 0
+        self.count = 0
+        self.total = 0.0
+        self.total_squares = 0.0
+
+    def __len__(self):
+        return self.count
+
+    def push(self, value):
+        if self.count == self.size:
+            old = self.values[self.next]
+            self.total -= old
+            self.total_squares -= old * old
+        else:
+            self.count += 1
+        self.values[self.next] = value
+        self.next = (self.next + 1) % self.size
+        self.total += value
+        self.total_squares += value * value
+
+    def clear(self):
+        self.next = self.count = 0
+        self.total = self.total_squares = 0.0
+
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def std(self):
+        if self.count < 2:
+            return 0.0
+        mean = self.mean()
+        return math.sqrt(max(0.0, self.total_squares / self.count - mean * mean))
+
+
+def smoothing_factor(cutoff, dt):
+    tau = 1 / (2 * math.pi * cutoff)
+    return 1 / (1 + tau / dt)
+
+
+class OneEuroFilter:
+    """One-Euro filter (Casiez et al. 2012) for a noisy position sampled at uneven times.
+
+    Smooths hard while the value is still (less jitter) and follows quickly
+    while it moves (less lag). Also gives the filtered velocity, in units
+    per second.
+    """
+
+    def __init__(self, min_cutoff=1.0, beta=0.5, derivative_cutoff=4.0):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.derivative_cutoff = derivative_cutoff
+        self.reset()
+
+    def reset(self):
+        self.value = None
+        self.velocity = 0.0
+        self.last_time = None
+
+    def __call__(self, value, t):
+        if self.value is None or t <= self.last_time:
+            if self.value is None:
+                self.value = value
+            self.last_time = t
+            return self.value
+        dt = t - self.last_time
+        self.last_time = t
+
+        raw_velocity = (value - self.value) / dt
+        a = smoothing_factor(self.derivative_cutoff, dt)
+        self.velocity += a * (raw_velocity - self.velocity)
+
+        cutoff = self.min_cutoff + self.beta * abs(self.velocity)
+        a = smoothing_factor(cutoff, dt)
+        self.value += a * (value - self.value)
+        return self.value
+
+
+class JumpDetector:
+    """Spots jumps in a stream of head heights (0 at the top of the frame, 1 at the bottom).
+
+    A jump is an upward velocity above a threshold that adapts to how much
+    the velocity jitters while the player stands still: mean plus
+    sensitivity standard deviations over the last second or two, never
+    below min_speed (frame heights per second). It has to stay above for
+    confirm samples in a row, which filters out single bad frames. After a
+    jump the detector ignores the rest of it for cooldown seconds.
+    """
+
+    def __init__(self, min_speed=0.25, sensitivity=2.5, confirm=2, cooldown=0.35, window=60, max_gap=0.5):
+        self.filter = OneEuroFilter(min_cutoff=1.0, beta=2.0, derivative_cutoff=6.0)
+        self.noise = RingBuffer(window)  # Upward velocity while not jumping
+        self.min_speed = min_speed
+        self.sensitivity = sensitivity
+        self.confirm = confirm  # Samples in a row above the threshold
+        self.rising = 0
+        self.cooldown = cooldown
+        self.max_gap = max_gap  # Longer than this without the head resets the filter
+        self.last_jump = -math.inf
+        self.last_time = None
+
+    def threshold(self):
+        return max(self.min_speed, self.noise.mean() + self.sensitivity * self.noise.std())
+
+    def update(self, head_y, t):
+        """Feed one sample taken at time t (seconds); True if it starts a jump."""
+        if self.last_time is not None and t - self.last_time > self.max_gap:
+            self.filter.reset()
+        self.last_time = t
+        self.filter(head_y, t)
+        upward = -self.filter.velocity
+
+        if t - self.last_jump < self.cooldown:
+            return False
+        threshold = self.threshold()
+        if upward > threshold:
+            # A single bad frame makes a spike; a jump keeps going
+            self.rising += 1
+            if self.rising >= self.confirm:
+                self.rising = 0
+                self.last_jump = t
+                return True
+        else:
+            self.rising = 0
+        self.noise.push(min(upward, threshold))  # Clipped, so spikes don't inflate the threshold
+        return False
+
+
+class Steering:
+    """Turns a position into -1 (left), 0 or 1 (right) around a centre line.
+
+    The position goes through a One-Euro filter rather than a moving
+    average, so it lags less. Moving starts at threshold from the centre
+    and only stops once back inside release, so small wobbles on the
+    boundary don't flicker between moving and standing.
+    """
+
+    def __init__(self, center, threshold, release=None, min_cutoff=1.0, beta=0.02):
+        self.filter = OneEuroFilter(min_cutoff=min_cutoff, beta=beta)
+        self.center = center
+        self.threshold = threshold
+        self.release = 0.75 * threshold if release is None else release
+        self.direction = 0
+
+    def update(self, position, t):
+        offset = self.filter(position, t) - self.center
+        if abs(offset) > self.threshold:
+            self.direction = 1 if offset > 0 else -1
+        elif abs(offset) < self.release:
+            self.direction = 0
+        return self.direction
@@ -0,0 +1,147 @@
+import threading
+import time
+from collections import deque
+
+import cv2
+
+from common.telemetry import Telemetry
+
+
+class LatestBuffer:
+    """Single-slot hand-off between threads where the newest item wins.
+
+    A put() that replaces an item nobody has taken yet counts as a drop.
+    """
+
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.item = None
+        self.seq = 0
+        self.taken_seq = 0
+        self.dropped = 0
+
+    def put(self, item):
+        with self.condition:
+            if self.seq > self.taken_seq:
+                self.dropped += 1
+            self.item = item
+            self.seq += 1
+            self.condition.notify_all()
+
+    def take(self, timeout=None):
+        """Wait for an item newer than the last one taken; None on timeout."""
+        with self.condition:
+            if not self.condition.wait_for(lambda: self.seq > self.taken_seq, timeout):
+                return None
+            self.taken_seq = self.seq
+            return self.item
+
+    def take_nowait(self):
+        with self.condition:
+            if self.seq == self.taken_seq:
+                return None
+            self.taken_seq = self.seq
+            return self.item
+
+
+class PoseResult:
+    def __init__(self, frame_id, captured_at, processed_at, landmarks, frame):
+        self.frame_id = frame_id
+        self.captured_at = captured_at  # time.perf_counter() when cap.read() returned
+        self.processed_at = processed_at
+        self.landmarks = landmarks  # results.pose_landmarks, or None when nobody is in view
+        self.frame = frame  # The camera frame, with the skeleton drawn on it
+
+
+class PosePipeline:
+    """Reads the camera and runs pose estimation on two background threads.
+
+    The game loop never waits on either: it asks for the newest result
+    with latest() and keeps running at display rate in between.
+    """
+
+    def __init__(self, cap, pose, draw=None, transform=None, telemetry=None):
+        self.cap = cap
+        self.pose = pose
+        self.draw = draw  # e.g. lambda frame, landmarks: mp_draw.draw_landmarks(...)
+        self.transform = transform  # Applied to each frame on the capture thread, e.g. a rotation
+        self.telemetry = telemetry or Telemetry()  # Disabled unless the game passes one in
+
+        self.frames = LatestBuffer()
+        self.results = LatestBuffer()
+        self.stopping = threading.Event()
+        self.failed = False  # The camera stopped delivering frames
+        self.captured = 0
+        self.processed = 0
+        self.latencies = deque(maxlen=1000)  # Seconds from capture to the action it caused
+
+        self.threads = [
+            threading.Thread(target=self.capture_loop, name="capture", daemon=True),
+            threading.Thread(target=self.inference_loop, name="pose", daemon=True),
+        ]
+
+    def start(self):
+        for thread in self.threads:
+            thread.start()
+        return self
+
+    def stop(self):
+        self.stopping.set()
+        self.frames.put(None)  # Wake the inference thread
+        for thread in self.threads:
+            thread.join(timeout=2)
+        self.cap.release()
+
+    def capture_loop(self):
+        telemetry = self.telemetry
+        while not self.stopping.is_set():
+            with telemetry.span("camera read"):
+                ret, frame = self.cap.read()
+            captured_at = time.perf_counter()
+            if not ret:
+                self.failed = True
+                self.frames.put(None)
+                return
+            if self.transform is not None:
+                with telemetry.span("transform"):
+                    frame = self.transform(frame)
+            self.captured += 1
+            self.frames.put((self.captured, captured_at, frame))
+
+    def inference_loop(self):
+        while not self.stopping.is_set():
+            item = self.frames.take(timeout=0.5)
+            if item is None:
+                continue
+            frame_id, captured_at, frame = item
+            with self.telemetry.span("bgr to rgb"):
+                frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            with self.telemetry.span("pose"):
+                results = self.pose.process(frame_rgb)
+            if results.pose_landmarks and self.draw is not None:
+                with self.telemetry.span("draw skeleton"):
+                    self.draw(frame, results.pose_landmarks)
+            self.processed += 1
+            self.results.put(PoseResult(frame_id, captured_at, time.perf_counter(),
+                                        results.pose_landmarks, frame))
+
+    def latest(self):
+        """The newest pose result not returned before, or None."""
+        return self.results.take_nowait()
+
+    def record_action(self, result):
+        """Note that result triggered an action (e.g. a jump) just now."""
+        self.latencies.append(time.perf_counter() - result.captured_at)
+
+    def report(self):
+        lines = [
+            f"Camera frames: {self.captured} captured, {self.processed} run through pose, "
+            f"{self.frames.dropped} dropped before inference, "
+            f"{self.results.dropped} results replaced before the game used them",
+        ]
+        if self.latencies:
+            latencies = sorted(self.latencies)
+            p95 = latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))]
+            lines.append(f"Capture-to-jump latency: {1000 * sum(latencies) / len(latencies):.0f} ms average, "
+                         f"{1000 * p95:.0f} ms p95 over {len(latencies)} jumps")
+        return "\n".join(lines)
@@ -0,0 +1,46 @@
+import cv2
+import numpy as np
+import pygame
+
+
+class CameraPreview:
+    """Shows OpenCV camera frames in pygame without allocating per frame.
+
+    The frame is shrunk with OpenCV first, straight into a buffer made once,
+    and the pygame Surface is a view of that buffer (pygame.image.frombuffer),
+    so nothing is converted or copied at full resolution and no new Surface
+    is made per frame. flip and rotate are the cv2.flip/cv2.rotate codes
+    that undo whatever the game did to the frame before drawing on it, and
+    are applied after the resize, on the small image.
+    """
+
+    def __init__(self, size, flip=None, rotate=None, interpolation=cv2.INTER_LINEAR):
+        width, height = size
+        self.flip = flip
+        self.rotate = rotate
+        self.interpolation = interpolation
+        self.pixels = np.zeros((height, width, 3), np.uint8)
+        self.surface = pygame.image.frombuffer(self.pixels, size, "BGR")  # Shares memory with pixels
+
+        # The resize target, when a flip or rotation still has to happen after it
+        self.scratch = None
+        if rotate in (cv2.ROTATE_90_CLOCKWISE, cv2.ROTATE_90_COUNTERCLOCKWISE):
+            self.scratch = np.zeros((width, height, 3), np.uint8)
+        elif rotate is not None or flip is not None:
+            self.scratch = np.zeros((height, width, 3), np.uint8)
+
+    def update(self, frame):
+        """Copy a BGR camera frame into the preview; the surface changes in place."""
+        if self.scratch is None:
+            cv2.resize(frame, self.pixels.shape[1::-1], dst=self.pixels, interpolation=self.interpolation)
+            return self.surface
+
+        cv2.resize(frame, self.scratch.shape[1::-1], dst=self.scratch, interpolation=self.interpolation)
+        if self.rotate is None:
+            cv2.flip(self.scratch, self.flip, dst=self.pixels)
+        elif self.flip is None:
+            cv2.rotate(self.scratch, self.rotate, dst=self.pixels)
+        else:
+            cv2.flip(self.scratch, self.flip, dst=self.scratch)
+            cv2.rotate(self.scratch, self.rotate, dst=self.pixels)
+        return self.surface
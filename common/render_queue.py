@@ -0,0 +1,55 @@
+from collections import defaultdict
+
+import pygame
+
+
+def static_layer(size, color, paint=None):
+    """A display-format Surface filled with color, with paint(surface) drawn on top once.
+
+    For whatever sits under every frame and never changes: blitting it is
+    one call however much was painted onto it. A plain color is cheaper
+    to fill than to copy, so pass that to RenderQueue as is instead.
+    """
+    surface = pygame.Surface(size).convert()
+    surface.fill(color)
+    if paint is not None:
+        paint(surface)
+    return surface
+
+
+class RenderQueue:
+    """Collects a frame's sprites and draws them with one Surface.blits call per layer.
+
+    Layers are drawn from lowest to highest, and sprites within a layer in
+    the order they were queued. extend() queues one image at many
+    positions without a call per sprite. background, when set, goes under
+    everything: a color is filled, a Surface (see static_layer) is copied.
+    """
+
+    def __init__(self, target, background=None):
+        self.target = target
+        self.background = background
+        self.layers = defaultdict(list)  # layer: [(image, position)]
+        # pygame-ce's fblits skips building the list of rects that blits would return
+        self.send = getattr(target, "fblits", None) or (lambda blits: target.blits(blits, doreturn=False))
+        self.sprites = 0  # Drawn by the last flush()
+
+    def add(self, image, position, layer=0):
+        self.layers[layer].append((image, position))
+
+    def extend(self, image, positions, layer=0):
+        """Queue one image at many positions."""
+        self.layers[layer] += [(image, position) for position in positions]
+
+    def flush(self):
+        """Draw everything queued, then start a new frame."""
+        if isinstance(self.background, pygame.Surface):
+            self.target.blit(self.background, (0, 0))
+        elif self.background is not None:
+            self.target.fill(self.background)
+        self.sprites = 0
+        for layer in sorted(self.layers):
+            blits = self.layers[layer]
+            self.send(blits)
+            self.sprites += len(blits)
+        self.layers.clear()
@@ -0,0 +1,81 @@
+import hashlib
+import json
+import os
+import struct
+import sys
+import zlib
+from array import array
+
+# File layout: MAGIC, header length (u32), JSON header, zlib-compressed
+# tick inputs, then TRAILER, tick count (u32) and the 32-byte final state hash.
+# All integers are little-endian.
+MAGIC = b"RPLY"
+TRAILER = b"END!"
+VERSION = 1
+
+
+def new_seed():
+    return int.from_bytes(os.urandom(4), "little")
+
+
+def state_hash(*state):
+    """sha256 of the game state; ints, floats, tuples and lists all repr deterministically."""
+    return hashlib.sha256(repr(state).encode()).digest()
+
+
+class Recorder:
+    """Collects one input value per simulation tick and writes them on close().
+
+    typecode is an array typecode sized for the game's input, e.g. "B" for a
+    key code or "h" for a head position in pixels.
+    """
+
+    def __init__(self, path, game, seed, typecode="B", **meta):
+        self.path = path
+        self.header = dict(meta, game=game, seed=seed, typecode=typecode, version=VERSION)
+        self.ticks = array(typecode)
+
+    def write(self, value):
+        self.ticks.append(value)
+
+    def close(self, final_hash):
+        ticks = array(self.ticks.typecode, self.ticks)
+        if sys.byteorder == "big":
+            ticks.byteswap()
+        header = json.dumps(self.header).encode()
+        with open(self.path, "wb") as f:
+            f.write(MAGIC + struct.pack("<I", len(header)) + header)
+            f.write(zlib.compress(ticks.tobytes(), 9))
+            f.write(TRAILER + struct.pack("<I", len(ticks)) + final_hash)
+
+
+class Replay:
+    """A recorded session: header fields, the per-tick inputs and the expected final hash."""
+
+    def __init__(self, path, game=None):
+        with open(path, "rb") as f:
+            data = f.read()
+        if data[:4] != MAGIC or data[-40:-36] != TRAILER:
+            raise ValueError(f"{path} is not a replay file")
+
+        (header_length,) = struct.unpack_from("<I", data, 4)
+        self.header = json.loads(data[8:8 + header_length])
+        if self.header["version"] != VERSION:
+            raise ValueError(f"{path}: unsupported replay version {self.header['version']}")
+        if game is not None and self.header["game"] != game:
+            raise ValueError(f"{path} was recorded in {self.header['game']}, not {game}")
+
+        self.seed = self.header["seed"]
+        self.ticks = array(self.header["typecode"], zlib.decompress(data[8 + header_length:-40]))
+        if sys.byteorder == "big":
+            self.ticks.byteswap()
+        (tick_count,) = struct.unpack_from("<I", data, len(data) - 36)
+        if tick_count != len(self.ticks):
+            raise ValueError(f"{path} is truncated")
+        self.final_hash = data[-32:]
+
+    def check(self, final_hash):
+        """Print and return whether a replay ended in the recorded state."""
+        ok = final_hash == self.final_hash
+        print(f"Replayed {len(self.ticks)} ticks: final state {'matches' if ok else 'DIFFERS from'} the recording")
+        return ok
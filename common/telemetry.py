@@ -0,0 +1,214 @@
+"""Where a frame's time goes: named spans, counters, histograms and trace files.
+
+    telemetry = Telemetry(enabled=True)
+    with telemetry.span("pose"):
+        results = pose.process(frame_rgb)
+    telemetry.count("jumps")
+    telemetry.frame()  # Once per game-loop pass
+
+Every span's durations go into a histogram with fixed log-spaced buckets,
+so memory stays the same however long a game runs, and report() gives
+percentiles from it. With a trace path, every span is also kept as an
+event and save() writes them in Chrome's trace format, for
+chrome://tracing or https://ui.perfetto.dev. Spans can be recorded from
+any thread; each thread is its own row in the trace.
+
+A disabled Telemetry hands out one shared do-nothing span, so leaving
+the calls in costs a method call and a with block.
+"""
+import json
+import math
+import threading
+import time
+from collections import defaultdict
+
+BUCKETS_PER_DOUBLING = 8  # Each bucket is about 9% wider than the last
+MAX_TRACE_EVENTS = 2_000_000  # About 200 MB of events; later ones are counted, not kept
+
+
+class Histogram:
+    """Durations in log-spaced buckets from 1 µs up; percentiles are accurate to a bucket width."""
+
+    def __init__(self):
+        self.buckets = defaultdict(int)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds):
+        microseconds = seconds * 1e6
+        bucket = int(math.log2(microseconds) * BUCKETS_PER_DOUBLING) if microseconds > 1 else 0
+        self.buckets[bucket] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, p):
+        """Upper edge of the bucket holding the p-th percentile, in seconds."""
+        if not self.count:
+            return 0.0
+        rank = p / 100 * self.count
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                return min(self.max, 2 ** ((bucket + 1) / BUCKETS_PER_DOUBLING) / 1e6)
+        return self.max
+
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+
+class NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def begin(self):
+        return self
+
+    def end(self):
+        pass
+
+
+NULL_SPAN = NullSpan()
+
+
+class Span:
+    __slots__ = ("telemetry", "name", "start")
+
+    def __init__(self, telemetry, name):
+        self.telemetry = telemetry
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.telemetry.record(self.name, self.start, time.perf_counter())
+        return False
+
+    # For stretches of a loop too long to indent under a with block
+    def begin(self):
+        self.start = time.perf_counter()
+        return self
+
+    def end(self):
+        self.telemetry.record(self.name, self.start, time.perf_counter())
+
+
+class Telemetry:
+    def __init__(self, enabled=False, trace_path=None, window=1.0):
+        self.enabled = enabled or trace_path is not None
+        self.trace_path = trace_path
+        self.histograms = defaultdict(Histogram)
+        self.counters = defaultdict(int)
+        self.origin = time.perf_counter()
+        self.events = []  # (name, start, end, thread id) when tracing
+        self.counter_events = []  # (name, time, running total) when tracing
+        self.events_dropped = 0
+        self.threads = {}  # Thread id: name, for the trace
+        self.last_frame = None
+
+        # The overlay shows the last window seconds, re-rendered once per window
+        self.window = window
+        self.recent = defaultdict(list)
+        self.recent_started = self.origin
+        self.overlay_lines = []
+        self.overlay_images = []
+
+    def span(self, name):
+        """Context manager timing its block as name."""
+        return Span(self, name) if self.enabled else NULL_SPAN
+
+    def record(self, name, start, end):
+        self.histograms[name].add(end - start)
+        self.recent[name].append(end - start)
+        if self.trace_path is not None:
+            if len(self.events) < MAX_TRACE_EVENTS:
+                thread = threading.get_ident()
+                if thread not in self.threads:
+                    self.threads[thread] = threading.current_thread().name
+                self.events.append((name, start, end, thread))
+            else:
+                self.events_dropped += 1
+
+    def count(self, name, value=1):
+        if not self.enabled:
+            return
+        self.counters[name] += value
+        if self.trace_path is not None and len(self.counter_events) < MAX_TRACE_EVENTS:
+            self.counter_events.append((name, time.perf_counter(), self.counters[name]))
+
+    def frame(self):
+        """Mark the end of a game-loop pass; the time between marks is the "frame" span."""
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        if self.last_frame is not None:
+            self.record("frame", self.last_frame, now)
+        self.last_frame = now
+        if now - self.recent_started >= self.window:
+            self.update_overlay(now - self.recent_started)
+            self.recent = defaultdict(list)
+            self.recent_started = now
+
+    def update_overlay(self, elapsed):
+        self.overlay_lines = []
+        for name, durations in sorted(self.recent.items()):
+            mean = 1000 * sum(durations) / len(durations)
+            worst = 1000 * max(durations)
+            self.overlay_lines.append(f"{name:<14} {mean:6.2f} ms avg {worst:6.2f} max {len(durations) / elapsed:5.0f}/s")
+        self.overlay_images = []
+
+    def draw_overlay(self, surface, position=(10, 50), color=(255, 0, 0), size=16):
+        """Per-span timings over the last window, drawn onto a pygame surface."""
+        if not self.enabled:
+            return
+        if not self.overlay_images and self.overlay_lines:
+            from common.hud import get_font  # Only the pygame games need it
+
+            font = get_font("monospace", size)
+            self.overlay_images = [font.render(line, True, color) for line in self.overlay_lines]
+        x, y = position
+        surface.blits([(image, (x, y + i * (size + 2))) for i, image in enumerate(self.overlay_images)],
+                      doreturn=False)
+
+    def report(self):
+        """Every span's percentiles and every counter's total, as text."""
+        lines = [f"{'span':<16} {'count':>8} {'mean ms':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}"]
+        for name, histogram in sorted(self.histograms.items()):
+            lines.append(f"{name:<16} {histogram.count:8d} {1000 * histogram.mean():8.2f} "
+                         f"{1000 * histogram.percentile(50):8.2f} {1000 * histogram.percentile(95):8.2f} "
+                         f"{1000 * histogram.percentile(99):8.2f} {1000 * histogram.max:8.2f}")
+        for name, total in sorted(self.counters.items()):
+            lines.append(f"{name:<16} {total:8d} (counter)")
+        if self.events_dropped:
+            lines.append(f"{self.events_dropped} spans past the first {MAX_TRACE_EVENTS} were left out of the trace")
+        return "\n".join(lines)
+
+    def save(self, path=None):
+        """Write the trace in Chrome's trace event format (JSON)."""
+        path = path or self.trace_path
+        events = [{"name": "thread_name", "ph": "M", "pid": 0, "tid": thread, "args": {"name": name}}
+                  for thread, name in self.threads.items()]
+        events += [{"name": name, "ph": "X", "pid": 0, "tid": thread,
+                    "ts": round((start - self.origin) * 1e6, 1), "dur": round((end - start) * 1e6, 1)}
+                   for name, start, end, thread in self.events]
+        events += [{"name": name, "ph": "C", "pid": 0, "ts": round((at - self.origin) * 1e6, 1),
+                    "args": {name: total}}
+                   for name, at, total in self.counter_events]
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+    def close(self):
+        """Save the trace, if there is one, and return the report ("" when disabled)."""
+        if not self.enabled:
+            return ""
+        if self.trace_path is not None:
+            self.save()
+        return self.report()
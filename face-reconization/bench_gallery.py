@@ -0,0 +1,83 @@
+"""Match latency as the gallery grows, against what DeepFace.find does every frame.
+
+Galleries of random unit vectors are saved with FaceGallery.save into a
+temporary folder and opened again (memory-mapped), as a real one would
+be. The DeepFace.find stand-in loads the representations pickle and
+computes a cosine distance per row, which is the part of find that
+grows with the dataset; its face detection and embedding are left out
+of both sides.
+"""
+import argparse
+import os
+import pickle
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from gallery import FaceGallery, normalize
+
+
+def per_row_find(representations_path, query):
+    # Load the pickle and loop over its rows, as find does on each call
+    with open(representations_path, "rb") as f:
+        representations = pickle.load(f)
+    best, best_distance = None, 2.0
+    for entry in representations:
+        embedding = np.asarray(entry["embedding"])
+        distance = 1 - np.dot(query, embedding) / (np.linalg.norm(query) * np.linalg.norm(embedding))
+        if distance < best_distance:
+            best, best_distance = entry["identity"], distance
+    return best, best_distance
+
+
+def timed(run, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = run()
+        times.append(time.perf_counter() - start)
+    return 1000 * sorted(times)[len(times) // 2], result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gallery match latency vs gallery size")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 10_000, 100_000])
+    parser.add_argument("--dim", type=int, default=512,
+                        help="embedding size (VGG-Face is 4096: 100k faces is then 1.6 GB)")
+    parser.add_argument("--faces", type=int, default=4, help="faces matched per call, as in a frame")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--find-max", type=int, default=10_000, help="largest gallery to run the find stand-in on")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'faces':>8} {'open ms':>8} {'top-1 ms':>9} {'top-5 ms':>9} {'find ms':>9}")
+    for size in args.sizes:
+        folder = tempfile.mkdtemp()
+        try:
+            matrix = normalize(rng.standard_normal((size, args.dim), dtype=np.float32))
+            paths = [f"person{i % 1000}/{i}.jpg" for i in range(size)]
+            FaceGallery(folder).save(paths, matrix)
+
+            open_ms, gallery = timed(lambda: FaceGallery(folder), 1)
+            # Queries close to known faces, so the right answer is known
+            rows = rng.integers(size, size=args.faces)
+            queries = matrix[rows] + 0.01 * rng.standard_normal((args.faces, args.dim), dtype=np.float32)
+            top1_ms, top1 = timed(lambda: gallery.match(queries), args.repeat)
+            top5_ms, _ = timed(lambda: gallery.match(queries, k=5), args.repeat)
+            assert [matches[0][1] for matches in top1] == [paths[row] for row in rows]
+
+            find_ms = float("nan")
+            if size <= args.find_max:
+                with open(gallery.representations_path, "wb") as f:
+                    pickle.dump([{"identity": os.path.join(folder, path), "embedding": row.tolist()}
+                                 for path, row in zip(paths, matrix)], f)
+                find_ms, _ = timed(lambda: [per_row_find(gallery.representations_path, query) for query in queries],
+                                   max(1, args.repeat // 10))
+            print(f"{size:8,d} {open_ms:8.2f} {top1_ms:9.3f} {top5_ms:9.3f} {find_ms:9.1f}")
+            del gallery
+        finally:
+            shutil.rmtree(folder)
@@ -0,0 +1,86 @@
+"""Recognition calls the face tracker saves, per minute of video.
+
+Runs face detection and FaceTracker over a recorded video (--source) and
+counts how many faces would be embedded and matched with tracking,
+against every detected face on every frame without it. Detection is
+OpenCV's Haar cascade, the detector behind DeepFace's "opencv" backend,
+so this runs without DeepFace; every recognition is taken to be
+confident, so only new and stale tracks are recognized again. Without
+--source the boxes are synthetic: faces drifting across the frame, with
+detector-like jitter and the odd missed detection.
+"""
+import argparse
+import os
+import sys
+
+import cv2
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.frame_source import open_source
+from tracker import FaceTracker
+
+
+def synthetic_boxes(frames, faces=3, width=960, height=540, size=160, jitter=4, miss=0.05, seed=0):
+    """Detector output for faces drifting around the frame: true boxes plus jitter and missed detections.
+
+    The last face walks out for 5 s at a time, so tracks also end and start.
+    """
+    rng = np.random.default_rng(seed)
+    limits = np.array([width - size, height - size], dtype=np.float64)
+    positions = rng.uniform(0, 1, (faces, 2)) * limits
+    velocities = rng.uniform(-4, 4, (faces, 2))
+    for frame_number in range(frames):
+        boxes = []
+        for i, (x, y) in enumerate(positions):
+            if i == faces - 1 and (frame_number // 150) % 2:
+                continue
+            if rng.random() < miss:
+                continue
+            dx, dy, dw = rng.normal(0, jitter, 3)
+            boxes.append((int(x + dx), int(y + dy), int(size + dw), int(size + dw)))
+        positions += velocities
+        velocities[(positions < 0) | (positions > limits)] *= -1
+        positions = np.clip(positions, 0, limits)
+        yield boxes
+
+
+def video_boxes(source, frames):
+    cascade = os.path.join(cv2.data.haarcascades, "haarcascade_frontalface_default.xml")
+    if not os.path.exists(cascade):
+        sys.exit(f"This OpenCV build has no Haar cascades ({cascade} is missing)")
+    detector = cv2.CascadeClassifier(cascade)
+    capture = open_source(source, realtime=False)
+    for _ in range(frames):
+        ret, frame = capture.read()
+        if not ret:
+            break
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        yield [tuple(int(v) for v in box) for box in detector.detectMultiScale(gray, 1.1, 10)]
+    capture.release()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recognition calls saved by face tracking")
+    parser.add_argument("--source", help="recorded video or image folder (default: a synthetic clip)")
+    parser.add_argument("--fps", type=float, default=30, help="frame rate of the video, for per-minute figures")
+    parser.add_argument("--frames", type=int, default=900)
+    parser.add_argument("--max-age", type=int, nargs="+", default=[0, 15, 30, 90])
+    args = parser.parse_args()
+
+    # The boxes of each frame, shared by every max-age setting
+    detections = list(video_boxes(args.source, args.frames) if args.source else synthetic_boxes(args.frames))
+    minutes = len(detections) / args.fps / 60
+
+    print(f"{len(detections)} frames ({60 * minutes:.0f} s at {args.fps:g} fps), "
+          f"{sum(len(boxes) for boxes in detections)} face detections")
+    print(f"{'max age':>8} {'recognitions':>13} {'per minute':>11} {'saved/min':>10} {'tracks':>7}")
+    for max_age in args.max_age:
+        tracker = FaceTracker(max_age=max_age)
+        for frame_number, boxes in enumerate(detections, 1):
+            for track in tracker.update(boxes, frame_number):
+                if tracker.needs_recognition(track, frame_number):
+                    tracker.assign(track, "known", 0.2, frame_number)
+        saved = tracker.detections - tracker.recognitions
+        print(f"{max_age:8d} {tracker.recognitions:13d} {tracker.recognitions / minutes:11.0f} "
+              f"{saved / minutes:10.0f} {tracker.next_id - 1:7d}")
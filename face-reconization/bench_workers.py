@@ -0,0 +1,66 @@
+"""Display rate and result latency with recognition inline vs on worker threads.
+
+DeepFace is not needed: recognition is stood in for by a sleep of
+--model-ms per frame (the model releases the GIL the same way while it
+runs), and frames arrive at --camera-fps like a webcam. Each mode runs
+the same loop main.py does, minus the window.
+"""
+import argparse
+import os
+import sys
+import time
+from collections import deque
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from workers import RecognitionWorkers
+
+
+def run(workers, seconds, camera_fps, model_ms):
+    def recognize(frame, frame_number):
+        time.sleep(model_ms / 1000)
+        return []
+
+    frame = np.zeros((480, 640, 3), np.uint8)
+    pool = RecognitionWorkers(recognize, workers).start() if workers else None
+    latencies = deque()
+    shown = None
+    frames = 0
+    start = next_frame = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        # A camera delivers a frame every 1/fps seconds; a late read gets the newest one straight away
+        next_frame = max(next_frame + 1 / camera_fps, time.perf_counter())
+        time.sleep(max(0.0, next_frame - time.perf_counter()))
+        captured_at = time.perf_counter()
+        frames += 1
+        if pool:
+            pool.submit(frame, frames, captured_at)
+            result = pool.latest
+            if result is not None and result.frame_number != shown:
+                shown = result.frame_number
+                latencies.append(time.perf_counter() - result.captured_at)
+        else:
+            recognize(frame, frames)
+            latencies.append(time.perf_counter() - captured_at)
+    elapsed = time.perf_counter() - start
+    if pool:
+        pool.stop()
+    return frames / elapsed, latencies
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inline vs worker-thread recognition")
+    parser.add_argument("--workers", type=int, nargs="+", default=[0, 1, 2, 4], help="0 is the inline mode")
+    parser.add_argument("--model-ms", type=float, default=120, help="simulated recognition time per frame")
+    parser.add_argument("--camera-fps", type=float, default=30)
+    parser.add_argument("--seconds", type=float, default=5)
+    args = parser.parse_args()
+
+    print(f"{'workers':>8} {'display fps':>12} {'results/s':>10} {'latency ms':>11} {'p95 ms':>7}")
+    for workers in args.workers:
+        fps, latencies = run(workers, args.seconds, args.camera_fps, args.model_ms)
+        latencies = sorted(latencies)
+        p95 = latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))]
+        print(f"{workers:8d} {fps:12.1f} {len(latencies) / args.seconds:10.1f} "
+              f"{1000 * sum(latencies) / len(latencies):11.0f} {1000 * p95:7.0f}")
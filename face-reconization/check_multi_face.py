@@ -0,0 +1,92 @@
+"""Multi-face check: every face in a frame must get its own identity.
+
+Builds frames with several people side by side, one dataset image per
+tile, and runs them through FaceRecognizer. A face is labelled
+correctly when the person it is matched to is the one whose tile its
+box sits in, for every face in the frame. In each frame one person's
+image is also left out of the gallery (removed from a copy of the
+dataset, which the gallery's refresh() then drops), so their match has
+to come from their other photos rather than the same picture. Prints
+the per-stage timings at the end.
+"""
+import argparse
+import itertools
+import os
+import shutil
+import sys
+import tempfile
+
+import cv2
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.telemetry import Telemetry
+from gallery import FaceGallery, image_files
+from recognizer import FaceRecognizer
+
+
+def tile(images, height=480):
+    resized = [cv2.resize(image, (int(image.shape[1] * height / image.shape[0]), height)) for image in images]
+    edges = np.cumsum([0] + [image.shape[1] for image in resized])
+    return np.hstack(resized), edges
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check that each face in a multi-face frame gets its own identity")
+    parser.add_argument("--dataset", default="faces_dataset")
+    parser.add_argument("--model", default="VGG-Face")
+    parser.add_argument("--people", type=int, default=3, help="faces per frame")
+    parser.add_argument("--frames", type=int, default=10)
+    args = parser.parse_args()
+
+    people = {}
+    for path in sorted(image_files(args.dataset)):
+        people.setdefault(os.path.dirname(path), []).append(path)
+    if len(people) < 2:
+        sys.exit(f"Need at least two people in {args.dataset}")
+
+    telemetry = Telemetry(enabled=True)
+    checked = wrong = missed = 0
+    folder = tempfile.mkdtemp()
+    dataset = os.path.join(folder, "faces_dataset")
+    shutil.copytree(args.dataset, dataset, ignore=shutil.ignore_patterns("gallery_*"))
+    gallery = FaceGallery(dataset, model_name=args.model)
+    recognizer = FaceRecognizer(gallery, args.model, telemetry=telemetry)
+    try:
+        groups = itertools.combinations(sorted(people), min(args.people, len(people)))
+        combinations = itertools.islice(itertools.cycle(groups), args.frames)
+        for frame_number, names in enumerate(combinations):
+            # The first person with more than one photo is held out; everyone else stays in the gallery
+            held_out = next((name for name in names if len(people[name]) > 1), None)
+            paths = [people[name][frame_number % len(people[name])] for name in names]
+            if held_out is not None:
+                os.remove(os.path.join(dataset, paths[names.index(held_out)]))
+            gallery.refresh()
+
+            frame, edges = tile([cv2.imread(os.path.join(args.dataset, path)) for path in paths])
+            faces = recognizer.recognize(frame)
+            telemetry.frame()
+            found = set()
+            for face in faces:
+                x, y, w, h = face.box
+                column = int(np.searchsorted(edges, x + w / 2, side="right")) - 1
+                expected = names[column]
+                found.add(expected)
+                checked += 1
+                if face.identity != expected:
+                    wrong += 1
+                    print(f"Frame {frame_number}: face in {expected}'s tile labelled {face.identity} "
+                          f"(distance {face.distance:.3f})")
+            for name in set(names) - found:
+                missed += 1
+                print(f"Frame {frame_number}: no face detected in {name}'s tile")
+            if held_out is not None:
+                shutil.copy2(os.path.join(args.dataset, paths[names.index(held_out)]),
+                             os.path.join(dataset, paths[names.index(held_out)]))
+    finally:
+        shutil.rmtree(folder)
+
+    print(f"{checked} faces checked: {checked - wrong} labelled correctly, {wrong} wrong, "
+          f"{missed} not detected")
+    print(telemetry.report())
+    sys.exit(1 if wrong else 0)
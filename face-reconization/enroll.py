@@ -0,0 +1,100 @@
+"""Build or update the face galleries offline, embedding images on a process pool.
+
+    python enroll.py                     # embed new and changed images
+    python enroll.py --person sachin     # redo one person, leaving everyone else as they are
+    python enroll.py --rebuild           # redo everything
+
+Images are faces_dataset/<person>/<image>. Unchanged files (same size and
+modification time, or same bytes) are skipped. An image is rejected when
+no face is found, or when the largest face is too small or too blurry to
+be a good reference; otherwise that face, the person being enrolled, is
+embedded and anyone else in the photo is left out. Each model gets its
+own gallery (see gallery.py).
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from gallery import FaceGallery, read_image
+from recognizer import FaceRecognizer, face_box
+
+# Set in each worker process by start_worker()
+recognizer = None
+min_face = 0
+min_sharpness = 0.0
+
+
+def start_worker(model_name, detector_backend, smallest_face, sharpness):
+    global recognizer, min_face, min_sharpness
+    recognizer = FaceRecognizer(None, model_name, detector_backend)  # Loads the model once per process
+    min_face = smallest_face
+    min_sharpness = sharpness
+
+
+def enroll_image(path):
+    """([embedding], None) for a usable image, ([], why not) otherwise."""
+    image = read_image(path)
+    if image is None:
+        return [], "unreadable"
+    faces = recognizer.detect(image)
+    if not faces:
+        return [], "no face"
+    face = max(faces, key=lambda face: face_box(face)[2] * face_box(face)[3])
+    size = min(face_box(face)[2:])
+    if size < min_face:
+        return [], f"face too small ({size} px)"
+    # Variance of the Laplacian: low when there are few sharp edges
+    gray = cv2.cvtColor((face["face"] * 255).astype(np.uint8), cv2.COLOR_RGB2GRAY)
+    sharpness = cv2.Laplacian(gray, cv2.CV_64F).var()
+    if sharpness < min_sharpness:
+        return [], f"blurry (sharpness {sharpness:.0f})"
+    return recognizer.embed([face["face"]]).tolist(), None
+
+
+def enroll(gallery, jobs, people=None, force=False, min_face_size=48, sharpness=20.0):
+    worker_args = (gallery.model_name, gallery.detector_backend, min_face_size, sharpness)
+    if jobs <= 1:
+        start_worker(*worker_args)
+        return gallery.refresh(lambda paths: [enroll_image(path) for path in paths], people, force)
+    # Spawned, not forked: TensorFlow does not survive a fork
+    with ProcessPoolExecutor(jobs, multiprocessing.get_context("spawn"), start_worker, worker_args) as pool:
+        return gallery.refresh(lambda paths: list(pool.map(enroll_image, paths)), people, force)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Embed faces_dataset into the recognition galleries")
+    parser.add_argument("--dataset", default="faces_dataset")
+    parser.add_argument("--model", nargs="+", default=["VGG-Face"], help="models to build galleries for")
+    parser.add_argument("--detector", default="opencv")
+    parser.add_argument("--jobs", type=int, default=min(4, os.cpu_count() or 1),
+                        help="worker processes; each loads its own copy of the model")
+    parser.add_argument("--person", action="append", help="only re-enroll this person (repeatable)")
+    parser.add_argument("--rebuild", action="store_true", help="re-embed every image, changed or not")
+    parser.add_argument("--min-face", type=int, default=48, help="smallest face side accepted, in pixels")
+    parser.add_argument("--min-sharpness", type=float, default=20.0,
+                        help="reject faces blurrier than this (variance of the Laplacian)")
+    args = parser.parse_args()
+
+    people = set(args.person) if args.person else None
+    for model_name in args.model:
+        gallery = FaceGallery(args.dataset, model_name=model_name, detector_backend=args.detector)
+        to_embed, to_remove, _ = gallery.changes(people, force=args.rebuild or people is not None)
+        print(f"{model_name}: {len(to_embed)} images to embed, {len(to_remove)} to remove")
+
+        start = time.perf_counter()
+        added, removed = enroll(gallery, args.jobs, people, args.rebuild or people is not None,
+                                args.min_face, args.min_sharpness)
+        elapsed = time.perf_counter() - start
+        for path in to_embed:
+            if path in gallery.rejected:
+                print(f"  rejected {path}: {gallery.rejected[path]}")
+        rate = f" ({added / elapsed:.2f} images/s with {args.jobs} jobs)" if added else ""
+        print(f"{model_name}: {added} images embedded, {removed} removed in {elapsed:.1f} s{rate}; "
+              f"gallery has {len(gallery)} faces of {len(set(gallery.identities))} people")
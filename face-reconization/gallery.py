@@ -0,0 +1,259 @@
+"""Face embeddings of a dataset folder, kept in one float32 matrix and searched with a matrix multiply.
+
+The dataset is laid out as faces_dataset/<person>/<image>. Every face
+found in an image is one row of the matrix, L2-normalized so that a dot
+product is the cosine similarity. The matrix is saved next to the images
+as an .npy file (memory-mapped on load, so opening a big gallery reads
+only the pages a search touches) with a JSON index of which image each
+row came from.
+
+refresh() compares the folder against the index by file size and
+modification time, and for files whose either changed, by a hash of
+their bytes: only new or really changed images are embedded, and rows
+of deleted images are dropped. A gallery that does not exist yet starts
+from DeepFace's own representations pickle for the model, when there is
+one, so the images DeepFace.find has already embedded are not redone.
+enroll.py builds and updates galleries in parallel.
+"""
+import hashlib
+import json
+import os
+import pickle
+
+import cv2
+import numpy as np
+
+GALLERY_VERSION = 2  # Index files of other versions are rebuilt
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp", ".bmp")
+
+# DeepFace's cosine-distance cut-offs for calling two faces the same person
+THRESHOLDS = {
+    "VGG-Face": 0.68, "Facenet": 0.40, "Facenet512": 0.30, "ArcFace": 0.68, "Dlib": 0.07,
+    "SFace": 0.593, "OpenFace": 0.10, "DeepFace": 0.23, "DeepID": 0.015, "GhostFaceNet": 0.65,
+}
+
+
+def image_files(dataset_path):
+    """{path relative to dataset_path: [size, mtime_ns]} for every image under it."""
+    files = {}
+    for folder, _, names in os.walk(dataset_path):
+        for name in names:
+            if name.lower().endswith(IMAGE_EXTENSIONS):
+                path = os.path.join(folder, name)
+                stat = os.stat(path)
+                files[os.path.relpath(path, dataset_path)] = [stat.st_size, stat.st_mtime_ns]
+    return files
+
+
+def file_hash(path):
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def read_image(path):
+    """cv2.imread for any file name, spaces and non-ASCII characters included."""
+    return cv2.imdecode(np.fromfile(path, np.uint8), cv2.IMREAD_COLOR)
+
+
+def normalize(embeddings):
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    norms = np.linalg.norm(embeddings, axis=-1, keepdims=True)
+    return embeddings / np.maximum(norms, 1e-12)
+
+
+def deepface_embedder(model_name, detector_backend):
+    """embed(path) -> the embedding of every face DeepFace finds in the image."""
+    def embed(path):
+        from deepface import DeepFace  # Only needed when an image has to be embedded
+
+        image = read_image(path)
+        if image is None:
+            return []
+        faces = DeepFace.represent(img_path=image, model_name=model_name, detector_backend=detector_backend,
+                                   enforce_detection=False)
+        return [face["embedding"] for face in faces]
+    return embed
+
+
+class FaceGallery:
+    def __init__(self, dataset_path, model_name="VGG-Face", detector_backend="opencv", mmap=True, embed=None):
+        self.dataset_path = dataset_path
+        self.model_name = model_name
+        self.detector_backend = detector_backend
+        self.mmap = mmap
+        self.embed = embed or deepface_embedder(model_name, detector_backend)
+        self.threshold = THRESHOLDS.get(model_name, 0.4)
+
+        name = f"gallery_{model_name.lower()}_{detector_backend}"
+        self.matrix_path = os.path.join(dataset_path, name + ".npy")
+        self.index_path = os.path.join(dataset_path, name + ".json")
+        # DeepFace.find's cache of the same embeddings, used to seed a new gallery
+        self.representations_path = os.path.join(
+            dataset_path, f"ds_model_{model_name.lower().replace('-', '')}_detector_{detector_backend}"
+                          f"_aligned_normalization_base_expand_0.pkl")
+
+        self.files = {}  # Relative image path: [size, mtime_ns, sha1] when it was embedded
+        self.rejected = {}  # Relative image path: why no face from it is in the gallery
+        self.paths = []  # Relative image path of each row
+        self.identities = np.array([], dtype=object)  # Person (the image's folder) of each row
+        self.matrix = np.zeros((0, 0), dtype=np.float32)
+        self.load()
+
+    def __len__(self):
+        return len(self.paths)
+
+    def load(self):
+        try:
+            with open(self.index_path) as f:
+                index = json.load(f)
+            matrix = np.load(self.matrix_path, mmap_mode="r" if self.mmap else None)
+        except (OSError, ValueError):
+            self.load_representations()
+            return
+        if index.get("version") != GALLERY_VERSION:
+            self.load_representations()
+            return
+        paths = [path for path, count in index["rows"] for _ in range(count)]
+        if len(matrix) != len(paths):
+            return  # A half-written gallery; refresh() rebuilds it
+        self.files = index["files"]
+        self.rejected = index["rejected"]
+        self.set_rows(paths, matrix)
+
+    def load_representations(self):
+        """Start from DeepFace.find's pickle, keeping the images that are still there unchanged."""
+        try:
+            with open(self.representations_path, "rb") as f:
+                representations = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return
+        current = image_files(self.dataset_path)
+        paths, embeddings = [], []
+        for entry in representations:
+            # <person>/<image>: the pickle's paths are relative to wherever DeepFace.find was run from
+            folder, name = os.path.split(os.path.normpath(entry["identity"]))
+            path = os.path.join(os.path.basename(folder), name)
+            if path in current and entry.get("embedding") is not None:
+                paths.append(path)
+                embeddings.append(entry["embedding"])
+                if path not in self.files:
+                    self.files[path] = current[path] + [file_hash(os.path.join(self.dataset_path, path))]
+        if paths:
+            self.save(paths, normalize(embeddings))
+
+    def set_rows(self, paths, matrix):
+        self.paths = list(paths)
+        self.identities = np.array([os.path.dirname(path) or path for path in self.paths], dtype=object)
+        self.matrix = matrix
+
+    def changes(self, people=None, force=False):
+        """(images to embed, images whose rows go, {unchanged image: its new stat}) since the last refresh.
+
+        Paths are relative to the dataset. people limits it to those
+        people's folders; force counts all of their images as changed.
+        """
+        in_scope = (lambda path: True) if people is None else (lambda path: os.path.dirname(path) in people)
+        current = {path: stat for path, stat in image_files(self.dataset_path).items() if in_scope(path)}
+        added, touched = [], {}
+        for path, stat in sorted(current.items()):
+            known = self.files.get(path)
+            if known is not None and not force:
+                if known[:2] == stat:
+                    continue
+                # Touched or copied but the same bytes: only the stat needs updating
+                digest = file_hash(os.path.join(self.dataset_path, path))
+                if known[2:] == [digest]:
+                    touched[path] = stat + [digest]
+                    continue
+            added.append(path)
+        removed = {path for path in self.files if in_scope(path) and (path not in current or path in added)}
+        return added, removed, touched
+
+    def refresh(self, embed_all=None, people=None, force=False):
+        """Embed new or changed images and drop deleted ones; returns (images added, images removed).
+
+        embed_all(paths) -> (embeddings, rejection reason or None) per
+        path, in order, lets the caller embed many images at once (e.g.
+        on a process pool); by default they are embedded one at a time
+        with embed(). people and force are as for changes().
+        """
+        added, removed, touched = self.changes(people, force)
+        self.files.update(touched)
+        if not removed and not added:
+            if touched:
+                self.save_index(self.paths)
+            return 0, 0
+
+        keep = [row for row, path in enumerate(self.paths) if path not in removed]
+        paths = [self.paths[row] for row in keep]
+        blocks = [np.asarray(self.matrix[keep])] if keep else []
+        for path in removed:
+            del self.files[path]
+            self.rejected.pop(path, None)
+
+        full_paths = [os.path.join(self.dataset_path, path) for path in added]
+        if embed_all is None:
+            results = [(embeddings, None if embeddings else "no face") for embeddings in map(self.embed, full_paths)]
+        else:
+            results = embed_all(full_paths)
+        for path, full_path, (embeddings, rejected) in zip(added, full_paths, results):
+            if embeddings:
+                blocks.append(normalize(embeddings))
+                paths += [path] * len(embeddings)
+            if rejected:
+                self.rejected[path] = rejected
+            # Also recorded when rejected, so it isn't retried until the file changes
+            stat = os.stat(full_path)
+            self.files[path] = [stat.st_size, stat.st_mtime_ns, file_hash(full_path)]
+
+        matrix = np.concatenate(blocks) if blocks else np.zeros((0, 0), dtype=np.float32)
+        self.save(paths, matrix)
+        return len(added), len(removed - set(added))
+
+    def save(self, paths, matrix):
+        # Written to temporary files and renamed, so a crash never leaves a half-written gallery
+        with open(self.matrix_path + ".tmp", "wb") as f:
+            np.save(f, matrix)
+        self.write_index(paths)
+        os.replace(self.matrix_path + ".tmp", self.matrix_path)
+        os.replace(self.index_path + ".tmp", self.index_path)
+        self.set_rows(paths, np.load(self.matrix_path, mmap_mode="r") if self.mmap else matrix)
+
+    def save_index(self, paths):
+        self.write_index(paths)
+        os.replace(self.index_path + ".tmp", self.index_path)
+
+    def write_index(self, paths):
+        # Rows as runs of [image, row count]: one entry per image, not per face
+        rows = []
+        for path in paths:
+            if rows and rows[-1][0] == path:
+                rows[-1][1] += 1
+            else:
+                rows.append([path, 1])
+        with open(self.index_path + ".tmp", "w") as f:
+            json.dump({"version": GALLERY_VERSION, "model": self.model_name, "detector": self.detector_backend,
+                       "files": self.files, "rejected": self.rejected, "rows": rows}, f)
+
+    def match(self, embeddings, k=1):
+        """The k closest gallery faces to each embedding, as [(identity, path, cosine distance)], closest first."""
+        queries = np.atleast_2d(normalize(embeddings))
+        if not len(self):
+            return [[] for _ in queries]
+        similarity = queries @ self.matrix.T
+        k = min(k, len(self))
+        if k == 1:
+            top = similarity.argmax(axis=1)[:, None]
+        else:
+            top = np.argpartition(-similarity, k - 1, axis=1)[:, :k]
+            top = np.take_along_axis(top, np.argsort(-np.take_along_axis(similarity, top, axis=1), axis=1), axis=1)
+        return [[(self.identities[row], self.paths[row], float(1 - similarity[i, row])) for row in rows]
+                for i, rows in enumerate(top)]
+
+    def identify(self, embedding):
+        """(person, cosine distance) of the closest face, with "Unknown" past the model's threshold."""
+        matches = self.match(embedding)[0]
+        if not matches:
+            return "Unknown", 1.0
+        identity, _, distance = matches[0]
+        return (identity if distance <= self.threshold else "Unknown"), distance
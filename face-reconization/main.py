@@ -1,9 +1,35 @@
+import argparse
 import os
-from deepface import DeepFace
+import sys
 import cv2
 import numpy as np
 import time
-import pandas as pd
+from collections import deque
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.frame_source import open_source
+from common.telemetry import Telemetry
+from gallery import FaceGallery
+from recognizer import FaceRecognizer
+from tracker import FaceTracker
+from workers import RecognitionWorkers, TrackedRecognizer, latency_report
+
+def draw_face(frame, face, age=None):
+    x, y, w, h = face.box
+
+    # Draw rectangle around face
+    cv2.rectangle(frame, (x, y), (x+w, y+h), (0, 255, 0), 2)
+
+    # Add name and confidence
+    label = f"{face.identity}"
+    if face.confidence() > 0:
+        label += f" ({face.confidence():.1f}%)"
+    if age is not None:
+        label += f" {1000 * age:.0f} ms ago"  # How old the frame this came from is
+
+    cv2.rectangle(frame, (x, y-35), (x+w, y), (0, 255, 0), cv2.FILLED)
+    cv2.putText(frame, label, (x+6, y-6), 
+              cv2.FONT_HERSHEY_DUPLEX, 0.6, (255, 255, 255), 1)
 
 class AdvancedFaceRecognition:
     def __init__(self, dataset_path, model_name="VGG-Face"):  # Changed default model to VGG-Face for better compatibility
@@ -11,110 +37,120 @@ class AdvancedFaceRecognition:
         self.model_name = model_name
         self.db_path = dataset_path
         print(f"Initializing face recognition system with {model_name} model...")
+
+        # Every dataset face's embedding in one matrix, searched in-process instead of through DeepFace.find.
+        # It is built by enroll.py, not here, so a changed dataset never holds up the camera.
+        self.gallery = FaceGallery(dataset_path, model_name=model_name, detector_backend="opencv")
+        added, removed, _ = self.gallery.changes()
+        print(f"Gallery: {len(self.gallery)} faces of {len(set(self.gallery.identities))} people")
+        if added or removed:
+            print(f"{len(added)} images are new or changed and {len(removed)} were removed since the last "
+                  f"enrollment; run python enroll.py to update the gallery")
         
-    def run_recognition(self):
-        video_capture = cv2.VideoCapture(0)
+    def run_recognition(self, source="auto", realtime=True, telemetry=None, max_age=30, workers=0):
+        telemetry = telemetry or Telemetry()
+        try:
+            video_capture = open_source(source, realtime=realtime)
+        except OSError as e:
+            print(f"Error: {e}")
+            return
         if not video_capture.isOpened():
-            print("Error: Could not open video capture device")
+            print(f"Error: Could not open {video_capture}")
             return
 
+        recognizer = FaceRecognizer(self.gallery, self.model_name, detector_backend="opencv", telemetry=telemetry)
+        # Faces are detected every frame but only recognized again when their track needs it
+        tracker = FaceTracker(max_age=max_age)
         print(f"Starting face recognition using {self.model_name}...")
         print("Press 'q' to quit")
         
+        recognize = TrackedRecognizer(recognizer, tracker)
+        # With workers, recognition runs beside the display loop, which shows the newest result it has
+        pool = RecognitionWorkers(recognize, workers).start() if workers else None
+        shown = None  # Frame number of the result drawn last
+        latencies = deque(maxlen=1000)  # Seconds from capture to a recognition result's first display
+        
         frame_count = 0
         start_time = time.time()
         
         while True:
-            ret, frame = video_capture.read()
+            telemetry.frame()
+            with telemetry.span("camera read"):
+                ret, frame = video_capture.read()
+            captured_at = time.perf_counter()
             if not ret:
-                print("Error: Could not read frame")
+                print(f"Could not read a frame from {video_capture}, stopping")
                 break
                 
             frame_count += 1
-            
-            # Process every 3rd frame to improve performance
-            if frame_count % 3 != 0:
-                cv2.imshow('Advanced Face Recognition', frame)
-                if cv2.waitKey(1) & 0xFF == ord('q'):
-                    break
-                continue
-                
-            try:
-                # First, detect faces
-                faces = DeepFace.extract_faces(
-                    img_path=frame,
-                    detector_backend="opencv",
-                    enforce_detection=False
-                )
-                
-                if faces:  # If faces were detected
-                    # Try to recognize each detected face
-                    results = DeepFace.find(
-                        img_path=frame,
-                        db_path=self.db_path,
-                        model_name=self.model_name,
-                        enforce_detection=False,
-                        detector_backend="opencv",
-                        distance_metric="cosine"
-                    )
+
+            if pool:
+                pool.submit(frame.copy(), frame_count, captured_at)  # Boxes are drawn on this frame meanwhile
+                result = pool.latest
+                if result is not None:
+                    age = captured_at - result.captured_at
+                    for face in result.faces:
+                        draw_face(frame, face, age)
+                    if result.frame_number != shown:
+                        shown = result.frame_number
+                        latencies.append(time.perf_counter() - result.captured_at)
+            else:
+                try:
+                    # Detect and track every face, recognize the ones that need it, all before showing the frame
+                    for face in recognize(frame, frame_count):
+                        draw_face(frame, face)
+                    latencies.append(time.perf_counter() - captured_at)
                     
-                    if isinstance(results, list) and len(results) > 0:
-                        df = results[0]
-                        if isinstance(df, pd.DataFrame) and not df.empty:
-                            # Process each detected face
-                            for i, face in enumerate(faces):
-                                if 'facial_area' in face:
-                                    region = face['facial_area']
-                                    x = region['x']
-                                    y = region['y']
-                                    w = region['w']
-                                    h = region['h']
-                                    
-                                    # Get identity if available
-                                    person_name = "Unknown"
-                                    confidence = 0
-                                    
-                                    if i < len(df):
-                                        row = df.iloc[i]
-                                        if 'identity' in row:
-                                            identity_path = row['identity']
-                                            person_name = os.path.basename(os.path.dirname(identity_path))
-                                            # Calculate confidence (1 - distance for cosine metric)
-                                            if 'distance' in row:
-                                                confidence = (1 - row['distance']) * 100
-                                    
-                                    # Draw rectangle around face
-                                    cv2.rectangle(frame, (x, y), (x+w, y+h), (0, 255, 0), 2)
-                                    
-                                    # Add name and confidence
-                                    label = f"{person_name}"
-                                    if confidence > 0:
-                                        label += f" ({confidence:.1f}%)"
-                                        
-                                    cv2.rectangle(frame, (x, y-35), (x+w, y), (0, 255, 0), cv2.FILLED)
-                                    cv2.putText(frame, label, (x+6, y-6), 
-                                              cv2.FONT_HERSHEY_DUPLEX, 0.6, (255, 255, 255), 1)
-                
-            except Exception as e:
-                print(f"Frame processing error: {str(e)}")
-                continue
+                except Exception as e:
+                    print(f"Frame processing error: {str(e)}")
+                    continue
             
             # Calculate and display FPS
             if frame_count % 30 == 0:
                 fps = frame_count / (time.time() - start_time)
                 cv2.putText(frame, f"FPS: {fps:.2f}", (10, 30), 
                            cv2.FONT_HERSHEY_DUPLEX, 1, (0, 255, 0), 2)
+
+            # Per-stage timings over the last second, when --telemetry is on
+            for i, line in enumerate(telemetry.overlay_lines):
+                cv2.putText(frame, line, (10, 60 + 18 * i), cv2.FONT_HERSHEY_PLAIN, 1, (0, 0, 255), 1)
             
             # Display the frame
-            cv2.imshow('Advanced Face Recognition', frame)
+            with telemetry.span("display"):
+                cv2.imshow('Advanced Face Recognition', frame)
+                key = cv2.waitKey(1) & 0xFF
             
-            if cv2.waitKey(1) & 0xFF == ord('q'):
+            if key == ord('q'):
                 break
         
+        elapsed = time.time() - start_time
+        if pool:
+            pool.stop()
+            print(pool.report())
+        if frame_count:
+            print(f"{frame_count} frames in {elapsed:.1f} s ({frame_count / elapsed:.2f} FPS)")
+            print(latency_report(latencies, frame_count, elapsed))
+            print(tracker.report(elapsed / 60))
         video_capture.release()
         cv2.destroyAllWindows()
+        if telemetry.enabled:
+            print(telemetry.close())
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Advanced Face Recognition")
+    parser.add_argument("--source", default="auto",
+                        help="camera index, video file, image directory or glob (default: the camera used last time)")
+    parser.add_argument("--every-frame", action="store_true",
+                        help="read a video or images as fast as possible instead of at their frame rate (for benchmarks)")
+    parser.add_argument("--max-age", type=int, default=30,
+                        help="frames before a recognized face is checked again (0 recognizes every face every frame)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="recognition threads beside the display loop (0 recognizes each frame before showing it)")
+    parser.add_argument("--telemetry", action="store_true",
+                        help="time each stage of a frame, show the timings on the video and print them at exit")
+    parser.add_argument("--trace", metavar="FILE", help="also write every timed stage to FILE (Chrome trace JSON)")
+    args = parser.parse_args()
+
     dataset_path = "faces_dataset"
     
     recognition_system = AdvancedFaceRecognition(
@@ -122,4 +158,6 @@ if __name__ == "__main__":
         model_name="VGG-Face"  # Using VGG-Face for better reliability
     )
     
-    recognition_system.run_recognition()
\ No newline at end of file
+    recognition_system.run_recognition(args.source, realtime=not args.every_frame,
+                                       telemetry=Telemetry(args.telemetry, args.trace), max_age=args.max_age,
+                                       workers=args.workers)
\ No newline at end of file
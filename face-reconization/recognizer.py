@@ -0,0 +1,91 @@
+"""One detection pass per frame, one batched model call for all its faces.
+
+DeepFace.represent on a frame runs the model once per face. Here the
+detector runs once, every face is cropped and aligned, the crops go
+through the recognition model together as a single batch, and each
+embedding is matched against the gallery on its own. The crops are
+prepared the way DeepFace.represent prepares them, so embeddings match
+the ones the gallery was built from.
+"""
+import numpy as np
+
+from common.telemetry import Telemetry
+
+
+def face_box(face):
+    """(x, y, w, h) of a face from DeepFace.extract_faces."""
+    area = face["facial_area"]
+    return area["x"], area["y"], area["w"], area["h"]
+
+
+class Face:
+    def __init__(self, box, identity, distance, detection_confidence):
+        self.box = box  # (x, y, w, h) in frame pixels
+        self.identity = identity  # Folder name of the closest gallery face, or "Unknown"
+        self.distance = distance  # Cosine distance to that face
+        self.detection_confidence = detection_confidence
+
+    def confidence(self):
+        """Match confidence in percent, 0 for an unknown face."""
+        return (1 - self.distance) * 100 if self.identity != "Unknown" else 0
+
+
+class FaceRecognizer:
+    def __init__(self, gallery, model_name="VGG-Face", detector_backend="opencv", telemetry=None):
+        from deepface import DeepFace
+        from deepface.modules import preprocessing
+
+        self.DeepFace = DeepFace
+        self.preprocessing = preprocessing
+        self.gallery = gallery
+        self.detector_backend = detector_backend
+        self.telemetry = telemetry or Telemetry()
+        try:
+            self.model = DeepFace.build_model(model_name=model_name, task="facial_recognition")
+        except TypeError:  # DeepFace before 0.0.93 only builds recognition models
+            self.model = DeepFace.build_model(model_name)
+        # Same (width, height) order DeepFace.represent hands to resize_image
+        self.target_size = (self.model.input_shape[1], self.model.input_shape[0])
+
+    def detect(self, frame):
+        """Aligned face crops (RGB, 0-1) with their boxes; a frame with no face gives []."""
+        with self.telemetry.span("detect"):
+            faces = self.DeepFace.extract_faces(img_path=frame, detector_backend=self.detector_backend,
+                                                enforce_detection=False, align=True)
+        # With enforce_detection off, "no face" comes back as the whole frame with confidence 0
+        return [face for face in faces if face.get("confidence", 0) > 0]
+
+    def embed(self, crops):
+        """Embeddings of all crops from one forward pass of the model."""
+        batch = np.concatenate([
+            self.preprocessing.normalize_input(
+                self.preprocessing.resize_image(crop[:, :, ::-1], self.target_size), normalization="base")
+            for crop in crops])  # represent() feeds the model BGR crops
+        keras_model = getattr(self.model, "model", None)
+        if keras_model is not None and hasattr(keras_model, "predict_on_batch"):
+            return np.asarray(keras_model(batch, training=False))
+        # Models that are not Keras networks (Dlib, SFace) only take one face at a time
+        return np.array([self.model.forward(face[None]) for face in batch])
+
+    def recognize(self, frame):
+        """Every face in the frame, each matched against the gallery by its own embedding."""
+        return self.identify(self.detect(frame))
+
+    def identify(self, faces):
+        """Embed and match faces from detect(), all in one batch."""
+        telemetry = self.telemetry
+        if not faces:
+            return []
+        telemetry.count("faces", len(faces))
+        with telemetry.span("embed"):
+            embeddings = self.embed([face["face"] for face in faces])
+        with telemetry.span("match"):
+            matches = self.gallery.match(embeddings)
+
+        results = []
+        for face, closest in zip(faces, matches):
+            identity, _, distance = closest[0] if closest else ("Unknown", None, 1.0)
+            if distance > self.gallery.threshold:
+                identity = "Unknown"
+            results.append(Face(face_box(face), identity, distance, face.get("confidence", 0)))
+        return results
@@ -0,0 +1,108 @@
+"""Follows faces from frame to frame so each one is recognized once, not every frame.
+
+Detections are matched to the tracks of the previous frames by box
+overlap (IoU), and failing that by how close their centres are, for a
+face that moved too far in one frame to overlap its old box. A track
+keeps the identity it was last recognized as. needs_recognition() says
+when that is worth redoing: a new track, a low-confidence match (retried
+every few frames), or one older than max_age frames.
+"""
+import numpy as np
+
+
+def iou(boxes, others):
+    """Intersection over union of every (x, y, w, h) box in boxes with every one in others."""
+    a = np.asarray(boxes, dtype=np.float64).reshape(-1, 1, 4)
+    b = np.asarray(others, dtype=np.float64).reshape(1, -1, 4)
+    overlap_w = np.clip(np.minimum(a[..., 0] + a[..., 2], b[..., 0] + b[..., 2]) - np.maximum(a[..., 0], b[..., 0]), 0, None)
+    overlap_h = np.clip(np.minimum(a[..., 1] + a[..., 3], b[..., 1] + b[..., 3]) - np.maximum(a[..., 1], b[..., 1]), 0, None)
+    intersection = overlap_w * overlap_h
+    return intersection / (a[..., 2] * a[..., 3] + b[..., 2] * b[..., 3] - intersection)
+
+
+class Track:
+    def __init__(self, track_id, box, frame_number):
+        self.id = track_id
+        self.box = box
+        self.last_seen = frame_number
+        self.identity = None  # Not recognized yet
+        self.distance = 1.0
+        self.recognized_at = None  # Frame number of the last recognition
+
+    def confidence(self):
+        return (1 - self.distance) * 100 if self.identity not in (None, "Unknown") else 0
+
+
+class FaceTracker:
+    def __init__(self, iou_threshold=0.3, max_missed=5, max_age=30, min_confidence=50, retry_every=5):
+        self.iou_threshold = iou_threshold
+        self.max_missed = max_missed  # Frames a track survives without a detection
+        self.max_age = max_age  # Frames before a confident identity is checked again; 0 recognizes every frame
+        self.min_confidence = min_confidence  # Match confidence (percent) below which a track is retried
+        self.retry_every = retry_every
+        self.tracks = []
+        self.next_id = 1
+
+        self.detections = 0  # Faces seen, each of which would be recognized without tracking
+        self.recognitions = 0
+
+    def update(self, boxes, frame_number):
+        """The track of each box, in the same order; unmatched boxes start new tracks."""
+        matched = [None] * len(boxes)
+        free = list(self.tracks)
+        if boxes and free:
+            overlaps = iou(boxes, [track.box for track in free])
+            # Greedy: the best-overlapping pairs first
+            for flat in np.argsort(-overlaps, axis=None):
+                i, j = np.unravel_index(flat, overlaps.shape)
+                if overlaps[i, j] < self.iou_threshold:
+                    break
+                if matched[i] is None and free[j] is not None:
+                    matched[i], free[j] = free[j], None
+
+            # Fast movers: the nearest unclaimed track within half a face width
+            for i, box in enumerate(boxes):
+                if matched[i] is not None:
+                    continue
+                x, y, w, h = box
+                best, best_distance = None, 0.5 * max(w, h)
+                for j, track in enumerate(free):
+                    if track is None:
+                        continue
+                    tx, ty, tw, th = track.box
+                    distance = np.hypot(x + w / 2 - tx - tw / 2, y + h / 2 - ty - th / 2)
+                    if distance < best_distance:
+                        best, best_distance = j, distance
+                if best is not None:
+                    matched[i], free[best] = free[best], None
+
+        for i, box in enumerate(boxes):
+            if matched[i] is None:
+                matched[i] = Track(self.next_id, box, frame_number)
+                self.next_id += 1
+                self.tracks.append(matched[i])
+            matched[i].box = box
+            matched[i].last_seen = frame_number
+        self.tracks = [track for track in self.tracks if frame_number - track.last_seen <= self.max_missed]
+        self.detections += len(boxes)
+        return matched
+
+    def needs_recognition(self, track, frame_number):
+        if track.recognized_at is None:
+            return True
+        age = frame_number - track.recognized_at
+        if track.confidence() < self.min_confidence:
+            return age >= self.retry_every
+        return age >= self.max_age
+
+    def assign(self, track, identity, distance, frame_number):
+        track.identity = identity
+        track.distance = distance
+        track.recognized_at = frame_number
+        self.recognitions += 1
+
+    def report(self, minutes):
+        saved = self.detections - self.recognitions
+        per_minute = f", {saved / minutes:.0f} per minute" if minutes > 0 else ""
+        return (f"Recognition: {self.recognitions} of {self.detections} detected faces embedded, "
+                f"{saved} saved by tracking{per_minute}; {self.next_id - 1} tracks")
@@ -0,0 +1,123 @@
+"""Face recognition off the display thread.
+
+The main thread reads the camera and shows every frame at camera rate,
+drawing the newest recognition result it has, however old. Frames go to
+a few worker threads through a LatestBuffer: a frame no worker was free
+for is replaced by the next one, so workers always start on the newest
+frame instead of working through a backlog. Threads rather than
+processes, because the model and the detector spend their time in
+native code that releases the GIL, and every process would need its
+own copy of the model.
+"""
+import threading
+import time
+
+from common.pose_pipeline import LatestBuffer
+from recognizer import Face, face_box
+
+
+class TrackedRecognizer:
+    """Detect, track and recognize one frame; callable from several threads at once.
+
+    Detection and recognition run in parallel; the tracker is updated
+    under a lock, in frame order, and a frame older than one already
+    tracked is dropped (returns None).
+    """
+
+    def __init__(self, recognizer, tracker):
+        self.recognizer = recognizer
+        self.tracker = tracker
+        self.lock = threading.Lock()
+        self.last_frame = 0
+
+    def __call__(self, frame, frame_number):
+        faces = self.recognizer.detect(frame)
+        with self.lock:
+            if frame_number < self.last_frame:
+                return None
+            self.last_frame = frame_number
+            with self.recognizer.telemetry.span("track"):
+                tracks = self.tracker.update([face_box(face) for face in faces], frame_number)
+            due = [i for i, track in enumerate(tracks) if self.tracker.needs_recognition(track, frame_number)]
+
+        # Embed and match, in one batch, only the faces that are new or due a re-check
+        results = self.recognizer.identify([faces[i] for i in due])
+        with self.lock:
+            for i, result in zip(due, results):
+                self.tracker.assign(tracks[i], result.identity, result.distance, frame_number)
+            return [Face(track.box, track.identity or "Unknown", track.distance, 0) for track in tracks]
+
+
+class RecognitionResult:
+    def __init__(self, frame_number, captured_at, finished_at, faces):
+        self.frame_number = frame_number
+        self.captured_at = captured_at  # time.perf_counter() when the frame was read
+        self.finished_at = finished_at
+        self.faces = faces
+
+
+class RecognitionWorkers:
+    def __init__(self, recognize, workers=1):
+        self.recognize = recognize  # recognize(frame, frame_number) -> [Face], or None for a stale frame
+        self.jobs = LatestBuffer()
+        self.lock = threading.Lock()
+        self.latest = None  # Newest RecognitionResult
+        self.stopping = threading.Event()
+        self.submitted = 0
+        self.recognized = 0
+        self.stale = 0  # Finished after a newer frame had been tracked
+        self.errors = 0
+
+        self.threads = [threading.Thread(target=self.work, name=f"recognition {i}", daemon=True)
+                        for i in range(workers)]
+
+    def start(self):
+        for thread in self.threads:
+            thread.start()
+        return self
+
+    def stop(self):
+        self.stopping.set()
+        for _ in self.threads:
+            self.jobs.put(None)  # Wake the workers
+        for thread in self.threads:
+            thread.join(timeout=2)
+
+    def submit(self, frame, frame_number, captured_at):
+        self.submitted += 1
+        self.jobs.put((frame, frame_number, captured_at))
+
+    def work(self):
+        while not self.stopping.is_set():
+            job = self.jobs.take(timeout=0.5)
+            if job is None:
+                continue
+            frame, frame_number, captured_at = job
+            try:
+                faces = self.recognize(frame, frame_number)
+            except Exception as e:
+                self.errors += 1
+                print(f"Frame processing error: {str(e)}")
+                continue
+            with self.lock:
+                if faces is None or (self.latest is not None and frame_number < self.latest.frame_number):
+                    self.stale += 1
+                    continue
+                self.recognized += 1
+                self.latest = RecognitionResult(frame_number, captured_at, time.perf_counter(), faces)
+
+    def report(self):
+        return (f"Recognition workers: {self.submitted} frames submitted, {self.recognized} recognized, "
+                f"{self.jobs.dropped} replaced by a newer frame before a worker was free, "
+                f"{self.stale} finished too late to use, {self.errors} errors")
+
+
+def latency_report(latencies, frames, elapsed):
+    """Display rate and capture-to-display latency of recognition results, as text."""
+    line = f"Display: {frames / elapsed:.1f} FPS" if elapsed > 0 else "Display: no frames"
+    if latencies:
+        latencies = sorted(latencies)
+        p95 = latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))]
+        line += (f"; capture-to-display latency of results {1000 * sum(latencies) / len(latencies):.0f} ms average, "
+                 f"{1000 * p95:.0f} ms p95 over {len(latencies)} results")
+    return line
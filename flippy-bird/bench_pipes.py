@@ -0,0 +1,97 @@
+"""Stress test for PipeStore: thousands of pipes on screen at high scroll speeds.
+
+Runs the same pipe simulation with the old list of dicts and with
+PipeStore, checks that both see exactly the same collisions, and reports
+the time per physics step. A second check flies pipes past a bird with
+no gap at speeds up to several screens per step and makes sure no pipe
+slips through without a hit.
+"""
+import argparse
+import random
+import sys
+import time
+
+from pipe_store import PipeStore
+
+PIPE_WIDTH = 80
+BIRD_X, BIRD_WIDTH, BIRD_HEIGHT = 100, 50, 35
+
+
+def old_step(pipes, speed, bird_y, spacing, width, rng):
+    # The loop the game ran before, with dicts in a list
+    for pipe in pipes:
+        pipe["x"] -= speed
+    while pipes and pipes[0]["x"] < -PIPE_WIDTH:
+        pipes.pop(0)
+    while not pipes or pipes[-1]["x"] < width - spacing:
+        top = rng.randint(100, 500)
+        pipes.append({"x": width, "top": top, "bottom": top + 200})
+    for pipe in pipes:
+        if (BIRD_X < pipe["x"] + PIPE_WIDTH and BIRD_X + BIRD_WIDTH > pipe["x"]
+                and (bird_y < pipe["top"] or bird_y + BIRD_HEIGHT > pipe["bottom"])):
+            return True
+    return False
+
+
+def new_step(pipes, speed, bird_y, spacing, width, rng):
+    pipes.move(speed)
+    pipes.drop_passed(-PIPE_WIDTH)
+    while not len(pipes) or pipes.last_x() < width - spacing:
+        top = rng.randint(100, 500)
+        pipes.add(width, top, top + 200)
+    return pipes.hits(BIRD_X, bird_y, BIRD_WIDTH, BIRD_HEIGHT)
+
+
+def run(step, pipes, count, speed, steps):
+    # spacing puts about count pipes on a 1920 px screen
+    spacing = max(1, 1920 // count)
+    rng = random.Random(0)
+    hits = []
+    start = time.perf_counter()
+    for i in range(steps):
+        bird_y = 300 + 250 * ((i * 7919) % 100) / 100  # Wanders in and out of the gaps
+        hits.append(step(pipes, speed, bird_y, spacing, 1920, rng))
+    return (time.perf_counter() - start) / steps, hits
+
+
+def check_no_tunnelling(max_speed):
+    # A wall (no gap) passing the bird must register at least one hit at every speed
+    for speed in range(1, max_speed + 1):
+        pipes = PipeStore(capacity=4)
+        for offset in range(0, speed, max(1, speed // 16)):
+            pipes.clear()
+            pipes.add(BIRD_X + BIRD_WIDTH + offset, 0, 0)
+            hit = False
+            while len(pipes):
+                pipes.move(speed)
+                pipes.drop_passed(BIRD_X - PIPE_WIDTH - 2 * speed)
+                hit |= pipes.hits(BIRD_X, 300, BIRD_WIDTH, BIRD_HEIGHT, speed)
+            if not hit:
+                return speed, offset
+    return None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="PipeStore stress benchmark")
+    parser.add_argument("--pipes", type=int, nargs="+", default=[10, 100, 1000, 5000])
+    parser.add_argument("--speed", type=int, default=2)
+    parser.add_argument("--steps", type=int, default=2000)
+    args = parser.parse_args()
+
+    failed = False
+    print(f"{'pipes':>6} {'list of dicts':>14} {'PipeStore':>10} {'speedup':>8}")
+    for count in args.pipes:
+        old_time, old_hits = run(old_step, [], count, args.speed, args.steps)
+        new_time, new_hits = run(new_step, PipeStore(capacity=count + 4), count, args.speed, args.steps)
+        same = old_hits == new_hits
+        failed |= not same
+        print(f"{count:6d} {1e6 * old_time:11.1f} µs {1e6 * new_time:7.1f} µs {old_time / new_time:7.1f}x"
+              f"{'' if same else '  COLLISIONS DIFFER'}")
+
+    missed = check_no_tunnelling(2000)
+    if missed:
+        failed = True
+        print(f"Tunnelling: a pipe at speed {missed[0]}, offset {missed[1]} passed the bird without a hit")
+    else:
+        print("No tunnelling at speeds up to 2000 px per step")
+    sys.exit(1 if failed else 0)
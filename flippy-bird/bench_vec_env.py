@@ -0,0 +1,65 @@
+import argparse
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.replay import Replay, state_hash
+from vec_env import VecFlappyEnv, PIPE_GAP, PIPE_TOP_RANGE
+
+
+def benchmark(num_envs, steps, seed=0):
+    env = VecFlappyEnv(num_envs, seed=seed, auto_reset=True)
+    rng = np.random.default_rng(seed)
+    jumps = rng.random((steps, num_envs)) < 0.06
+
+    env.step(jumps[0])  # Warm up
+    start = time.perf_counter()
+    for i in range(steps):
+        env.step(jumps[i])
+    elapsed = time.perf_counter() - start
+    return num_envs * steps / elapsed
+
+
+class GamePipes(VecFlappyEnv):
+    # Pipe heights from random.randint with the recording's seed, in the order main-basic.py draws them
+    def __init__(self, seed):
+        self.game_random = random.Random(seed)
+        super().__init__(1, auto_reset=True)
+
+    def pipe_tops(self, count):
+        return [self.game_random.randint(*PIPE_TOP_RANGE) for _ in range(count)]
+
+
+def parity_check(path):
+    """Feed a main-basic.py recording through VecFlappyEnv; True if it ends in the same state."""
+    replay = Replay(path, "flappy-bird-basic")
+    env = GamePipes(replay.seed)
+    for jump in replay.ticks:
+        env.step(np.array([bool(jump)]))
+
+    pipes = [{"x": int(env.pipe_x[0]), "top": int(env.pipe_top[0]), "bottom": int(env.pipe_top[0]) + PIPE_GAP}]
+    bird_y, bird_velocity = float(env.bird_y[0]), float(env.bird_velocity[0])
+    if env.frames[0] == 0:
+        bird_y, bird_velocity = int(bird_y), 0  # Crashed on the last frame: the game reset these to ints
+    return replay.check(state_hash(bird_y, bird_velocity, int(env.score[0]), pipes))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="VecFlappyEnv throughput and parity with main-basic.py")
+    parser.add_argument("--envs", type=int, nargs="+", default=[1, 64, 1024, 16384])
+    parser.add_argument("--steps", type=int, default=1000)
+    parser.add_argument("--parity", nargs="+", metavar="RECORDING",
+                        help="main-basic.py --record files to replay through the env")
+    args = parser.parse_args()
+
+    if args.parity:
+        ok = all([parity_check(path) for path in args.parity])
+        sys.exit(0 if ok else 1)
+
+    for num_envs in args.envs:
+        rate = benchmark(num_envs, args.steps)
+        print(f"{num_envs:6d} envs: {rate / 1e6:7.2f} M bird-steps/s")
@@ -1,6 +1,36 @@
+import argparse
+import os
+import sys
 import pygame
 import random
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.hud import Hud
+from common.render_queue import RenderQueue
+from common.replay import Recorder, Replay, new_seed, state_hash
+from pipe_store import PipeStore
+from policy import MLPPolicy
+from vec_env import observation
+
+parser = argparse.ArgumentParser(description="Flappy Bird AI Control")
+parser.add_argument("--seed", type=int, help="seed for the pipe heights (random by default)")
+parser.add_argument("--record", metavar="FILE", help="save the seed and every frame's jump input to FILE")
+parser.add_argument("--replay", metavar="FILE", help="re-run a recording headless and check its final state")
+parser.add_argument("--ai", metavar="CHECKPOINT", help="let a controller trained by train_ai.py fly the bird")
+args = parser.parse_args()
+
+# A replay runs the same frames without a window, sleeping or drawing
+replay = Replay(args.replay, "flappy-bird-basic") if args.replay else None
+if replay:
+    os.environ["SDL_VIDEODRIVER"] = "dummy"
+    seed = replay.seed
+else:
+    seed = new_seed() if args.seed is None else args.seed
+random.seed(seed)
+recorder = Recorder(args.record, "flappy-bird-basic", seed) if args.record else None
+if args.ai:
+    policy, policy_params, _ = MLPPolicy.load(args.ai)
+
 # Initialize Pygame
 pygame.init()
 
@@ -20,6 +50,12 @@ pipe_bottom = pygame.transform.flip(pipe_top, False, True)
 # Colors
 WHITE = (255, 255, 255)
 
+# Sprites are queued each frame and drawn with a blits call per layer, over a plain white background
+render_queue = RenderQueue(screen, background=WHITE)
+
+# Score text; the font and digits are rendered once, not every frame
+score_hud = Hud("Arial", 30, (0, 0, 0))
+
 # Game Variables
 gravity = 0.4
 bird_x, bird_y = 100, HEIGHT // 2
@@ -27,14 +63,14 @@ bird_velocity = 0
 jump_strength = -8  # Upward movement on jump
 pipe_speed = 3
 score = 0
-pipes = []
+pipes = PipeStore(capacity=4)  # Only one pipe is on screen at a time
 
 # Add pipes
 def create_pipe():
     gap = 150  # Space between top and bottom pipes
     top_pipe_height = random.randint(150, 400)
     bottom_pipe_y = top_pipe_height + gap
-    pipes.append({"x": WIDTH, "top": top_pipe_height, "bottom": bottom_pipe_y})
+    pipes.add(WIDTH, top_pipe_height, bottom_pipe_y)
 
 # Game loop
 running = True
@@ -43,45 +79,55 @@ clock = pygame.time.Clock()
 # Create initial pipes
 create_pipe()
 
-while running:
-    screen.fill(WHITE)
-
-    # Handle events
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
+frame = 0
 
-        # Space bar makes the bird jump
-        if event.type == pygame.KEYDOWN and event.key == pygame.K_SPACE:
-            bird_velocity = jump_strength  # Move bird up
+while running:
+    jump = False
+    if replay:
+        if frame == len(replay.ticks):
+            break
+        jump = bool(replay.ticks[frame])
+    else:
+        # Handle events
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+
+            # Space bar makes the bird jump
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_SPACE:
+                jump = True
+
+        if args.ai:
+            pipe_x, top, bottom = next(iter(pipes))
+            seen = observation(bird_y, bird_velocity, pipe_x, top, bottom)
+            jump = bool(policy.act(policy_params[None], seen[None, None])[0, 0])
+    frame += 1
+
+    if recorder:
+        recorder.write(jump)
+    if jump:
+        bird_velocity = jump_strength  # Move bird up
 
     # Bird physics
     bird_velocity += gravity
     bird_y += bird_velocity
 
     # Pipe movement
-    for pipe in pipes:
-        pipe["x"] -= pipe_speed
+    pipes.move(pipe_speed)
 
     # Remove off-screen pipes and generate new ones
-    if pipes[0]["x"] < -80:
-        pipes.pop(0)
+    for _ in range(pipes.drop_passed(-80)):
         create_pipe()
         score += 1  # Increase score when passing pipes
 
     # Collision detection
-    for pipe in pipes:
-        if (
-            bird_x < pipe["x"] + 80
-            and bird_x + 50 > pipe["x"]
-            and (bird_y < pipe["top"] or bird_y + 35 > pipe["bottom"])
-        ):
-            print("Game Over!")
-            bird_y = HEIGHT // 2  # Reset bird
-            pipes.clear()  # Clear pipes
-            create_pipe()  # Add new pipes
-            score = 0  # Reset score
-            bird_velocity = 0  # Reset movement
+    if pipes.hits(bird_x, bird_y, 50, 35, pipe_speed):
+        print("Game Over!")
+        bird_y = HEIGHT // 2  # Reset bird
+        pipes.clear()  # Clear pipes
+        create_pipe()  # Add new pipes
+        score = 0  # Reset score
+        bird_velocity = 0  # Reset movement
 
     # Check if bird hits the ground
     if bird_y > HEIGHT - 50 or bird_y < 0:
@@ -92,20 +138,27 @@ while running:
         score = 0
         bird_velocity = 0
 
+    if replay:
+        continue
+
     # Draw pipes
-    for pipe in pipes:
-        screen.blit(pipe_top, (pipe["x"], pipe["top"] - 400))  # Top pipe
-        screen.blit(pipe_bottom, (pipe["x"], pipe["bottom"]))  # Bottom pipe
+    for pipe_x, top, bottom in pipes:
+        render_queue.add(pipe_top, (pipe_x, top - 400))  # Top pipe
+        render_queue.add(pipe_bottom, (pipe_x, bottom))  # Bottom pipe
 
     # Draw bird
-    screen.blit(bird_image, (bird_x, bird_y))
+    render_queue.add(bird_image, (bird_x, bird_y), layer=1)
+    render_queue.flush()
 
     # Draw score
-    font = pygame.font.SysFont("Arial", 30)
-    score_text = font.render(f"Score: {score}", True, (0, 0, 0))
-    screen.blit(score_text, (10, 10))
+    score_hud.draw_score(screen, score, (10, 10))
 
     pygame.display.update()
     clock.tick(30)  # 30 FPS
 
+final_hash = state_hash(bird_y, bird_velocity, score, pipes.state())
+if recorder:
+    recorder.close(final_hash)
 pygame.quit()
+if replay:
+    sys.exit(0 if replay.check(final_hash) else 1)
@@ -1,16 +1,59 @@
+import argparse
+import os
+import sys
 import pygame
 import random
 import cv2
 import mediapipe as mp
-import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.hud import Hud
+from common.pose_pipeline import PosePipeline, PoseResult
+from common.head_tracker import HeadTracker
+from common.motion import JumpDetector
+from common.frame_source import open_source
+from common.preview import CameraPreview
+from common.render_queue import RenderQueue
+from common.replay import Recorder, Replay, new_seed, state_hash
+from common.telemetry import Telemetry
+from pipe_store import PipeStore
+
+parser = argparse.ArgumentParser(description="Flappy Bird - Jump to Fly")
+parser.add_argument("--seed", type=int, help="seed for the pipe heights (random by default)")
+parser.add_argument("--record", metavar="FILE", help="save the seed and every frame's jump input to FILE")
+parser.add_argument("--replay", metavar="FILE", help="re-run a recording headless and check its final state")
+parser.add_argument("--pose", choices=["full", "roi"], default="full",
+                    help="roi tracks a downscaled crop around the player and adapts the model size (cheaper)")
+parser.add_argument("--source", default="auto",
+                    help="camera index, video file, image directory or glob (default: the camera used last time)")
+parser.add_argument("--head-log", metavar="FILE", help="write every head position to FILE (CSV for common/bench_jump.py)")
+parser.add_argument("--telemetry", action="store_true",
+                    help="time each stage of a frame, show the timings on screen and print them at exit")
+parser.add_argument("--trace", metavar="FILE", help="also write every timed stage to FILE (Chrome trace JSON)")
+args = parser.parse_args()
+telemetry = Telemetry(args.telemetry, args.trace)
+
+# A replay feeds the recorded jumps back without a camera, window, sleeping or drawing
+replay = Replay(args.replay, "flappy-bird") if args.replay else None
+if replay:
+    os.environ["SDL_VIDEODRIVER"] = "dummy"
+    seed = replay.seed
+else:
+    seed = new_seed() if args.seed is None else args.seed
+random.seed(seed)
 
 # Initialize Pygame
 pygame.init()
 
 # Screen dimensions
-screen_info = pygame.display.Info()
-WIDTH, HEIGHT = screen_info.current_w, screen_info.current_h  # Full-screen size
-screen = pygame.display.set_mode((WIDTH, HEIGHT), pygame.FULLSCREEN)
+if replay:
+    WIDTH, HEIGHT = replay.header["width"], replay.header["height"]  # Same size as the recording
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+else:
+    screen_info = pygame.display.Info()
+    WIDTH, HEIGHT = screen_info.current_w, screen_info.current_h  # Full-screen size
+    screen = pygame.display.set_mode((WIDTH, HEIGHT), pygame.FULLSCREEN)
+recorder = Recorder(args.record, "flappy-bird", seed, width=WIDTH, height=HEIGHT) if args.record else None
 pygame.display.set_caption("Flappy Bird - Jump to Fly")
 
 # Load assets
@@ -24,6 +67,12 @@ pipe_bottom = pygame.transform.flip(pipe_top, False, True)
 # Colors
 WHITE = (255, 255, 255)
 
+# Sprites are queued each frame and drawn with a blits call per layer, over a plain white background
+render_queue = RenderQueue(screen, background=WHITE)
+
+# Score text; the font and digits are rendered once, not every frame
+score_hud = Hud("Arial", 30, (0, 0, 0))
+
 # Game Variables
 gravity = 0.3  
 bird_x, bird_y = 100, HEIGHT // 2
@@ -31,23 +80,38 @@ bird_velocity = 0
 jump_strength = -6  
 pipe_speed = 2  
 score = 0
-pipes = []
 pipe_spacing = 300  # Space between pipes
+pipes = PipeStore(capacity=WIDTH // pipe_spacing + 3)  # Enough for a screen full
 
-# Initialize OpenCV and Mediapipe
-mp_pose = mp.solutions.pose
-pose = mp_pose.Pose()
-mp_draw = mp.solutions.drawing_utils
-cap = cv2.VideoCapture(0)
-
-# Set webcam resolution
-cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
+# Physics keeps its original 30 steps per second; drawing and input run at display rate
+PHYSICS_RATE = 30
+DISPLAY_FPS = 60
+MAX_STEPS_PER_FRAME = 5
 
-# Store previous head positions for smoothing
-prev_head_positions = []
-SMOOTHING_FRAMES = 5
-JUMP_THRESHOLD = 15  
+# Initialize OpenCV and Mediapipe
+if not replay:
+    mp_pose = mp.solutions.pose
+    pose = HeadTracker() if args.pose == "roi" else mp_pose.Pose()
+    mp_draw = mp.solutions.drawing_utils
+    cap = open_source(args.source, 640, 480)  # Webcam resolution, when it is a webcam
+
+    # Camera reads and pose estimation run on background threads so they never stall the game
+    pipeline = PosePipeline(
+        cap, pose,
+        draw=lambda frame, landmarks: mp_draw.draw_landmarks(frame, landmarks, mp_pose.POSE_CONNECTIONS),
+        transform=lambda frame: cv2.rotate(frame, cv2.ROTATE_90_CLOCKWISE),  # Rotate frame if it's incorrectly oriented
+        telemetry=telemetry,
+    ).start()
+
+    # The preview shows the camera upright, so rotate the pipeline's frames back
+    preview = CameraPreview((300, 300), rotate=cv2.ROTATE_90_COUNTERCLOCKWISE)
+    show_preview = False  # Nothing to show before the first frame
+
+# Jumps are spotted from the head's upward speed, against a threshold that adapts to camera noise
+jump_detector = JumpDetector()
+head_log = open(args.head_log, "w") if args.head_log else None
+if head_log:
+    head_log.write("t,y\n")
 
 # Create pipes
 def create_pipe():
@@ -59,131 +123,152 @@ def create_pipe():
     if bottom_pipe_y + 400 > HEIGHT:  
         bottom_pipe_y = HEIGHT - 400
     
-    pipes.append({"x": WIDTH, "top": top_pipe_height, "bottom": bottom_pipe_y})
+    pipes.add(WIDTH, top_pipe_height, bottom_pipe_y)
 
 # Game loop
 running = True
 clock = pygame.time.Clock()
 create_pipe()
+frame_number = 0
+accumulator = 0.0
+jump_requested = None  # Set by SPACE or a pose result, used by the next physics step
 
 while running:
-    screen.fill(WHITE)
-
-    # Capture webcam frame
-    ret, frame = cap.read()
-    if not ret:
-        print("❌ ERROR: Webcam not working!")
-        break
-
-    # Rotate frame if it's incorrectly oriented
-    frame = cv2.rotate(frame, cv2.ROTATE_90_CLOCKWISE)  
-
-    # Convert frame to RGB for Mediapipe
-    frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-    results = pose.process(frame_rgb)
-
-    # Draw skeleton outline on the user
-    if results.pose_landmarks:
-        mp_draw.draw_landmarks(frame, results.pose_landmarks, mp_pose.POSE_CONNECTIONS)
-
-        # Get the nose landmark (head position)
-        nose = results.pose_landmarks.landmark[mp_pose.PoseLandmark.NOSE]
-        head_y = int(nose.y * HEIGHT)
-
-        # Store last few head positions for smoothing
-        prev_head_positions.append(head_y)
-        if len(prev_head_positions) > SMOOTHING_FRAMES:
-            prev_head_positions.pop(0)
-
-        # Calculate the average head position over the last few frames
-        smoothed_head_y = np.mean(prev_head_positions)
-
-        # Compare with previous position to detect jump
-        if len(prev_head_positions) >= 2:
-            head_movement = prev_head_positions[-2] - smoothed_head_y  
-
-            if head_movement > JUMP_THRESHOLD:  
-                bird_velocity = jump_strength
-                print("✅ Jump Detected!")
+    if replay:
+        if frame_number == len(replay.ticks):
+            break
+        steps = 1
+        jump_requested = "replay" if replay.ticks[frame_number] else None
+    else:
+        if pipeline.failed:
+            print(f"❌ ERROR: No frame from {cap}!")
+            break
+
+        # Use the newest pose result, if one arrived since the last frame
+        result = pipeline.latest()
+        if result is not None:
+            if result.landmarks:
+                # Get the nose landmark (head position)
+                nose = result.landmarks.landmark[mp_pose.PoseLandmark.NOSE]
+                if head_log:
+                    head_log.write(f"{result.captured_at:.4f},{nose.y:.5f}\n")
+
+                if jump_detector.update(nose.y, result.captured_at):
+                    jump_requested = result
+                    print("✅ Jump Detected!")
+
+            # Update the camera preview in place, only when a new frame arrives
+            with telemetry.span("preview"):
+                preview.update(result.frame)
+            show_preview = True
+
+        # Handle Pygame events
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+        
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_ESCAPE:  # Press ESC to exit
+                    running = False
+                if event.key == pygame.K_SPACE:  # Press SPACE to jump
+                    jump_requested = "key"
+
+        # Fixed timestep: run as many physics steps as the elapsed time pays for
+        with telemetry.span("wait"):
+            accumulator += clock.tick(DISPLAY_FPS) / 1000
+        steps = min(int(accumulator * PHYSICS_RATE), MAX_STEPS_PER_FRAME)
+        accumulator = 0.0 if steps == MAX_STEPS_PER_FRAME else accumulator - steps / PHYSICS_RATE
+
+    physics_span = telemetry.span("physics").begin()
+    for _ in range(steps):
+        jump = jump_requested is not None
+        if recorder:
+            recorder.write(jump)
+        if jump:
+            bird_velocity = jump_strength
+            telemetry.count("jumps")
+            if isinstance(jump_requested, PoseResult):
+                pipeline.record_action(jump_requested)
+            jump_requested = None
+        frame_number += 1
+
+        # Bird physics (apply gravity)
+        bird_velocity += gravity
+        bird_y += bird_velocity
+
+        # Pipe movement
+        pipes.move(pipe_speed)
+
+        # Remove off-screen pipes and add new ones at correct spacing
+        pipes.drop_passed(-80)
+
+        # Add new pipes only when the last pipe has moved far enough
+        if len(pipes) == 0 or pipes.last_x() < WIDTH - pipe_spacing:
+            create_pipe()
+            score += 1
 
-    # Flip the frame for a mirror effect
-    frame = cv2.flip(frame, 1)
+        # Collision detection
+        if pipes.hits(bird_x, bird_y, 50, 35, pipe_speed):
+            print("Game Over!")
+            bird_y = HEIGHT // 2
+            pipes.clear()
+            create_pipe()
+            score = 0
+            bird_velocity = 0
 
-    # Convert OpenCV frame to Pygame surface
-    frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-    frame = pygame.surfarray.make_surface(frame)
-    
-    # Resize and position video feed (Top Right Corner - 300x300)
-    frame = pygame.transform.scale(frame, (300, 300))
-    screen.blit(frame, (WIDTH - 310, 10))  # 10px padding from the top-right
-
-    # Handle Pygame events
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
-        
-        if event.type == pygame.KEYDOWN:
-            if event.key == pygame.K_ESCAPE:  # Press ESC to exit
-                running = False
-            if event.key == pygame.K_SPACE:  # Press SPACE to jump
-                bird_velocity = jump_strength
-
-    # Bird physics (apply gravity)
-    bird_velocity += gravity
-    bird_y += bird_velocity
-
-    # Pipe movement
-    for pipe in pipes:
-        pipe["x"] -= pipe_speed
-
-    # Remove off-screen pipes and add new ones at correct spacing
-    if len(pipes) > 0 and pipes[0]["x"] < -80:
-        pipes.pop(0)
-
-    # Add new pipes only when the last pipe has moved far enough
-    if len(pipes) == 0 or pipes[-1]["x"] < WIDTH - pipe_spacing:
-        create_pipe()
-        score += 1
-
-    # Collision detection
-    for pipe in pipes:
-        if (
-            bird_x < pipe["x"] + 80
-            and bird_x + 50 > pipe["x"]
-            and (bird_y < pipe["top"] or bird_y + 35 > pipe["bottom"])
-        ):
+        # Check if bird hits ground
+        if bird_y > HEIGHT - 50 or bird_y < 0:
             print("Game Over!")
             bird_y = HEIGHT // 2
             pipes.clear()
             create_pipe()
             score = 0
             bird_velocity = 0
+    physics_span.end()
+
+    if replay:
+        telemetry.frame()
+        continue
 
-    # Check if bird hits ground
-    if bird_y > HEIGHT - 50 or bird_y < 0:
-        print("Game Over!")
-        bird_y = HEIGHT // 2
-        pipes.clear()
-        create_pipe()
-        score = 0
-        bird_velocity = 0
+    draw_span = telemetry.span("draw").begin()
+
+    # Between physics steps, draw things where they are heading
+    ahead = accumulator * PHYSICS_RATE
+    if show_preview:
+        render_queue.add(preview.surface, (WIDTH - 310, 10))  # 10px padding from the top-right
 
     # Draw pipes
-    for pipe in pipes:
-        screen.blit(pipe_top, (pipe["x"], pipe["top"] - 400))  # Top pipe
-        screen.blit(pipe_bottom, (pipe["x"], pipe["bottom"]))  # Bottom pipe
+    for pipe_x, top, bottom in pipes:
+        pipe_x -= pipe_speed * ahead
+        render_queue.add(pipe_top, (pipe_x, top - 400), layer=1)  # Top pipe
+        render_queue.add(pipe_bottom, (pipe_x, bottom), layer=1)  # Bottom pipe
 
     # Draw bird
-    screen.blit(bird_image, (bird_x, bird_y))
+    render_queue.add(bird_image, (bird_x, bird_y + bird_velocity * ahead), layer=2)
+    render_queue.flush()
 
     # Draw score
-    font = pygame.font.SysFont("Arial", 30)
-    score_text = font.render(f"Score: {score}", True, (0, 0, 0))
-    screen.blit(score_text, (10, 10))
-
-    pygame.display.update()
-    clock.tick(30)
-
-cap.release()
-cv2.destroyAllWindows()
+    score_hud.draw_score(screen, score, (10, 10))
+    telemetry.draw_overlay(screen, (10, 50))
+    draw_span.end()
+
+    with telemetry.span("display update"):
+        pygame.display.update()
+    telemetry.frame()
+
+final_hash = state_hash(bird_y, bird_velocity, score, pipes.state())
+if recorder:
+    recorder.close(final_hash)
+if not replay:
+    print(pipeline.report())
+    pipeline.stop()
+    if head_log:
+        head_log.close()
+    if args.pose == "roi":
+        print(pose.report())
+    cv2.destroyAllWindows()
+if telemetry.enabled:
+    print(telemetry.close())
 pygame.quit()
+if replay:
+    sys.exit(0 if replay.check(final_hash) else 1)
@@ -0,0 +1,80 @@
+import numpy as np
+
+# x of a slot with no pipe in it: far enough left that it never collides or draws
+EMPTY = -(2 ** 62)
+
+
+class PipeStore:
+    """Pipes as a ring buffer of NumPy arrays, oldest (leftmost) first.
+
+    Each pipe is an x position plus the bottom of its top half and the top
+    of its bottom half, all in whole pixels. Slots are reused instead of
+    allocating per pipe, and empty slots hold EMPTY so that movement and
+    collision can run over every slot at once without a mask.
+    """
+
+    def __init__(self, capacity, width=80):
+        self.capacity = capacity
+        self.width = width
+        self.x = np.full(capacity, EMPTY, np.int64)
+        self.top = np.zeros(capacity, np.int64)
+        self.bottom = np.zeros(capacity, np.int64)
+        self.head = 0  # Slot of the oldest pipe
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        # (x, top, bottom) from left to right, for drawing
+        for i in range(self.count):
+            slot = (self.head + i) % self.capacity
+            yield int(self.x[slot]), int(self.top[slot]), int(self.bottom[slot])
+
+    def add(self, x, top, bottom):
+        if self.count == self.capacity:
+            raise IndexError(f"pipe store is full ({self.capacity} pipes)")
+        slot = (self.head + self.count) % self.capacity
+        self.x[slot] = x
+        self.top[slot] = top
+        self.bottom[slot] = bottom
+        self.count += 1
+
+    def clear(self):
+        self.x.fill(EMPTY)
+        self.head = 0
+        self.count = 0
+
+    def last_x(self):
+        return int(self.x[(self.head + self.count - 1) % self.capacity])
+
+    def move(self, distance):
+        self.x -= distance  # Empty slots move too, and stay far off-screen
+
+    def drop_passed(self, left):
+        """Frees every pipe whose x is left of left; returns how many went."""
+        dropped = 0
+        while self.count and self.x[self.head] < left:
+            self.x[self.head] = EMPTY
+            self.head = (self.head + 1) % self.capacity
+            self.count -= 1
+            dropped += 1
+        return dropped
+
+    def hits(self, bird_x, bird_y, bird_width, bird_height, speed=0):
+        """True if the bird's box overlaps any pipe outside its gap.
+
+        Once a step moves pipes further than pipe plus bird width, a pipe
+        could jump right over the bird between two checks, so the pipe's
+        box is stretched back by the excess: every pipe then gets at least
+        one check while passing the bird. At normal speeds this is the
+        plain box test.
+        """
+        reach = self.width + max(0, speed - (self.width + bird_width) + 1)
+        overlap = ((bird_x < self.x + reach) & (bird_x + bird_width > self.x)
+                   & ((bird_y < self.top) | (bird_y + bird_height > self.bottom)))
+        return bool(overlap.any())
+
+    def state(self):
+        # Same shape as the list of dicts the games used to keep, so replay hashes are unchanged
+        return [{"x": x, "top": top, "bottom": bottom} for x, top, bottom in self]
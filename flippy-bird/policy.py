@@ -0,0 +1,48 @@
+import json
+
+import numpy as np
+
+from vec_env import OBSERVATION_SIZE
+
+
+class MLPPolicy:
+    """A small tanh network that decides when to jump, for a whole population at once.
+
+    The weights of one controller are a flat float32 vector of length size,
+    so a population is just a (P, size) array that evolution can mutate
+    without knowing the layer shapes.
+    """
+
+    def __init__(self, layers=(OBSERVATION_SIZE, 8, 1)):
+        self.layers = tuple(layers)
+        self.shapes = []
+        for inputs, outputs in zip(self.layers, self.layers[1:]):
+            self.shapes += [(inputs, outputs), (outputs,)]
+        self.size = sum(int(np.prod(shape)) for shape in self.shapes)
+
+    def random(self, count, rng):
+        return rng.normal(0, 1, size=(count, self.size)).astype(np.float32)
+
+    def act(self, params, observations):
+        """params is (P, size), observations (P, E, OBSERVATION_SIZE); returns (P, E) jumps."""
+        x = observations
+        offset = 0
+        for i in range(0, len(self.shapes), 2):
+            weights_shape, bias_shape = self.shapes[i], self.shapes[i + 1]
+            weights = params[:, offset:offset + weights_shape[0] * weights_shape[1]]
+            offset += weights.shape[1]
+            bias = params[:, offset:offset + bias_shape[0]]
+            offset += bias.shape[1]
+            x = np.tanh(np.einsum("pei,pio->peo", x, weights.reshape(-1, *weights_shape)) + bias[:, None, :])
+        return x[..., 0] > 0
+
+    def save(self, path, params, **meta):
+        with open(path, "wb") as f:
+            np.savez(f, params=params, meta=json.dumps(dict(meta, layers=self.layers)))
+
+    @classmethod
+    def load(cls, path):
+        """Returns (policy, params, meta) from a file written by save()."""
+        with np.load(path) as data:
+            meta = json.loads(str(data["meta"]))
+            return cls(meta["layers"]), data["params"], meta
@@ -0,0 +1,169 @@
+"""Evolves controllers for main-basic.py (Flappy Bird AI Control).
+
+Each generation, every controller in the population flies the same few
+courses in VecFlappyEnv and scores the average number of frames it
+survives. The best ones are kept and mutated copies of them replace the
+rest. Evaluation is split across a process pool, with each worker
+simulating its share of the population in one batch. The best controller
+so far is saved after every improvement; watch it with
+
+    python main-basic.py --ai best.npz
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from policy import MLPPolicy
+from vec_env import VecFlappyEnv, WIDTH, PIPE_WIDTH, PIPE_SPEED, PIPE_TOP_RANGE
+
+
+class Courses(VecFlappyEnv):
+    """Env e flies course e % len(courses): the same pipes for every controller, so scores compare fairly."""
+
+    def __init__(self, courses, num_envs):
+        self.courses = courses
+        super().__init__(num_envs)
+
+    def new_pipes(self, envs):
+        course = envs % len(self.courses)
+        passed = np.minimum(self.score[envs], self.courses.shape[1] - 1)
+        self.pipe_x[envs] = WIDTH
+        self.pipe_top[envs] = self.courses[course, passed]
+
+
+def make_courses(count, max_frames, rng):
+    pipes = max_frames * PIPE_SPEED // (WIDTH + PIPE_WIDTH) + 2
+    return rng.integers(PIPE_TOP_RANGE[0], PIPE_TOP_RANGE[1] + 1, size=(count, pipes))
+
+
+def evaluate(layers, params, courses, max_frames):
+    """Average frames survived per controller; runs in the worker processes."""
+    policy = MLPPolicy(layers)
+    population, episodes = len(params), len(courses)
+    env = Courses(courses, population * episodes)
+    for _ in range(max_frames):
+        if not env.alive.any():
+            break
+        observations = env.observe().reshape(population, episodes, -1)
+        env.step(policy.act(params, observations).reshape(-1))
+    return env.frames.reshape(population, episodes).mean(axis=1)
+
+
+class Trainer:
+    def __init__(self, policy, population=256, elite=16, sigma=0.1, episodes=4, max_frames=5000,
+                 workers=1, seed=None, start=None):
+        self.policy = policy
+        self.elite = elite
+        self.sigma = sigma
+        self.episodes = episodes
+        self.max_frames = max_frames
+        self.workers = workers
+        self.rng = np.random.default_rng(seed)
+        self.pool = ProcessPoolExecutor(workers) if workers > 1 else None
+
+        self.params = policy.random(population, self.rng)
+        if start is not None:
+            # Carry on from a checkpoint: keep it as is and fill the rest with mutations of it
+            self.params[0] = start
+            self.params[1:] = start + self.sigma * self.rng.normal(size=(population - 1, policy.size))
+        self.generation = 0
+        self.best_params = None
+        self.best_fitness = -np.inf
+
+    def evaluate(self, courses):
+        if self.pool is None:
+            return evaluate(self.policy.layers, self.params, courses, self.max_frames)
+        chunks = np.array_split(self.params, self.workers)
+        futures = [self.pool.submit(evaluate, self.policy.layers, chunk, courses, self.max_frames)
+                   for chunk in chunks]
+        return np.concatenate([future.result() for future in futures])
+
+    def step(self):
+        """Runs one generation; returns (fitness of every controller, whether the best improved)."""
+        courses = make_courses(self.episodes, self.max_frames, self.rng)
+        fitness = self.evaluate(courses)
+        ranked = np.argsort(fitness)[::-1]
+
+        improved = fitness[ranked[0]] > self.best_fitness
+        if improved:
+            self.best_fitness = fitness[ranked[0]]
+            self.best_params = self.params[ranked[0]].copy()
+
+        # The elite survive unchanged; everyone else is a mutated copy of one of them
+        parents = self.params[ranked[:self.elite]]
+        children = parents[self.rng.integers(0, self.elite, size=len(self.params) - self.elite)]
+        children = children + self.sigma * self.rng.normal(size=children.shape).astype(np.float32)
+        self.params = np.concatenate([parents, children])
+        self.generation += 1
+        return fitness, improved
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+
+
+def scaling(policy, generations, population, max_frames, seed):
+    # Same work at every worker count; more workers only pay off once each one has enough birds
+    counts = sorted({1, 2, 4, 8, os.cpu_count() or 1})
+    counts = [count for count in counts if count <= (os.cpu_count() or 1)]
+    print(f"{'workers':>7} {'gen/s':>7} {'speedup':>8}")
+    baseline = None
+    for workers in counts:
+        trainer = Trainer(policy, population=population, max_frames=max_frames, workers=workers, seed=seed)
+        trainer.step()  # Start the pool and warm up
+        start = time.perf_counter()
+        for _ in range(generations):
+            trainer.step()
+        rate = generations / (time.perf_counter() - start)
+        trainer.close()
+        baseline = baseline or rate
+        print(f"{workers:7d} {rate:7.2f} {rate / baseline:7.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Neuroevolution for Flappy Bird AI Control")
+    parser.add_argument("--generations", type=int, default=100)
+    parser.add_argument("--population", type=int, default=256)
+    parser.add_argument("--elite", type=int, default=16)
+    parser.add_argument("--sigma", type=float, default=0.1, help="mutation size")
+    parser.add_argument("--episodes", type=int, default=4, help="courses each controller flies per generation")
+    parser.add_argument("--max-frames", type=int, default=5000, help="a course ends here even if the bird survives")
+    parser.add_argument("--hidden", type=int, default=8, help="hidden layer size")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--checkpoint", default="best.npz", help="where to save the best controller")
+    parser.add_argument("--resume", action="store_true", help="start from the controller in --checkpoint")
+    parser.add_argument("--scaling", action="store_true", help="measure generations per second against worker count")
+    args = parser.parse_args()
+
+    policy = MLPPolicy((5, args.hidden, 1))
+    if args.scaling:
+        scaling(policy, min(args.generations, 10), args.population, args.max_frames, args.seed)
+        raise SystemExit
+
+    start = None
+    if args.resume:
+        policy, start, meta = MLPPolicy.load(args.checkpoint)
+        print(f"Resuming from {args.checkpoint}: generation {meta['generation']}, fitness {meta['fitness']:.0f}")
+
+    trainer = Trainer(policy, population=args.population, elite=args.elite, sigma=args.sigma,
+                      episodes=args.episodes, max_frames=args.max_frames, workers=args.workers,
+                      seed=args.seed, start=start)
+    began = time.perf_counter()
+    try:
+        for _ in range(args.generations):
+            fitness, improved = trainer.step()
+            rate = trainer.generation / (time.perf_counter() - began)
+            print(f"generation {trainer.generation:4d}: best {fitness.max():6.0f} mean {fitness.mean():6.0f} "
+                  f"frames, {rate:.2f} gen/s")
+            if improved:
+                policy.save(args.checkpoint, trainer.best_params, generation=trainer.generation,
+                            fitness=float(trainer.best_fitness))
+            if trainer.best_fitness >= args.max_frames:
+                print(f"Solved: the best controller survives all {args.max_frames} frames")
+                break
+    finally:
+        trainer.close()
@@ -0,0 +1,111 @@
+import numpy as np
+
+# The rules and sizes of main-basic.py
+WIDTH, HEIGHT = 500, 700
+GRAVITY = 0.4
+JUMP_STRENGTH = -8
+PIPE_SPEED = 3
+PIPE_WIDTH = 80
+PIPE_GAP = 150
+PIPE_TOP_RANGE = (150, 400)  # random.randint bounds for the top pipe height
+BIRD_X = 100
+BIRD_WIDTH, BIRD_HEIGHT = 50, 35
+
+OBSERVATION_SIZE = 5
+
+
+def observation(bird_y, bird_velocity, pipe_x, pipe_top, pipe_bottom):
+    """What a controller sees, scaled to roughly -1..1. Works on scalars or arrays."""
+    return np.stack([
+        np.asarray(bird_y / HEIGHT, dtype=np.float32),
+        np.asarray(bird_velocity / 10, dtype=np.float32),
+        np.asarray((pipe_x - BIRD_X) / WIDTH, dtype=np.float32),
+        np.asarray((pipe_top - bird_y) / HEIGHT, dtype=np.float32),
+        np.asarray((pipe_bottom - bird_y) / HEIGHT, dtype=np.float32),
+    ], axis=-1)
+
+
+class VecFlappyEnv:
+    """Steps N headless main-basic.py games at once.
+
+    main-basic.py only ever has one pipe on screen, so each game is a bird
+    height and velocity plus one pipe, all kept in arrays of length N. By
+    default a game that crashes stays crashed until reset(), so a whole
+    population can be scored on how long each bird survives; with
+    auto_reset it starts over straight away, like main-basic.py does.
+    """
+
+    def __init__(self, num_envs, seed=None, auto_reset=False):
+        self.num_envs = num_envs
+        self.auto_reset = auto_reset
+        self.rng = np.random.default_rng(seed)
+
+        self.bird_y = np.zeros(num_envs)
+        self.bird_velocity = np.zeros(num_envs)
+        self.pipe_x = np.zeros(num_envs, dtype=np.int64)
+        self.pipe_top = np.zeros(num_envs, dtype=np.int64)
+        self.score = np.zeros(num_envs, dtype=np.int64)
+        self.frames = np.zeros(num_envs, dtype=np.int64)  # Frames survived
+        self.alive = np.ones(num_envs, dtype=bool)
+
+        self._envs = np.arange(num_envs)
+        self.reset()
+
+    def reset(self, envs=None):
+        """Start new games in the given envs (all of them by default)."""
+        if envs is None:
+            envs = self._envs
+        envs = np.asarray(envs)
+        if envs.dtype == bool:
+            envs = np.flatnonzero(envs)
+        if envs.size == 0:
+            return
+
+        self.bird_y[envs] = HEIGHT // 2
+        self.bird_velocity[envs] = 0
+        self.score[envs] = 0
+        self.frames[envs] = 0
+        self.alive[envs] = True
+        self.new_pipes(envs)
+
+    def pipe_tops(self, count):
+        # Overridden to feed in the game's own random.randint sequence for parity checks
+        return self.rng.integers(PIPE_TOP_RANGE[0], PIPE_TOP_RANGE[1] + 1, size=count)
+
+    def new_pipes(self, envs):
+        self.pipe_x[envs] = WIDTH
+        self.pipe_top[envs] = self.pipe_tops(len(envs))
+
+    def step(self, jumps):
+        """Advance every live game by one frame; jumps is one bool per env.
+
+        Returns the bool array of games that crashed on this frame.
+        """
+        alive = self.alive
+        self.bird_velocity = np.where(alive & jumps, JUMP_STRENGTH, self.bird_velocity)
+        self.bird_velocity += GRAVITY * alive
+        self.bird_y += self.bird_velocity * alive
+        self.pipe_x -= PIPE_SPEED * alive
+
+        passed = np.flatnonzero(alive & (self.pipe_x < -PIPE_WIDTH))
+        if passed.size:
+            self.score[passed] += 1
+            self.new_pipes(passed)
+
+        # The same box test as PipeStore.hits, then the ground and ceiling
+        pipe_bottom = self.pipe_top + PIPE_GAP
+        hit = ((BIRD_X < self.pipe_x + PIPE_WIDTH) & (BIRD_X + BIRD_WIDTH > self.pipe_x)
+               & ((self.bird_y < self.pipe_top) | (self.bird_y + BIRD_HEIGHT > pipe_bottom)))
+        hit |= (self.bird_y > HEIGHT - 50) | (self.bird_y < 0)
+
+        crashed = alive & hit
+        self.alive = alive & ~hit
+        self.frames += self.alive
+        if self.auto_reset:
+            self.reset(crashed)
+        return crashed
+
+    def observe(self):
+        """(N, OBSERVATION_SIZE) float32 observations, see observation()."""
+        return observation(self.bird_y, self.bird_velocity, self.pipe_x,
+                           self.pipe_top, self.pipe_top + PIPE_GAP)
@@ -0,0 +1,212 @@
+import time
+from collections import deque
+
+from main import SIZE, GRID_COLS as COLS, GRID_ROWS as ROWS
+
+UNREACHABLE = 1 << 30
+DIRECTIONS = {(0, -1): "up", (1, 0): "right", (0, 1): "down", (-1, 0): "left"}
+OPPOSITE = {"up": "down", "down": "up", "left": "right", "right": "left"}
+
+
+def hamiltonian_cycle(cols, rows):
+    """Cells (col, row) of a closed tour of the board; cols must be even.
+
+    Down the first column, then up and down the others without touching
+    row 0, and back along row 0 from the last column.
+    """
+    if cols % 2:
+        raise ValueError("a tour of this shape needs an even number of columns")
+    order = []
+    for col in range(cols):
+        rows_down = range(1, rows) if col % 2 == 0 else range(rows - 1, 0, -1)
+        order += [(col, row) for row in rows_down]
+    order += [(col, 0) for col in range(cols - 1, -1, -1)]
+    return order
+
+
+class DistanceField:
+    """Steps from every free cell to a target cell, kept up to date as cells block and free up.
+
+    Freeing a cell can only shorten paths, so it is relaxed outwards like a
+    BFS. Blocking a cell first invalidates the cells whose every shortest
+    path ran through it (and only those), then restarts them from their
+    remaining neighbours and relaxes again. All of that work is queued and
+    settle() does it until a deadline, so a big change can be spread over
+    several ticks; until then settled() is False and distances can be off.
+    """
+
+    def __init__(self, cols, rows):
+        self.cols = cols
+        self.size = cols * rows
+        self.neighbors = []
+        for i in range(self.size):
+            col, row = i % cols, i // cols
+            self.neighbors.append([c + r * cols for c, r in ((col, row - 1), (col + 1, row), (col, row + 1), (col - 1, row))
+                                   if 0 <= c < cols and 0 <= r < rows])
+        self.blocked = bytearray(self.size)
+        self.dist = [UNREACHABLE] * self.size
+        self.target = None
+        self.invalidating = []  # (cell, its distance before it was invalidated)
+        self.invalid = []  # Invalidated cells waiting to restart
+        self.queue = deque()  # Cells whose distance dropped, to relax outwards
+
+    def retarget(self, target):
+        self.target = target
+        self.dist = [UNREACHABLE] * self.size
+        self.dist[target] = 0
+        self.invalidating = []
+        self.invalid = []
+        self.queue = deque([target])
+
+    def settled(self):
+        return not (self.invalidating or self.invalid or self.queue)
+
+    def settle(self, deadline=None):
+        """Do queued work until done or time.perf_counter() passes deadline; True when done."""
+        dist, neighbors, blocked = self.dist, self.neighbors, self.blocked
+        processed = 0
+
+        # Invalidate everything that depended on a newly blocked cell for its distance
+        stack = self.invalidating
+        while stack:
+            processed += 1
+            if deadline is not None and processed % 16 == 0 and time.perf_counter() > deadline:
+                return False
+            parent, parent_dist = stack.pop()
+            for cell in neighbors[parent]:
+                d = dist[cell]
+                if d != parent_dist + 1 or blocked[cell] or cell == self.target:
+                    continue
+                if any(dist[other] == d - 1 and not blocked[other] for other in neighbors[cell]):
+                    continue  # Still has a shortest path around the blocked cell
+                dist[cell] = UNREACHABLE
+                self.invalid.append(cell)
+                stack.append((cell, d))
+
+        # Restart the invalidated cells from the neighbours they have left
+        queue = self.queue
+        while self.invalid:
+            processed += 1
+            if deadline is not None and processed % 32 == 0 and time.perf_counter() > deadline:
+                return False
+            cell = self.invalid.pop()
+            if not blocked[cell]:
+                best = min(dist[n] for n in neighbors[cell]) + 1
+                if best < dist[cell]:
+                    dist[cell] = best
+                    queue.append(cell)
+
+        # Relax like a BFS
+        while queue:
+            processed += 1
+            if deadline is not None and processed % 32 == 0 and time.perf_counter() > deadline:
+                return False
+            cell = queue.popleft()
+            step = dist[cell] + 1
+            for neighbor in neighbors[cell]:
+                if step < dist[neighbor] and not blocked[neighbor]:
+                    dist[neighbor] = step
+                    queue.append(neighbor)
+        return True
+
+    def unblock(self, cell):
+        if not self.blocked[cell]:
+            return
+        self.blocked[cell] = 0
+        best = 0 if cell == self.target else min(self.dist[n] for n in self.neighbors[cell]) + 1
+        if best < self.dist[cell]:
+            self.dist[cell] = best
+            self.queue.append(cell)
+
+    def block(self, cell):
+        if self.blocked[cell]:
+            return
+        self.blocked[cell] = 1
+        if self.dist[cell] < UNREACHABLE:
+            self.invalidating.append((cell, self.dist[cell]))
+            self.dist[cell] = UNREACHABLE
+
+
+class Autopilot:
+    """Steers a Snake around a Hamiltonian cycle, taking shortcuts towards the food.
+
+    Following the cycle can never trap the snake, as long as the body lies
+    along the cycle between tail and head. A shortcut keeps that true when
+    it lands ahead of the head and well before the tail, so every move is
+    one of those, picked by the distance field to the food. When the field
+    isn't settled within the per-tick budget, or no shortcut helps, the
+    snake takes the next cell of the cycle.
+    """
+
+    def __init__(self, budget_ms=2.0, shortcut_limit=0.5, margin=3, keep_times=False):
+        self.budget = budget_ms / 1000
+        self.shortcut_limit = shortcut_limit  # Stop taking shortcuts past this fraction of the board
+        self.margin = margin  # Spare cells to keep in front of the tail for growth
+        self.cycle = [col + row * COLS for col, row in hamiltonian_cycle(COLS, ROWS)]
+        self.position = [0] * len(self.cycle)
+        for i, cell in enumerate(self.cycle):
+            self.position[cell] = i
+        self.field = DistanceField(COLS, ROWS)
+        self.head = None
+
+        # (seconds, snake length) for every decision, for benchmarks
+        self.decision_times = [] if keep_times else None
+
+    def cell(self, position):
+        x, y = position
+        return (y // SIZE) * COLS + x // SIZE
+
+    def reset(self, snake, food):
+        """Start tracking a new game."""
+        self.field = DistanceField(COLS, ROWS)
+        for x, y in snake.body:
+            self.field.block(self.cell((x, y)))
+        self.field.retarget(self.cell((food.x, food.y)))
+        self.head = snake.head
+
+    def sync(self, snake, food):
+        # New food means a new field; retarget first so the changes below cost nothing
+        target = self.cell((food.x, food.y))
+        if target != self.field.target:
+            self.field.retarget(target)
+
+        # Otherwise only the new head and the vacated tail changed since the last tick
+        if snake.head != self.head:
+            self.field.block(self.cell(snake.head))
+            self.head = snake.head
+        if snake.vacated is not None and not snake.grid.count(*snake.vacated):
+            self.field.unblock(self.cell(snake.vacated))
+
+    def ahead(self, start, cell):
+        # Steps from start to cell going forwards along the cycle
+        return (self.position[cell] - self.position[start]) % len(self.cycle)
+
+    def choose(self, snake, food):
+        """Direction for the next tick: "up", "down", "left" or "right"."""
+        start = time.perf_counter()
+        if self.head is None:
+            self.reset(snake, food)
+        else:
+            self.sync(snake, food)
+        self.field.settle(start + 0.9 * self.budget)  # The rest is for picking the move
+
+        head = self.cell(snake.head)
+        best = self.cycle[(self.position[head] + 1) % len(self.cycle)]
+        if self.field.settled() and snake.length < self.shortcut_limit * len(self.cycle):
+            to_tail = self.ahead(head, self.cell(snake.body[-1])) or len(self.cycle)
+            room = to_tail - snake.pending_growth - self.margin
+            to_food = self.ahead(head, self.field.target)
+            dist = self.field.dist
+            for neighbor in self.field.neighbors[head]:
+                steps = self.ahead(head, neighbor)
+                if (0 < steps < room and steps <= to_food and not self.field.blocked[neighbor]
+                        and dist[neighbor] < dist[best]
+                        and self.direction(head, neighbor) != OPPOSITE[snake.heading]):
+                    best = neighbor
+
+        if self.decision_times is not None:
+            self.decision_times.append((time.perf_counter() - start, snake.length))
+        return self.direction(head, best)
+
+    def direction(self, cell, neighbor):
+        return DIRECTIONS[(neighbor % COLS - cell % COLS, neighbor // COLS - cell // COLS)]
@@ -0,0 +1,65 @@
+import argparse
+import os
+import sys
+import time
+
+os.environ["SDL_VIDEODRIVER"] = "dummy"
+os.environ["SDL_AUDIODRIVER"] = "dummy"
+
+from autopilot import Autopilot
+from main import Game, GameOver, PLAYING
+
+LENGTH_BUCKET = 100
+
+
+def play(game, max_ticks):
+    """Runs one autopilot game headless; returns (finished, ticks, final length)."""
+    game.new_game()
+    game.state = PLAYING
+    ticks = 0
+    try:
+        while ticks < max_ticks:
+            game.update()
+            ticks += 1
+            if not game.snake.grid.free:
+                return True, ticks, game.snake.length  # Every food cell is covered
+    except GameOver:
+        pass
+    return False, ticks, game.snake.length
+
+
+def percentile(sorted_values, p):
+    return sorted_values[min(len(sorted_values) - 1, int(p / 100 * len(sorted_values)))]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Autopilot decision time and games finished, headless")
+    parser.add_argument("--games", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--budget-ms", type=float, default=2.0)
+    parser.add_argument("--max-ticks", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    autopilot = Autopilot(budget_ms=args.budget_ms, keep_times=True)
+    game = Game(seed=args.seed, autopilot=autopilot)
+    finished = 0
+    for i in range(args.games):
+        start = time.perf_counter()
+        won, ticks, length = play(game, args.max_ticks)
+        finished += won
+        print(f"game {i + 1}: {'finished' if won else 'died'} at length {length} after {ticks} ticks "
+              f"({time.perf_counter() - start:.1f} s)")
+    print(f"{finished} of {args.games} games finished")
+
+    # Decision time against snake length
+    buckets = {}
+    for seconds, length in autopilot.decision_times:
+        buckets.setdefault(length // LENGTH_BUCKET, []).append(seconds)
+    print(f"{'length':>9} {'ticks':>8} {'mean µs':>8} {'p99 µs':>8} {'max µs':>8} {'over budget':>11}")
+    for bucket in sorted(buckets):
+        times = sorted(buckets[bucket])
+        over = sum(t > autopilot.budget for t in times)
+        low = bucket * LENGTH_BUCKET
+        print(f"{low:4d}-{low + LENGTH_BUCKET - 1:<4d} {len(times):8d} {1e6 * sum(times) / len(times):8.1f} "
+              f"{1e6 * percentile(times, 99):8.1f} {1e6 * times[-1]:8.1f} {over:11d}")
+    sys.exit(0 if finished == args.games else 1)
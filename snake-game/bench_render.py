@@ -0,0 +1,87 @@
+import argparse
+import os
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.render_queue import RenderQueue
+from main import Game, GameOver, SIZE, FOOD_COLS, FOOD_ROWS
+
+
+def lap_direction(x, y):
+    # Clockwise around the edge of the food area, so the snake never dies
+    col, row = x // SIZE, y // SIZE
+    if row == 0 and col < FOOD_COLS - 1:
+        return "right"
+    if col == FOOD_COLS - 1 and row < FOOD_ROWS - 1:
+        return "down"
+    if row == FOOD_ROWS - 1 and col > 0:
+        return "left"
+    return "up"
+
+
+def full_scene(game):
+    # What a full redraw of the current state looks like
+    scene = game.renderer.background.copy()
+    queue = RenderQueue(scene)
+    game.snake.draw(queue)
+    game.food.draw(queue)
+    queue.flush()
+    surface = game.surface
+    game.surface = scene
+    game.display_score()
+    game.surface = surface
+    return scene
+
+
+def run(full_redraw, length, frames, verify=False):
+    game = Game(full_redraw=full_redraw)
+
+    # Start on the top edge with a snake of the requested length
+    game.snake.reset(1)
+    game.snake.grid.remove(*game.snake.head)
+    game.snake.body[0] = (0, 0)
+    game.snake.grid.add(0, 0)
+    for _ in range(length - 1):
+        game.snake.increase_length()
+    game.food.reset(game.snake.grid)
+
+    frame_times = []
+    pixels = []
+    for _ in range(frames):
+        game.snake.direction = lap_direction(*game.snake.head)
+        start = time.perf_counter()
+        try:
+            game.play()
+        except GameOver:
+            break  # The snake grew past the lap length
+        frame_times.append(time.perf_counter() - start)
+        pixels.append(game.renderer.pixels_pushed)
+
+        if verify:
+            expected = pygame.image.tobytes(full_scene(game), "RGB")
+            assert pygame.image.tobytes(game.surface, "RGB") == expected, "dirty frame differs from a full redraw"
+
+    frame_times = frame_times[1:]  # The first frame is always a full redraw
+    pixels = pixels[1:]
+    return sum(pixels) / len(pixels), 1000 * sum(frame_times) / len(frame_times)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Dirty-rect vs full redraw cost per frame")
+    parser.add_argument("--length", type=int, nargs="+", default=[2, 50, 100])
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--verify", action="store_true", help="check every dirty frame against a full redraw")
+    args = parser.parse_args()
+
+    print(f"{'length':>6} {'mode':>12} {'pixels/frame':>14} {'ms/frame':>9}")
+    for length in args.length:
+        for full_redraw in (True, False):
+            pixels, ms = run(full_redraw, length, args.frames, args.verify and not full_redraw)
+            mode = "full redraw" if full_redraw else "dirty rects"
+            print(f"{length:6d} {mode:>12} {pixels:14,.0f} {ms:9.3f}")
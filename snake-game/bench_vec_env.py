@@ -0,0 +1,91 @@
+import argparse
+import os
+import random
+import time
+
+import numpy as np
+
+from vec_env import VecSnakeEnv, DIRECTION_NAMES, NOOP, SIZE
+
+
+def benchmark(num_envs, steps, seed=0):
+    env = VecSnakeEnv(num_envs, seed=seed)
+    rng = np.random.default_rng(seed)
+    actions = rng.integers(0, NOOP + 1, size=(steps, num_envs))
+
+    env.step(actions[0])  # Warm up
+    start = time.perf_counter()
+    for i in range(steps):
+        env.step(actions[i])
+    elapsed = time.perf_counter() - start
+    return num_envs * steps / elapsed
+
+
+def parity_check(games, max_ticks, seed=0):
+    """Play the same moves through Game.play and VecSnakeEnv and compare.
+
+    Game needs a display and a mixer, so this runs it with SDL's dummy drivers.
+    Returns the number of ticks compared.
+    """
+    os.environ["SDL_VIDEODRIVER"] = "dummy"
+    os.environ["SDL_AUDIODRIVER"] = "dummy"
+    from main import Game, GameOver
+
+    rng = random.Random(seed)
+    game = Game()
+    env = VecSnakeEnv(1, seed=seed, auto_reset=False)
+    compared = 0
+
+    for _ in range(games):
+        game.new_game()
+        env.reset()
+        game.food.x, game.food.y = int(env.food_x[0]) * SIZE, int(env.food_y[0]) * SIZE
+
+        for tick in range(max_ticks):
+            # Mostly keep going, with the odd turn, so games get long enough to self-collide
+            action = rng.randrange(4) if rng.random() < 0.3 else NOOP
+            if action != NOOP:
+                getattr(game.snake, "move_" + DIRECTION_NAMES[action])()
+
+            try:
+                game.play()
+                game_over = False
+            except GameOver:
+                game_over = True
+
+            rewards, dones = env.step([action])
+            compared += 1
+
+            assert bool(dones[0]) == game_over, f"tick {tick}: done {dones[0]} != {game_over}"
+            if game_over:
+                assert env.length[0] == game.snake.length
+                break
+            assert (env.head_x[0] * SIZE, env.head_y[0] * SIZE) == game.snake.head
+            assert env.length[0] == game.snake.length
+            body = {(x // SIZE, y // SIZE) for x, y in game.snake.body}
+            mask = env.body_mask()[0]
+            if rewards[0] <= 0:  # On the tick food is eaten the mask still covers the vacated tail
+                assert body == set(zip(*np.nonzero(mask)[::-1])), f"tick {tick}: body differs"
+
+            # Food.move picked a new cell, use the env's choice for the real game too
+            if rewards[0] > 0:
+                game.food.x, game.food.y = int(env.food_x[0]) * SIZE, int(env.food_y[0]) * SIZE
+
+    return compared
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Throughput of the batched headless snake engine")
+    parser.add_argument("--envs", type=int, nargs="+", default=[1, 16, 256, 1024, 4096])
+    parser.add_argument("--steps", type=int, default=500)
+    parser.add_argument("--parity", type=int, default=0, metavar="GAMES",
+                        help="also replay GAMES random games through the pygame Game and compare")
+    args = parser.parse_args()
+
+    if args.parity:
+        ticks = parity_check(args.parity, max_ticks=2000)
+        print(f"Parity OK: {args.parity} games, {ticks} ticks match Game.play")
+
+    for num_envs in args.envs:
+        rate = benchmark(num_envs, args.steps)
+        print(f"{num_envs:6d} envs: {rate:12,.0f} env-steps/s")
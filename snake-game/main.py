@@ -1,195 +1,507 @@
+import argparse
+import os
+import sys
 import pygame
 import time
 from pygame.locals import *
 import random
+from collections import deque
+
+from renderer import Renderer
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from common.audio import AudioManager
+from common.hud import Hud, render_text
+from common.render_queue import RenderQueue
+from common.replay import Recorder, Replay, new_seed, state_hash
+from common.telemetry import Telemetry
 
 SIZE = 40  # Grid size
 WINDOW_WIDTH = 1500
 WINDOW_HEIGHT = 1000
+BACKGROUND_COLOR = (110, 110, 5)
+TICK_RATE = 5  # Simulation steps per second, the old time.sleep(0.2)
+FPS = 60  # Render and input polling rate
+MAX_TICKS_PER_FRAME = 5  # After a long stall, drop time instead of fast-forwarding
+
+# Session states
+MENU = "menu"
+PLAYING = "playing"
+GAME_OVER = "game over"
+QUIT_GAME = "quit"
+
+KEY_DIRECTIONS = {K_UP: "up", K_DOWN: "down", K_LEFT: "left", K_RIGHT: "right"}
+OPPOSITE = {"up": "down", "down": "up", "left": "right", "right": "left"}
+
+# One byte per tick in recordings: the turn applied on that tick, or the start of a new game
+RECORD_TURNS = [None, "up", "right", "down", "left"]
+RECORD_NEW_GAME = 5
+
+# The head can still be on screen in a partial last column (x = 1480), food never goes there
+GRID_COLS = -(-WINDOW_WIDTH // SIZE)
+GRID_ROWS = -(-WINDOW_HEIGHT // SIZE)
+FOOD_COLS = WINDOW_WIDTH // SIZE
+FOOD_ROWS = WINDOW_HEIGHT // SIZE
+
+class Grid:
+    """Occupancy counts for every cell plus the pool of cells food may use."""
+
+    def __init__(self):
+        self.counts = bytearray(GRID_COLS * GRID_ROWS)
+
+        # Free food cells as a list with an index, so add/remove/pick are all O(1)
+        self.free = [(col * SIZE, row * SIZE) for row in range(FOOD_ROWS) for col in range(FOOD_COLS)]
+        self.free_index = {cell: i for i, cell in enumerate(self.free)}
+
+    def cell(self, x, y):
+        if 0 <= x < WINDOW_WIDTH and 0 <= y < WINDOW_HEIGHT:
+            return (y // SIZE) * GRID_COLS + x // SIZE
+        return None  # Off screen, the boundary check ends the game
+
+    def count(self, x, y):
+        i = self.cell(x, y)
+        return 0 if i is None else self.counts[i]
+
+    def add(self, x, y):
+        i = self.cell(x, y)
+        if i is None:
+            return
+        self.counts[i] += 1
+        if self.counts[i] == 1 and (x, y) in self.free_index:
+            # Swap-remove from the free list
+            pos = self.free_index.pop((x, y))
+            last = self.free.pop()
+            if pos < len(self.free):
+                self.free[pos] = last
+                self.free_index[last] = pos
+
+    def remove(self, x, y):
+        i = self.cell(x, y)
+        if i is None:
+            return
+        self.counts[i] -= 1
+        if self.counts[i] == 0 and x < FOOD_COLS * SIZE and y < FOOD_ROWS * SIZE:
+            self.free_index[(x, y)] = len(self.free)
+            self.free.append((x, y))
+
+    def random_free_cell(self):
+        if not self.free:
+            return None  # The snake fills the whole board
+        return self.free[random.randrange(len(self.free))]
+
+class GameOver(Exception):
+    pass
 
 class Food: 
-    def __init__(self, parent_screen):
+    def __init__(self, parent_screen, grid):
         self.food = pygame.image.load("resources/meat.webp").convert_alpha()
         self.food = pygame.transform.scale(self.food, (SIZE, SIZE))
         self.parent_screen = parent_screen
+        self.reset(grid)
+
+    def reset(self, grid):
+        self.grid = grid
         self.move()  # Initialize at a valid position
     
-    def draw(self):
-        self.parent_screen.blit(self.food, (self.x, self.y))  
+    def draw(self, queue):
+        queue.add(self.food, (self.x, self.y))
 
     def move(self):
-        # Ensure food aligns with the grid and stays inside the screen bounds
-        self.x = random.randint(0, (WINDOW_WIDTH // SIZE) - 1) * SIZE
-        self.y = random.randint(0, (WINDOW_HEIGHT // SIZE) - 1) * SIZE
+        # Pick a grid-aligned cell that is on screen and not under the snake
+        cell = self.grid.random_free_cell()
+        if cell is not None:
+            self.x, self.y = cell
 
 class Snake:
     def __init__(self, parent_screen, length):
-        self.length = length
         self.parent_screen = parent_screen
         self.block = pygame.image.load("resources/snack-body.png").convert_alpha()
         self.block = pygame.transform.scale(self.block, (SIZE, SIZE))
         self.snackFace = pygame.image.load("resources/snack-face.png").convert_alpha()
         self.snackFace = pygame.transform.scale(self.snackFace, (SIZE, SIZE))
+        self.reset(length)
 
-        self.block_x = [SIZE] * length  # Correct initial positions
-        self.block_y = [SIZE] * length
+    def reset(self, length):
+        # Gameplay state only, the images loaded above are kept
+        self.length = length
+
+        # Head first; a move only touches both ends, so it is O(1) at any length
+        self.body = deque([(SIZE, SIZE)] * length)  # Correct initial positions
+        self.grid = Grid()
+        for x, y in self.body:
+            self.grid.add(x, y)
+        self.pending_growth = 0
+        self.vacated = None  # Cell the tail left on the last walk, if any
         self.direction = "down"
+        self.heading = "down"  # Direction of the last step actually taken
     
-    def draw(self):
-        self.parent_screen.blit(self.snackFace, (self.block_x[0], self.block_y[0]))
-        for i in range(1, self.length):
-            self.parent_screen.blit(self.block, (self.block_x[i], self.block_y[i]))
-
+    def draw(self, queue):
+        body = iter(self.body)
+        queue.add(self.snackFace, next(body), layer=1)
+        queue.extend(self.block, body)
+
+    def draw_changes(self, renderer):
+        # Only the vacated tail, the old head and the new head differ from the last frame
+        if self.vacated is not None:
+            renderer.erase((*self.vacated, SIZE, SIZE))
+        if self.length > 1:
+            renderer.erase((*self.body[1], SIZE, SIZE))
+            renderer.blit(self.block, self.body[1])
+        renderer.erase((*self.head, SIZE, SIZE))
+        renderer.blit(self.snackFace, self.head)
+
+    # Compare with the last step taken, so two quick presses can't reverse into the neck
     def move_up(self):
-        if self.direction != "down":  # Prevent reversing into itself
+        if self.heading != "down":  # Prevent reversing into itself
             self.direction = "up"
 
     def move_down(self):
-        if self.direction != "up":
+        if self.heading != "up":
             self.direction = "down"
 
     def move_left(self):
-        if self.direction != "right":
+        if self.heading != "right":
             self.direction = "left"
 
     def move_right(self):
-        if self.direction != "left":
+        if self.heading != "left":
             self.direction = "right"
 
+    @property
+    def head(self):
+        return self.body[0]
+
     def increase_length(self):
         self.length += 1
-        self.block_x.append(-1)  # Temporary placeholder
-        self.block_y.append(-1)
+        self.pending_growth += 1  # The tail stays put on the next walk
+
+    def is_self_collision(self):
+        # The head is counted in its own cell, anything more is the body
+        return self.grid.count(*self.head) > 1
 
     def walk(self):
-        # Move the body before updating the head
-        for i in range(self.length - 1, 0, -1):
-            self.block_x[i] = self.block_x[i - 1]
-            self.block_y[i] = self.block_y[i - 1]
+        # Vacate the tail unless the snake is growing
+        if self.pending_growth:
+            self.pending_growth -= 1
+            self.vacated = None
+        else:
+            self.vacated = self.body.pop()
+            self.grid.remove(*self.vacated)
 
         # Move the head
+        x, y = self.body[0]
         if self.direction == "down":
-            self.block_y[0] += SIZE
+            y += SIZE
         if self.direction == "up":
-            self.block_y[0] -= SIZE
+            y -= SIZE
         if self.direction == "left":
-            self.block_x[0] -= SIZE
+            x -= SIZE
         if self.direction == "right":
-            self.block_x[0] += SIZE
+            x += SIZE
+        self.body.appendleft((x, y))
+        self.grid.add(x, y)
+        self.heading = self.direction
 
 class Game: 
-    def __init__(self):
+    def __init__(self, full_redraw=False, tick_rate=TICK_RATE, fps=FPS, seed=None, record_path=None,
+                 autopilot=None, telemetry=None):
+        # Food placement is the only randomness, so the seed plus the turns replay a session
+        self.seed = new_seed() if seed is None else seed
+        random.seed(self.seed)
+        self.recorder = Recorder(record_path, "snake", self.seed) if record_path else None
+
         pygame.init()
         pygame.mixer.init()  # Initialize sound system
         self.surface = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
         self.surface.fill((255, 255, 255))
         pygame.display.set_caption("Snake Game")
 
+        # full_redraw=True repaints and flips the whole window every tick
+        self.full_redraw = full_redraw
+        self.renderer = Renderer(self.surface, BACKGROUND_COLOR, full_redraw)
+        self.render_queue = RenderQueue(self.surface)  # Batches the sprites of a full redraw
+        self.score_hud = Hud("arial", 30, (255, 255, 255))
+        # Simulation runs at tick_rate, drawing and input polling at fps
+        self.tick_rate = tick_rate
+        self.fps = fps
+        self.clock = pygame.time.Clock()
+
+        # Key presses wait here until a tick can apply them, so quick turns aren't lost.
+        # Each entry is (direction, time of the key press).
+        self.turns = deque(maxlen=3)
+        self.input_latencies = deque(maxlen=100)  # Seconds from key press to the move it caused
+        self.autopilot = autopilot  # Steers instead of the arrow keys when set
+        self.telemetry = telemetry or Telemetry()  # Times each stage when enabled
+
+        # Assets are loaded once per process; new_game() only rebuilds gameplay state
         self.snake = Snake(self.surface, 2)
-        self.food = Food(self.surface)
+        self.food = Food(self.surface, self.snake.grid)
 
-        # Load Sounds
-        self.food_sound = pygame.mixer.Sound("resources/music/food_eat.mp3")
-        self.game_over_sound = pygame.mixer.Sound("resources/music/game_over.mp3")
+        # Load Sounds; each is decoded on first play and cached on disk, so later runs skip the MP3 decoder
+        self.audio = AudioManager(channels=2)
+        self.audio.add("food", "resources/music/food_eat.mp3", min_interval=0.05)
+        self.audio.add("game_over", "resources/music/game_over.mp3", priority=1)
 
-        # Load and Play Background Music in a Loop
+        # Load Background Music, it starts looping with each game
         pygame.mixer.music.load("resources/music/background_music.mp3")  # Load music file
+
+        self.state = MENU
+        self.new_game()
+
+    def new_game(self):
+        self.snake.reset(2)
+        self.food.reset(self.snake.grid)
+        self.turns.clear()
+        if self.autopilot:
+            self.autopilot.head = None  # Picks up the new board on its next move
+        self.accumulator = 0.0
+        self.food_drawn_at = None
+        self.score_rect = None
+        self.renderer.invalidate()
+
+    def start_game(self):
+        if self.state == GAME_OVER:
+            self.new_game()
+            if self.recorder:
+                self.recorder.write(RECORD_NEW_GAME)
+        self.state = PLAYING
         pygame.mixer.music.play(-1)  # Play music in an infinite loop
+        self.draw()
+        self.clock.tick()  # Don't count the time spent on the menu
 
     def is_collision(self, x1, y1, x2, y2):
         return x1 == x2 and y1 == y2  # Ensure exact position match
 
     def check_boundary_collision(self):
         """Check if the snake touches the game boundary"""
+        head_x, head_y = self.snake.head
         if (
-            self.snake.block_x[0] < 0 or self.snake.block_x[0] >= WINDOW_WIDTH or
-            self.snake.block_y[0] < 0 or self.snake.block_y[0] >= WINDOW_HEIGHT
+            head_x < 0 or head_x >= WINDOW_WIDTH or
+            head_y < 0 or head_y >= WINDOW_HEIGHT
         ):
-            pygame.mixer.music.stop()  # Stop background music
-            pygame.mixer.Sound.play(self.game_over_sound)  # Play game over sound
-            raise Exception("Game Over - Boundary Hit")
+            raise GameOver("Boundary Hit")
+
+    def queue_turn(self, direction):
+        # Judge each turn against the one queued before it, not the current heading
+        last = self.turns[-1][0] if self.turns else self.snake.direction
+        if direction != last and direction != OPPOSITE[last] and len(self.turns) < self.turns.maxlen:
+            self.turns.append((direction, time.perf_counter()))
+
+    def input_latency_ms(self):
+        """Mean and worst key-press-to-move latency over the recent turns, in ms."""
+        if not self.input_latencies:
+            return 0.0, 0.0
+        return (1000 * sum(self.input_latencies) / len(self.input_latencies),
+                1000 * max(self.input_latencies))
 
     def play(self):
+        self.update()
+        self.draw()
+
+    def update(self, turn=None):
+        # One simulation tick, using at most one queued turn (or the given one when replaying)
+        pressed_at = None
+        if turn is None and self.turns:
+            turn, pressed_at = self.turns.popleft()
+        elif turn is None and self.autopilot:
+            with self.telemetry.span("autopilot"):
+                turn = self.autopilot.choose(self.snake, self.food)
+        if turn is not None:
+            getattr(self.snake, "move_" + turn)()
+        if self.recorder:
+            self.recorder.write(RECORD_TURNS.index(turn))
+
         self.snake.walk()
-        self.snake.draw()  
-        self.food.draw()
-        self.display_score()
-        pygame.display.flip()  # Update the screen after everything is drawn
+        if pressed_at is not None:
+            self.input_latencies.append(time.perf_counter() - pressed_at)
 
         # Check boundary collision
         self.check_boundary_collision()
 
         # Collision detection for snake eating food
-        if self.is_collision(self.snake.block_x[0], self.snake.block_y[0], self.food.x, self.food.y):
-            pygame.mixer.Sound.play(self.food_sound)  # Play eating sound
+        if self.is_collision(*self.snake.head, self.food.x, self.food.y):
+            self.audio.play("food")  # Play eating sound
+            self.telemetry.count("food")
             self.snake.increase_length()
             self.food.move()
 
-        # Collision detection for snake hitting itself
-        for i in range(3, self.snake.length):  # Start checking from index 3
-            if self.is_collision(self.snake.block_x[0], self.snake.block_y[0], self.snake.block_x[i], self.snake.block_y[i]):
-                pygame.mixer.music.stop()  # Stop background music
-                pygame.mixer.Sound.play(self.game_over_sound)  # Play game over sound
-                raise Exception("Game Over - Self Collision")  
+        # Collision detection for snake hitting itself, one lookup in the occupancy grid
+        if self.snake.is_self_collision():
+            raise GameOver("Self Collision")
 
-    def show_game_over(self):
+    def draw(self):
+        draw_span = self.telemetry.span("draw").begin()
+        if self.renderer.begin_frame():
+            self.snake.draw(self.render_queue)
+            self.food.draw(self.render_queue)
+            self.render_queue.flush()
+            self.food_drawn_at = (self.food.x, self.food.y)
+            self.score_rect = self.display_score()
+        else:
+            food = (self.food.x, self.food.y)
+            if food != self.food_drawn_at:
+                self.renderer.erase((*self.food_drawn_at, SIZE, SIZE))
+            self.snake.draw_changes(self.renderer)
+            if food != self.food_drawn_at:
+                self.renderer.blit(self.food.food, food)
+                self.food_drawn_at = food
+            self.draw_score_area()
+        draw_span.end()
+        with self.telemetry.span("present"):
+            self.renderer.present()
+
+    def draw_score_area(self):
+        # The score is drawn over the board, so redraw the whole cells under it first
+        first_col, last_col = self.score_rect.left // SIZE, (self.score_rect.right - 1) // SIZE
+        first_row, last_row = self.score_rect.top // SIZE, (self.score_rect.bottom - 1) // SIZE
+        self.renderer.erase((first_col * SIZE, first_row * SIZE,
+                             (last_col - first_col + 1) * SIZE, (last_row - first_row + 1) * SIZE))
+        for row in range(first_row, last_row + 1):
+            for col in range(first_col, last_col + 1):
+                cell = (col * SIZE, row * SIZE)
+                if cell == self.snake.head:
+                    self.surface.blit(self.snake.snackFace, cell)
+                elif self.snake.grid.count(*cell):
+                    self.surface.blit(self.snake.block, cell)
+                elif cell == self.food_drawn_at:
+                    self.surface.blit(self.food.food, cell)
+        new_rect = self.display_score()
+        self.renderer.dirty.append(new_rect)
+        self.score_rect = new_rect
+
+    def show_message(self, lines):
         self.surface.fill((255, 255, 255))
-        font = pygame.font.SysFont('arial', 30)
+        for text, color, position in lines:
+            self.surface.blit(render_text(text, color, "arial", 30), position)
+        pygame.display.flip()
+        self.renderer.invalidate()
 
-        line1 = font.render(f"Game Over! Your Score: {self.snake.length}", True, (255, 0, 0))
-        self.surface.blit(line1, (120, 200))
+    def show_menu(self):
+        self.show_message([
+            ("Snake Game", (0, 128, 0), (120, 200)),
+            ("Press ENTER to Play or ESC to Exit", (0, 0, 255), (80, 250)),
+        ])
 
-        line2 = font.render("Press ENTER to Play Again or ESC to Exit", True, (0, 0, 255))
-        self.surface.blit(line2, (80, 250))
+    def show_game_over(self):
+        self.show_message([
+            (f"Game Over! Your Score: {self.snake.length}", (255, 0, 0), (120, 200)),
+            ("Press ENTER to Play Again or ESC to Exit", (0, 0, 255), (80, 250)),
+        ])
 
-        pygame.display.flip()  # Ensure screen updates to show game over message
-
-        waiting = True
-        while waiting:
-            for event in pygame.event.get():
-                if event.type == KEYDOWN:
-                    if event.key == K_RETURN:  # Restart game on ENTER
-                        self.__init__()  # Re-initialize game
-                        self.run()
-                        waiting = False
-                    elif event.key == K_ESCAPE:  # Exit game on ESC
-                        pygame.quit()
-                        exit()
+    def end_game(self):
+        pygame.mixer.music.stop()  # Stop background music
+        self.audio.play("game_over")  # Play game over sound
+        self.state = GAME_OVER
+        self.show_game_over()
 
     def display_score(self):
-        font = pygame.font.SysFont('arial', 30)
-        score = font.render(f"Score: {self.snake.length}", True, (255, 255, 255))
-        self.surface.blit(score, (10, 10))
+        return self.score_hud.draw_score(self.surface, self.snake.length, (10, 10))
+
+    def handle_event(self, event):
+        if event.type == QUIT:
+            self.state = QUIT_GAME
+        elif event.type == KEYDOWN:
+            if event.key == K_ESCAPE:
+                self.state = QUIT_GAME
+            elif self.state == PLAYING:
+                if event.key in KEY_DIRECTIONS and not self.autopilot:
+                    self.queue_turn(KEY_DIRECTIONS[event.key])
+            elif event.key == K_RETURN:  # Start, or restart after game over
+                self.start_game()
+
+    def advance(self, elapsed):
+        """Run the fixed-timestep simulation for elapsed seconds and redraw."""
+        step = 1 / self.tick_rate
+        self.accumulator += elapsed
+        ticks = 0
+        try:
+            # Fixed timestep: run as many ticks as the elapsed time pays for
+            while self.accumulator >= step and ticks < MAX_TICKS_PER_FRAME:
+                with self.telemetry.span("update"):
+                    self.update()
+                self.accumulator -= step
+                ticks += 1
+        except GameOver:
+            self.end_game()
+            return
+        if ticks == MAX_TICKS_PER_FRAME:
+            self.accumulator = 0.0
+
+        if ticks > 1:
+            self.renderer.invalidate()  # Dirty rects only cover a single step
+        if ticks or self.full_redraw:
+            self.draw()
+
+    def state_hash(self):
+        return state_hash(list(self.snake.body), self.snake.length, self.snake.direction,
+                          self.snake.pending_growth, self.food.x, self.food.y)
+
+    def close(self):
+        if self.recorder:
+            self.recorder.close(self.state_hash())
+
+    def replay(self, replay):
+        """Re-run a recorded session as fast as possible, without drawing."""
+        self.state = PLAYING
+        for code in replay.ticks:
+            if code == RECORD_NEW_GAME:
+                self.new_game()
+                self.state = PLAYING
+            elif self.state == PLAYING:
+                try:
+                    self.update(RECORD_TURNS[code])
+                except GameOver:
+                    self.state = GAME_OVER
+        return replay.check(self.state_hash())
 
     def run(self): 
-        running = True
-        while running: 
-            self.surface.fill((110, 110, 5))  # Clear screen ONCE per frame
-
+        # One loop for the whole session, restarting never re-enters run()
+        self.show_menu()
+        while self.state != QUIT_GAME:
             for event in pygame.event.get():
-                if event.type == KEYDOWN:
-                    if event.key == K_ESCAPE:
-                        running = False
-                    if event.key == K_UP:
-                        self.snake.move_up()
-                    if event.key == K_DOWN:
-                        self.snake.move_down()
-                    if event.key == K_LEFT:
-                        self.snake.move_left()
-                    if event.key == K_RIGHT:
-                        self.snake.move_right()
-                elif event.type == QUIT: 
-                    running = False 
-
-            try:
-                self.play()
-                pygame.display.flip()
-                time.sleep(0.2)  # Adjust speed
-            except Exception:
-                self.show_game_over()
+                self.handle_event(event)
+
+            with self.telemetry.span("wait"):
+                elapsed = self.clock.tick(self.fps) / 1000
+            if self.state == PLAYING:
+                self.advance(elapsed)
+            self.telemetry.frame()
 
 
 if __name__ == "__main__":
-    game = Game()
+    parser = argparse.ArgumentParser(description="Snake Game")
+    parser.add_argument("--full-redraw", action="store_true", help="repaint the whole window every frame")
+    parser.add_argument("--tick-rate", type=float, default=TICK_RATE, help="snake steps per second")
+    parser.add_argument("--fps", type=int, default=FPS, help="render and input polling rate")
+    parser.add_argument("--seed", type=int, help="seed for food placement (random by default)")
+    parser.add_argument("--record", metavar="FILE", help="save the seed and every tick's input to FILE")
+    parser.add_argument("--replay", metavar="FILE", help="re-run a recording headless and check its final state")
+    parser.add_argument("--autopilot", action="store_true", help="let the computer steer")
+    parser.add_argument("--telemetry", action="store_true", help="time each stage of a frame and print the timings at exit")
+    parser.add_argument("--trace", metavar="FILE", help="also write every timed stage to FILE (Chrome trace JSON)")
+    args = parser.parse_args()
+    telemetry = Telemetry(args.telemetry, args.trace)
+
+    if args.replay:
+        os.environ["SDL_VIDEODRIVER"] = "dummy"
+        os.environ["SDL_AUDIODRIVER"] = "dummy"
+        recording = Replay(args.replay, "snake")
+        game = Game(seed=recording.seed)
+        matched = game.replay(recording)
+        pygame.quit()
+        sys.exit(0 if matched else 1)
+
+    autopilot = None
+    if args.autopilot:
+        from autopilot import Autopilot  # It imports this module's constants
+        autopilot = Autopilot()
+    game = Game(full_redraw=args.full_redraw, tick_rate=args.tick_rate, fps=args.fps,
+                seed=args.seed, record_path=args.record, autopilot=autopilot, telemetry=telemetry)
     game.run()
+    game.close()
+    mean, worst = game.input_latency_ms()
+    print(f"Input-to-move latency: {mean:.0f} ms average, {worst:.0f} ms worst")
+    print(game.audio.report())
+    if telemetry.enabled:
+        print(telemetry.close())
     pygame.quit()
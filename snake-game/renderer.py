@@ -0,0 +1,56 @@
+import pygame
+
+
+class Renderer:
+    """Draws onto the display surface and pushes only what changed.
+
+    In dirty-rect mode the game erases and blits the few cells that changed
+    since the last frame and present() sends just those rects with
+    pygame.display.update. With full_redraw=True every frame starts from a
+    clean background and the whole screen is flipped, like the old loop.
+    """
+
+    def __init__(self, surface, background_color, full_redraw=False):
+        self.surface = surface
+        self.full_redraw = full_redraw
+        self.background = pygame.Surface(surface.get_size()).convert()
+        self.background.fill(background_color)
+        self.screen_rect = surface.get_rect()
+
+        self.dirty = []
+        self.needs_full = True  # The first frame always draws everything
+        self.pixels_pushed = 0  # Pixels sent to the display by the last present()
+
+    def invalidate(self):
+        """Force the next frame to be a full redraw, e.g. after another screen was shown."""
+        self.needs_full = True
+
+    def begin_frame(self):
+        """Start a frame; returns True when the caller must draw the whole scene."""
+        self.dirty = []
+        if self.full_redraw or self.needs_full:
+            self.surface.blit(self.background, (0, 0))
+            return True
+        return False
+
+    def erase(self, rect):
+        rect = pygame.Rect(rect).clip(self.screen_rect)
+        if rect:
+            self.surface.blit(self.background, rect, rect)
+            self.dirty.append(rect)
+
+    def blit(self, image, position):
+        rect = self.surface.blit(image, position)
+        if rect:
+            self.dirty.append(rect)
+        return rect
+
+    def present(self):
+        if self.full_redraw or self.needs_full:
+            pygame.display.flip()
+            self.pixels_pushed = self.screen_rect.w * self.screen_rect.h
+            self.needs_full = False
+        else:
+            pygame.display.update(self.dirty)
+            # Overlapping rects are counted twice, which is what the display is sent
+            self.pixels_pushed = sum(rect.w * rect.h for rect in self.dirty)
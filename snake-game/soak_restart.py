@@ -0,0 +1,45 @@
+import argparse
+import os
+import resource
+import tracemalloc
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+from pygame.locals import *
+
+from main import Game, PLAYING, GAME_OVER
+
+
+def play_until_game_over(game):
+    # Drive the real event handling and fixed-timestep loop, one tick per frame
+    game.handle_event(pygame.event.Event(KEYDOWN, key=K_RETURN))
+    assert game.state == PLAYING
+    while game.state == PLAYING:
+        game.advance(1 / game.tick_rate)
+    assert game.state == GAME_OVER
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Restart the snake game many times and watch memory")
+    parser.add_argument("--restarts", type=int, default=5000)
+    parser.add_argument("--report-every", type=int, default=500)
+    args = parser.parse_args()
+
+    game = Game()
+    play_until_game_over(game)  # Warm up caches before taking the baseline
+
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    for restart in range(1, args.restarts + 1):
+        play_until_game_over(game)
+        if restart % args.report_every == 0:
+            current, peak = tracemalloc.get_traced_memory()
+            max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            print(f"{restart:6d} restarts: {(current - baseline) / 1024:8.1f} KiB over baseline, "
+                  f"peak {peak / 1024:8.1f} KiB, max RSS {max_rss / 1024:7.1f} MiB")
+
+    growth = tracemalloc.get_traced_memory()[0] - baseline
+    print(f"Python heap growth after {args.restarts} restarts: {growth / 1024:.1f} KiB")
+    pygame.quit()
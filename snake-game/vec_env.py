@@ -0,0 +1,135 @@
+import numpy as np
+
+from main import SIZE, GRID_COLS as COLS, GRID_ROWS as ROWS, FOOD_COLS, FOOD_ROWS
+
+# Directions, in the order of the Snake.move_* methods
+UP, RIGHT, DOWN, LEFT = 0, 1, 2, 3
+NOOP = 4  # Keep the current direction
+DIRECTION_NAMES = ["up", "right", "down", "left"]
+DX = np.array([0, 1, 0, -1], dtype=np.int32)
+DY = np.array([-1, 0, 1, 0], dtype=np.int32)
+
+START_CELL = (1, 1)  # Snake() puts every block at (SIZE, SIZE)
+START_LENGTH = 2
+EMPTY = -(2 ** 30)  # Timestamp of a cell the head has never entered
+
+
+class VecSnakeEnv:
+    """Steps N headless snake games at once with the rules of Game.play.
+
+    The body is never stored segment by segment. Every board remembers the
+    tick at which the head last entered each cell, and since body block i
+    is always where the head was i ticks ago, a cell is covered by the body
+    exactly when its age is smaller than the snake length.
+    """
+
+    def __init__(self, num_envs, seed=None, auto_reset=True):
+        self.num_envs = num_envs
+        self.auto_reset = auto_reset
+        self.rng = np.random.default_rng(seed)
+
+        self.stamps = np.full((num_envs, ROWS, COLS), EMPTY, dtype=np.int32)
+        self.tick = np.zeros(num_envs, dtype=np.int32)
+        self.head_x = np.zeros(num_envs, dtype=np.int32)
+        self.head_y = np.zeros(num_envs, dtype=np.int32)
+        self.direction = np.zeros(num_envs, dtype=np.int32)
+        self.length = np.zeros(num_envs, dtype=np.int32)
+        self.food_x = np.zeros(num_envs, dtype=np.int32)
+        self.food_y = np.zeros(num_envs, dtype=np.int32)
+
+        # Final length of the games that ended on the last step (auto_reset wipes self.length)
+        self.final_length = np.zeros(num_envs, dtype=np.int32)
+
+        self._envs = np.arange(num_envs)
+        self.reset()
+
+    def reset(self, envs=None):
+        """Start new games in the given envs (all of them by default)."""
+        if envs is None:
+            envs = self._envs
+        envs = np.asarray(envs)
+        if envs.dtype == bool:
+            envs = np.flatnonzero(envs)
+        if envs.size == 0:
+            return
+
+        self.stamps[envs] = EMPTY
+        self.tick[envs] = 0
+        self.head_x[envs], self.head_y[envs] = START_CELL
+        self.stamps[envs, START_CELL[1], START_CELL[0]] = 0
+        self.direction[envs] = DOWN
+        self.length[envs] = START_LENGTH
+        self.place_food(envs)
+
+    def place_food(self, envs, max_tries=64):
+        # Like Food.move, never under the body. Rejection sampling is cheap
+        # until the snake covers most of the board; a full board keeps its food.
+        envs = np.asarray(envs)
+        for _ in range(max_tries):
+            x = self.rng.integers(0, FOOD_COLS, size=len(envs))
+            y = self.rng.integers(0, FOOD_ROWS, size=len(envs))
+            free = self.tick[envs] - self.stamps[envs, y, x] >= self.length[envs]
+            self.food_x[envs[free]] = x[free]
+            self.food_y[envs[free]] = y[free]
+            envs = envs[~free]
+            if envs.size == 0:
+                return
+        for env in envs:
+            cells = np.flatnonzero(~self.body_mask()[env, :FOOD_ROWS, :FOOD_COLS])
+            if cells.size:
+                self.food_y[env], self.food_x[env] = divmod(self.rng.choice(cells), FOOD_COLS)
+
+    def step(self, actions):
+        """Advance every game by one tick.
+
+        actions holds one of UP/RIGHT/DOWN/LEFT/NOOP per env. Turning back
+        into the snake is ignored, the same as Snake.move_up and friends.
+        Returns (rewards, dones): +1 for eating, -1 for dying, 0 otherwise.
+        """
+        actions = np.asarray(actions, dtype=np.int32)
+        turn = (actions < NOOP) & (actions != (self.direction + 2) % 4)
+        self.direction = np.where(turn, actions, self.direction)
+
+        # Snake.walk
+        self.head_x += DX[self.direction]
+        self.head_y += DY[self.direction]
+        self.tick += 1
+
+        # Game.check_boundary_collision
+        out = (self.head_x < 0) | (self.head_x >= COLS) | (self.head_y < 0) | (self.head_y >= ROWS)
+        x = np.clip(self.head_x, 0, COLS - 1)
+        y = np.clip(self.head_y, 0, ROWS - 1)
+
+        # Eating only keeps the tail in place on the next walk, so the
+        # length before eating is what counts for this tick
+        age = self.tick - self.stamps[self._envs, y, x]
+        hit_self = ~out & (age < self.length)
+        ate = ~out & (self.head_x == self.food_x) & (self.head_y == self.food_y)
+
+        self.stamps[self._envs, y, x] = np.where(out, self.stamps[self._envs, y, x], self.tick)
+        self.length += ate
+        eaten = np.flatnonzero(ate & ~hit_self)
+        if eaten.size:
+            self.place_food(eaten)
+
+        dones = out | hit_self
+        rewards = np.where(dones, -1.0, ate.astype(np.float32)).astype(np.float32)
+
+        self.final_length = np.where(dones, self.length, 0)
+        if self.auto_reset:
+            self.reset(dones)
+        return rewards, dones
+
+    def body_mask(self):
+        """(N, ROWS, COLS) bool array of the cells covered by each snake."""
+        age = self.tick[:, None, None] - self.stamps
+        return age < self.length[:, None, None]
+
+    def observe(self):
+        """(N, ROWS, COLS) int8 boards: 0 empty, 1 body, 2 head, 3 food."""
+        boards = self.body_mask().astype(np.int8)
+        x = np.clip(self.head_x, 0, COLS - 1)
+        y = np.clip(self.head_y, 0, ROWS - 1)
+        boards[self._envs, self.food_y, self.food_x] = 3
+        boards[self._envs, y, x] = 2
+        return boards